@@ -7,6 +7,11 @@ from gtts import gTTS
 import tempfile
 import os
 
+from .single_flight import SingleFlight
+
+# Shared by every Streamlit session in this process
+_tts_flight = SingleFlight("tts")
+
 
 def generate_slogan_audio(slogan: str, language: str = 'en', slow: bool = True) -> BytesIO:
     """
@@ -95,6 +100,11 @@ def get_audio_bytes(slogan: str) -> bytes:
     Returns:
         bytes: Audio file as bytes
     """
+    # The same slogan requested at the same time is synthesized once
+    return _tts_flight.do(slogan.strip(), _synthesize_bytes, slogan)
+
+
+def _synthesize_bytes(slogan: str) -> bytes:
     audio_buffer = generate_slogan_audio(slogan)
     if audio_buffer:
         return audio_buffer.read()
@@ -0,0 +1,178 @@
+"""
+Campaign Cache Module - Reuses campaigns for near-duplicate trends
+Trends like "Super Bowl LIX" and "Super Bowl Sunday" get the same creative
+without another LLM call, using a local character n-gram similarity index.
+Trend names put the word that tells events apart first ("Mother's Day",
+"NBA Finals", "Winter Olympics"), so a match must also open with the same
+content word - "Father's Day", "NHL Finals" and "Olympics" never share a campaign
+with those, however similar the rest of the name is.
+"""
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+from .config import CAMPAIGN_CACHE_SIMILARITY, CAMPAIGN_CACHE_ADAPT, CAMPAIGN_CACHE_MAX_ENTRIES
+
+NGRAM_SIZE = 3
+
+# Filler words that don't change which event a trend is about
+TREND_STOPWORDS = {"the", "a", "an", "of", "and", "in", "on", "at", "for", "to", "s"}
+
+
+def trend_ngrams(trend: str, n: int = NGRAM_SIZE) -> Counter:
+    """
+    Character n-gram counts for a trend name.
+    Text is lowercased and punctuation collapsed, with padding so word
+    boundaries contribute their own n-grams ("Superbowl" still matches "Super Bowl").
+    """
+    text = " " + re.sub(r"[^a-z0-9]+", " ", trend.lower()).strip() + " "
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def trend_tokens(trend: str) -> tuple:
+    """Content words of a trend name in order (lowercased, punctuation and stopwords dropped)."""
+    return tuple(t for t in re.sub(r"[^a-z0-9]+", " ", trend.lower()).split() if t not in TREND_STOPWORDS)
+
+
+def same_leading_word(tokens: tuple, other: tuple) -> bool:
+    """
+    True if two trends open with the same distinguishing word.
+    Compared on the joined words, so "Superbowl LIX" still matches "Super Bowl LIX";
+    a qualifier on one side only ("Olympics" vs "Winter Olympics") doesn't match.
+    """
+    if not tokens or not other:
+        return tokens == other
+    return "".join(tokens).startswith(other[0]) and "".join(other).startswith(tokens[0])
+
+
+def _norm(vector: Counter) -> float:
+    return math.sqrt(sum(v * v for v in vector.values()))
+
+
+def adapt_campaign(campaign: dict, cached_trend: str, new_trend: str) -> dict:
+    """Returns a copy of a cached campaign with the old trend name swapped for the new one."""
+    if cached_trend.strip().lower() == new_trend.strip().lower():
+        return dict(campaign)
+    pattern = re.compile(re.escape(cached_trend), re.IGNORECASE)
+    return {
+        key: pattern.sub(new_trend, value) if isinstance(value, str) else value
+        for key, value in campaign.items()
+    }
+
+
+class CampaignCache:
+    """
+    In-process similarity cache of generated campaigns.
+    An inverted index from n-gram to entries keeps lookups proportional to the
+    number of trends that share at least one n-gram, not the whole cache.
+    """
+
+    def __init__(self, threshold: float = CAMPAIGN_CACHE_SIMILARITY, max_entries: int = CAMPAIGN_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._index: Dict[str, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        for gram in entry["vector"]:
+            ids = self._index.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[gram]
+
+    def add(self, trend: str, category: str, campaign: dict):
+        """Stores a generated campaign for later near-duplicate lookups."""
+        vector = trend_ngrams(trend)
+        if not vector:
+            return
+        with self._lock:
+            # Replace an existing entry for the exact same trend
+            for entry_id, entry in list(self._entries.items()):
+                if entry["category"] == category and entry["trend"].lower() == trend.lower():
+                    self._remove(entry_id)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "trend": trend,
+                "category": category,
+                "campaign": dict(campaign),
+                "vector": vector,
+                "norm": _norm(vector),
+                "tokens": trend_tokens(trend),
+            }
+            for gram in vector:
+                self._index.setdefault(gram, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def find(self, trend: str, category: str) -> Optional[dict]:
+        """
+        Finds the most similar cached trend in the same category.
+        Only trends opening with the same content word qualify (see
+        same_leading_word); the n-gram score then decides.
+
+        Returns:
+            Dict with trend, campaign and similarity, or None below the threshold
+        """
+        vector = trend_ngrams(trend)
+        if not vector:
+            return None
+        norm = _norm(vector)
+        tokens = trend_tokens(trend)
+
+        with self._lock:
+            dots: Dict[int, int] = {}
+            for gram, count in vector.items():
+                for entry_id in self._index.get(gram, ()):
+                    dots[entry_id] = dots.get(entry_id, 0) + count * self._entries[entry_id]["vector"][gram]
+
+            best_id, best_score = None, 0.0
+            for entry_id, dot in dots.items():
+                entry = self._entries[entry_id]
+                if entry["category"] != category or not same_leading_word(tokens, entry["tokens"]):
+                    continue
+                score = dot / (norm * entry["norm"])
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.threshold:
+                return None
+
+            # Refresh recency so popular trends survive eviction
+            self._entries.move_to_end(best_id)
+            entry = self._entries[best_id]
+            return {
+                "trend": entry["trend"],
+                "campaign": dict(entry["campaign"]),
+                "similarity": round(best_score, 3),
+            }
+
+    def get(self, trend: str, category: str, adapt: bool = CAMPAIGN_CACHE_ADAPT) -> Optional[dict]:
+        """Returns a cached campaign for a near-duplicate trend, or None on a miss."""
+        match = self.find(trend, category)
+        if not match:
+            return None
+        print(f"Campaign cache hit: '{trend}' ~ '{match['trend']}' (similarity {match['similarity']})")
+        if adapt:
+            return adapt_campaign(match["campaign"], match["trend"], trend)
+        return match["campaign"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+
+# Shared by every Streamlit session in this server process
+campaign_cache = CampaignCache()
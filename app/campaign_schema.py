@@ -0,0 +1,263 @@
+"""
+Campaign Schema Module - Validates and repairs LLM campaign responses
+Turns almost-valid JSON into a usable campaign instead of discarding the whole call
+"""
+import json
+import re
+from typing import Optional
+
+
+# Required campaign fields, in the order the prompt asks for them
+CAMPAIGN_FIELDS = ["hero_concept", "slogan", "social_post", "moodboard"]
+
+# Word limits taken from the prompt contract
+MAX_SLOGAN_WORDS = 7
+MAX_SOCIAL_POST_WORDS = 40
+
+# JSON schema used for provider-native structured output (OpenAI json_schema mode)
+CAMPAIGN_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "hero_concept": {"type": "string"},
+        "slogan": {"type": "string"},
+        "social_post": {"type": "string"},
+        "moodboard": {"type": "string"},
+    },
+    "required": CAMPAIGN_FIELDS,
+    "additionalProperties": False,
+}
+
+OPENAI_CAMPAIGN_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "campaign",
+        "strict": True,
+        "schema": CAMPAIGN_JSON_SCHEMA,
+    },
+}
+
+
+def openai_variants_response_format(n: int) -> dict:
+    """
+    Structured-output format for multi-variant generation.
+    One shared hero concept and moodboard, plus n slogan/social post variants.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": f"campaign_variants_{n}",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "hero_concept": {"type": "string"},
+                    "moodboard": {"type": "string"},
+                    "variants": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "slogan": {"type": "string"},
+                                "social_post": {"type": "string"},
+                            },
+                            "required": ["slogan", "social_post"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["hero_concept", "moodboard", "variants"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def validate_campaign(campaign) -> list[str]:
+    """
+    Checks a parsed campaign against the schema.
+
+    Returns:
+        List of problems found (empty list means the campaign is valid)
+    """
+    if not isinstance(campaign, dict):
+        return ["response is not a JSON object"]
+
+    problems = []
+    for field in CAMPAIGN_FIELDS:
+        value = campaign.get(field)
+        if not isinstance(value, str) or not value.strip():
+            problems.append(f"missing or empty field: {field}")
+
+    slogan = campaign.get("slogan")
+    if isinstance(slogan, str) and len(slogan.split()) > MAX_SLOGAN_WORDS:
+        problems.append(f"slogan longer than {MAX_SLOGAN_WORDS} words")
+
+    social_post = campaign.get("social_post")
+    if isinstance(social_post, str) and len(social_post.split()) > MAX_SOCIAL_POST_WORDS:
+        problems.append(f"social_post longer than {MAX_SOCIAL_POST_WORDS} words")
+
+    return problems
+
+
+def _extract_json_text(content: str) -> tuple[str, str]:
+    """
+    Strips markdown fences and any chatter around the JSON object.
+
+    Returns:
+        (text up to the last closing brace, text from the first brace to the end).
+        The second form keeps a truncated tail so it can be closed and salvaged.
+    """
+    text = content.strip()
+
+    # Remove ```json ... ``` fences
+    text = re.sub(r"^```(?:json)?\s*", "", text)
+    text = re.sub(r"\s*```$", "", text)
+
+    start = text.find("{")
+    if start == -1:
+        return text, text
+    end = text.rfind("}")
+    if end > start:
+        return text[start:end + 1], text[start:]
+    # No closing brace - the response was probably truncated
+    return text[start:], text[start:]
+
+
+def _close_truncated_json(text: str) -> str:
+    """
+    Repairs JSON that was cut off mid-response and escapes raw control characters.
+    Walks the text once, tracking string state and open brackets.
+    """
+    repaired = []
+    stack = []
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                repaired.append("\\n")
+                continue
+            elif char == "\r":
+                continue
+            elif char == "\t":
+                repaired.append("\\t")
+                continue
+        else:
+            if char == '"':
+                in_string = True
+            elif char in "{[":
+                stack.append("}" if char == "{" else "]")
+            elif char in "}]" and stack:
+                stack.pop()
+        repaired.append(char)
+
+    if escaped:
+        # Dangling backslash at the cut point
+        repaired.pop()
+    if in_string:
+        repaired.append('"')
+
+    result = "".join(repaired).rstrip()
+
+    # A key with no value ("slogan": or "slogan") cannot be salvaged - drop it
+    if _ends_with_dangling_key(result):
+        result = re.sub(r'[,]?\s*"[^"]*"\s*:?\s*$', "", result)
+
+    # Trailing commas before a closing bracket (or at the cut point)
+    result = re.sub(r",\s*$", "", result)
+    result += "".join(reversed(stack))
+    result = re.sub(r",\s*([}\]])", r"\1", result)
+    return result
+
+
+def _ends_with_dangling_key(text: str) -> bool:
+    """True when the text ends with an object key that has no value yet."""
+    return re.search(r'[{,]\s*"[^"]*"\s*:?\s*$', text) is not None
+
+
+def parse_campaign_json(content: str) -> Optional[dict]:
+    """
+    Parses an LLM response into a dict, repairing common breakage locally.
+    Handles markdown fences, surrounding text, raw newlines inside strings,
+    trailing commas and responses truncated mid-string.
+
+    Returns:
+        Parsed dict, or None if nothing usable could be recovered
+    """
+    if not content:
+        return None
+
+    try:
+        parsed = json.loads(content)
+        return parsed if isinstance(parsed, dict) else None
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    text, tail = _extract_json_text(content)
+    for candidate in (text, _close_truncated_json(tail), _close_truncated_json(text)):
+        try:
+            parsed = json.loads(candidate)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            continue
+
+    # Last resort: pull out complete "key": "value" pairs one at a time
+    pairs = re.findall(r'"(\w+)"\s*:\s*"((?:[^"\\]|\\.)*)"', text, flags=re.DOTALL)
+    if pairs:
+        recovered = {}
+        for key, value in pairs:
+            try:
+                recovered[key] = json.loads(f'"{value}"')
+            except json.JSONDecodeError:
+                recovered[key] = value
+        return recovered
+
+    return None
+
+
+def _clamp_words(text: str, max_words: int) -> str:
+    """Trims text to at most max_words words."""
+    words = text.split()
+    if len(words) <= max_words:
+        return text.strip()
+    return " ".join(words[:max_words]).rstrip(",;:-")
+
+
+def repair_campaign(campaign, fallback: dict) -> dict:
+    """
+    Coerces a parsed response into a valid campaign.
+    Missing or empty fields are filled from the fallback (demo template) campaign,
+    non-string values are flattened, and word limits are enforced.
+
+    Args:
+        campaign: Parsed response (may be None or partially filled)
+        fallback: Complete campaign used to fill gaps
+
+    Returns:
+        Dict with exactly the CAMPAIGN_FIELDS keys
+    """
+    if not isinstance(campaign, dict):
+        campaign = {}
+
+    repaired = {}
+    for field in CAMPAIGN_FIELDS:
+        value = campaign.get(field)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        elif value is not None and not isinstance(value, str):
+            value = str(value)
+        if not value or not value.strip():
+            value = fallback.get(field, "")
+        repaired[field] = value.strip()
+
+    repaired["slogan"] = _clamp_words(repaired["slogan"].strip('"'), MAX_SLOGAN_WORDS)
+    repaired["social_post"] = _clamp_words(repaired["social_post"], MAX_SOCIAL_POST_WORDS)
+    return repaired
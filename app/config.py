@@ -9,17 +9,23 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+# Optional base URLs, e.g. the local mock server for load testing:
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1  GROQ_BASE_URL=http://127.0.0.1:8765
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))  # SDK-level retries on 429/5xx
+
 # Initialize OpenAI client (only if key exists)
 openai_client = None
 if OPENAI_API_KEY and OPENAI_API_KEY != "your_openai_api_key_here":
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=LLM_MAX_RETRIES)
 
 # Initialize Groq client (free AI alternative)
 groq_client = None
 try:
     from groq import Groq
     if GROQ_API_KEY and GROQ_API_KEY != "your_groq_api_key_here":
-        groq_client = Groq(api_key=GROQ_API_KEY)
+        groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=LLM_MAX_RETRIES)
 except ImportError:
     pass  # Groq not installed yet
 
@@ -30,6 +36,84 @@ except ImportError:
 OPENAI_LLM_MODEL = "gpt-4o-mini"
 GROQ_LLM_MODEL = "llama-3.3-70b-versatile"  # Fast, free model from Groq
 IMAGE_MODEL = "dall-e-3"  # OpenAI DALL-E (paid, optional)
+# Image generation backend: "auto" (DALL-E when an OpenAI key is set, otherwise Pollinations),
+# "dalle", "pollinations" or "local" (deterministic offline stand-in images, for tests and benchmarks)
+IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "auto").lower()
+LOCAL_IMAGE_SIZE = int(os.getenv("LOCAL_IMAGE_SIZE", "1024"))
+LOCAL_IMAGE_SEED = int(os.getenv("LOCAL_IMAGE_SEED", "0"))  # Change for a different set of local images
+# "url" (expires after about an hour) or "b64_json" (decoded straight into the local image store,
+# handed out as a store:// handle - no second download, but not a public URL; handles are
+# evicted last from the image store, so they can expire once IMAGE_STORE_MAX_MB fills up)
+DALLE_RESPONSE_FORMAT = os.getenv("DALLE_RESPONSE_FORMAT", "url").lower()
+
+# List prices in USD per 1M tokens, used by the LLM ledger for cost estimates
+# (Groq's free tier costs nothing, these are the paid-tier rates)
+LLM_PRICING = {
+    OPENAI_LLM_MODEL: {"input": 0.15, "output": 0.60},
+    GROQ_LLM_MODEL: {"input": 0.59, "output": 0.79},
+}
+
+# Near-duplicate trend cache for campaigns (set similarity above 1.0 to disable)
+CAMPAIGN_CACHE_SIMILARITY = float(os.getenv("CAMPAIGN_CACHE_SIMILARITY", "0.6"))
+CAMPAIGN_CACHE_ADAPT = os.getenv("CAMPAIGN_CACHE_ADAPT", "true").lower() == "true"  # Swap in the new trend name
+CAMPAIGN_CACHE_MAX_ENTRIES = int(os.getenv("CAMPAIGN_CACHE_MAX_ENTRIES", "500"))
+
+# Few-shot exemplars from top-performing past posts (0 disables)
+EXEMPLAR_TOP_K = int(os.getenv("EXEMPLAR_TOP_K", "3"))
+EXEMPLAR_MIN_ENGAGEMENT = float(os.getenv("EXEMPLAR_MIN_ENGAGEMENT", "0"))  # Exemplars need an engagement rate (%) above this
+
+# Speculative pre-generation for the top trends of the current snapshot (0 disables)
+WARM_POOL_SIZE = int(os.getenv("WARM_POOL_SIZE", "3"))
+WARM_POOL_WORKERS = int(os.getenv("WARM_POOL_WORKERS", "2"))
+WARM_POOL_TTL_SECONDS = int(os.getenv("WARM_POOL_TTL_SECONDS", "1800"))  # Regenerate stale entries
+
+# Start classification + campaign generation as soon as a trend is selected
+PREFETCH_ON_SELECT = os.getenv("PREFETCH_ON_SELECT", "true").lower() == "true"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+# Scene rule table for image/video prompts (defaults to data/scene_rules.json)
+SCENE_RULES_PATH = os.getenv("SCENE_RULES_PATH") or None
+
+# Local content-addressed store for generated images, shared by every pipeline stage
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "data/image_cache")
+IMAGE_STORE_MAX_MB = int(os.getenv("IMAGE_STORE_MAX_MB", "500"))  # Least recently used images are evicted
+IMAGE_DOWNLOAD_TIMEOUT = int(os.getenv("IMAGE_DOWNLOAD_TIMEOUT", "60"))  # Pollinations renders on first GET
+IMAGE_PREFETCH_WORKERS = int(os.getenv("IMAGE_PREFETCH_WORKERS", "4"))
+IMAGE_BATCH_WORKERS = int(os.getenv("IMAGE_BATCH_WORKERS", "4"))  # Parallel image generations for multi-scene sets
+# Scene images whose perceptual hashes differ by at most this many bits (of 64) count as duplicates (-1 disables)
+IMAGE_DEDUP_DISTANCE = int(os.getenv("IMAGE_DEDUP_DISTANCE", "8"))
+# Images whose renditions (preview, PDF thumbnail, Instagram crops, video sources) are kept decoded in memory
+DERIVATIVE_CACHE_IMAGES = int(os.getenv("DERIVATIVE_CACHE_IMAGES", "6"))
+
+# Canonical working resolution of every video path: images are decoded and scaled to this square
+# once, and each video frame is a single resample of it (zoom and crop folded into one box)
+VIDEO_SIZE = int(os.getenv("VIDEO_SIZE", "1080"))
+SCENE_ZOOM = float(os.getenv("SCENE_ZOOM", "1.2"))  # Constant crop-in of multi-scene video scenes
+
+# Animated fallback loops: "gif", "webp" (smaller, full colour) or "mp4"
+ANIMATION_FORMAT = os.getenv("ANIMATION_FORMAT", "gif").lower()
+# Per-scene loops inside multi-scene videos: "clip" renders them from the image while the video
+# is written; "mp4", "gif" or "webp" write an animation file first and decode it again
+SCENE_LOOP_FORMAT = os.getenv("SCENE_LOOP_FORMAT", "clip").lower()
+
+# Video for a campaign image: "huggingface" (remote Stable Video Diffusion, GIF shown meanwhile),
+# "procedural" (local parallax/sparkle animation, a few seconds on CPU) or "kenburns" (animated GIF only)
+VIDEO_ENGINE = os.getenv("VIDEO_ENGINE", "huggingface").lower()
+PROCEDURAL_VIDEO_FORMAT = os.getenv("PROCEDURAL_VIDEO_FORMAT", "mp4").lower()
+PROCEDURAL_MAX_SIZE = int(os.getenv("PROCEDURAL_MAX_SIZE", "720"))  # Longest side of rendered frames
+
+# Hugging Face image-to-video runs as a background job; the GIF fallback is shown until it finishes
+HF_VIDEO_ENABLED = os.getenv("HF_VIDEO_ENABLED", "true").lower() == "true"
+HF_VIDEO_WORKERS = int(os.getenv("HF_VIDEO_WORKERS", "2"))
+HF_VIDEO_MAX_WAIT_SECONDS = int(os.getenv("HF_VIDEO_MAX_WAIT_SECONDS", "600"))  # Give up on a cold model after this
+HF_VIDEO_MIN_POLL_SECONDS = float(os.getenv("HF_VIDEO_MIN_POLL_SECONDS", "5"))
+HF_VIDEO_MAX_POLL_SECONDS = float(os.getenv("HF_VIDEO_MAX_POLL_SECONDS", "60"))
+HF_WARM_TTL_SECONDS = int(os.getenv("HF_WARM_TTL_SECONDS", "900"))  # Assume the model idles out after this
+HF_VIDEO_JOB_TTL_SECONDS = int(os.getenv("HF_VIDEO_JOB_TTL_SECONDS", "3600"))  # Forget finished jobs after this
+HF_VIDEO_MAX_JOBS = int(os.getenv("HF_VIDEO_MAX_JOBS", "200"))  # Finished jobs kept beyond this are dropped, oldest first
+
+# Start rendering Pollinations images in the background as soon as their URL is built
+POLLINATIONS_EAGER_FETCH = os.getenv("POLLINATIONS_EAGER_FETCH", "true").lower() == "true"
 
 # Backward compatibility
 client = openai_client  # For existing code that uses 'client'
@@ -1,6 +1,17 @@
-import json
 import random
-from .config import openai_client, groq_client, OPENAI_LLM_MODEL, GROQ_LLM_MODEL
+import time
+from .config import openai_client, groq_client, OPENAI_LLM_MODEL, GROQ_LLM_MODEL, EXEMPLAR_TOP_K, EXEMPLAR_MIN_ENGAGEMENT
+from .campaign_cache import campaign_cache
+from .exemplar_index import get_exemplar_index
+from .llm_ledger import record_call
+from .single_flight import SingleFlight
+from .campaign_schema import (
+    CAMPAIGN_FIELDS, OPENAI_CAMPAIGN_RESPONSE_FORMAT, openai_variants_response_format,
+    parse_campaign_json, repair_campaign, validate_campaign
+)
+
+# Shared by every Streamlit session in this process
+_campaign_flight = SingleFlight("campaign")
 
 SYSTEM_PROMPT = """
 You are a Coca-Cola global creative strategist working on the 'Real Magic' brand platform.
@@ -112,13 +123,34 @@ def generate_demo_campaign(trend: str, category: str = "general") -> dict:
     }
 
 
-def generate_campaign_for_trend(trend: str, category: str = "general") -> dict:
+def _build_exemplar_block(trend: str, k: int = EXEMPLAR_TOP_K) -> str:
     """
-    Generates a structured Coca-Cola creative campaign concept using GPT.
-    Returns a dict with hero_concept, slogan, social_post, and moodboard.
+    Formats the top-k past campaigns for similar trends as few-shot examples.
+    Only posts with engagement above EXEMPLAR_MIN_ENGAGEMENT count - the prompt
+    presents them as posts that performed well.
+    Returns an empty string when there is no history or retrieval is disabled.
     """
+    if k <= 0:
+        return ""
+    try:
+        exemplars = get_exemplar_index().search(trend, k=k, min_engagement=EXEMPLAR_MIN_ENGAGEMENT)
+    except Exception as e:
+        print(f"Exemplar retrieval failed: {e}")
+        return ""
+    if not exemplars:
+        return ""
+
+    lines = ["Past Coca-Cola posts for similar trends that performed well (match their energy, do NOT copy them):"]
+    for exemplar in exemplars:
+        caption = " ".join(exemplar["caption"].split())[:280]
+        lines.append(f'- Trend: {exemplar["trend"]} | engagement {exemplar["engagement_rate"]:.1f}% | "{caption}"')
+    return "\n".join(lines) + "\n"
+
 
-    user_prompt = f"""
+def _build_user_prompt(trend: str, category: str) -> str:
+    """Builds the per-trend user prompt shared by all providers."""
+    exemplar_block = _build_exemplar_block(trend)
+    return f"""
 Create a Coca-Cola 'Real Magic' campaign specifically for: **{trend}**
 
 This campaign must be HIGHLY PERSONALIZED to "{trend}" - not generic. Every element should reflect what makes {trend} unique and special.
@@ -131,6 +163,7 @@ Requirements:
 - Social post: Must mention {trend} and create excitement around it. Use language that resonates with people who care about {trend}.
 - Moodboard: Visual elements that are specific to {trend} - colors, settings, objects, people, activities that relate directly to {trend}.
 
+{exemplar_block}
 Respond ONLY in valid JSON using this structure:
 
 {{
@@ -141,11 +174,65 @@ Respond ONLY in valid JSON using this structure:
 }}
     """
 
-    # Try OpenAI first, then Groq, then demo mode
-    # Priority: OpenAI > Groq > Demo
-    
-    # Try OpenAI
+
+def _campaign_from_content(content: str, trend: str, category: str) -> dict | None:
+    """
+    Turns a raw provider response into a campaign.
+    Broken JSON is repaired locally and missing fields are filled from the demo
+    templates, so a partially usable response does not cost another round-trip.
+
+    Returns:
+        Campaign dict, or None if the response contained no campaign fields at all
+    """
+    parsed = parse_campaign_json(content)
+    if not parsed or not any(parsed.get(field) for field in CAMPAIGN_FIELDS):
+        return None
+
+    problems = validate_campaign(parsed)
+    if problems:
+        print(f"Repairing campaign response locally: {'; '.join(problems)}")
+    return repair_campaign(parsed, generate_demo_campaign(trend, category))
+
+
+def _failed_generation(error: Exception) -> str | None:
+    """
+    Returns the raw model output attached to a provider JSON-mode error, if any.
+    Groq rejects invalid JSON with a 400 but includes the failed generation,
+    which can usually be repaired locally.
+    """
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        details = body.get("error", body)
+        if isinstance(details, dict):
+            return details.get("failed_generation")
+    return None
+
+
+def _usage_tokens(response) -> tuple[int, int]:
+    """Prompt and completion token counts from a chat completion, if reported."""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return 0, 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def _generate_with_providers(user_prompt: str, trend: str, openai_response_format: dict, parse):
+    """
+    Sends one prompt through the provider chain and parses the first usable response.
+    Priority: OpenAI > Groq. Returns None when every provider fails, so callers
+    can fall back to demo mode. Every call is recorded in the LLM ledger.
+
+    Args:
+        user_prompt: The user message to send (system prompt is added here)
+        trend: Trend name, used for the Groq JSON reminder
+        openai_response_format: response_format for OpenAI (native structured output)
+        parse: Callable turning raw response text into a result, or None if unusable
+    """
+    fallback_reason = None if (openai_client or groq_client) else "no provider configured"
+
+    # Try OpenAI (native structured output keeps the response on-schema)
     if openai_client:
+        start = time.perf_counter()
         try:
             response = openai_client.chat.completions.create(
                 model=OPENAI_LLM_MODEL,
@@ -153,15 +240,27 @@ Respond ONLY in valid JSON using this structure:
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
-                response_format={"type": "json_object"}
+                response_format=openai_response_format
             )
+            latency_ms = (time.perf_counter() - start) * 1000
+            prompt_tokens, completion_tokens = _usage_tokens(response)
             content = response.choices[0].message.content
-            return json.loads(content)
+            result = parse(content)
+            fallback_reason = None if result else "unusable response"
+            record_call("openai", OPENAI_LLM_MODEL, latency_ms, bool(result),
+                        prompt_tokens, completion_tokens, fallback_reason, trend)
+            if result:
+                return result
+            print("OpenAI returned no usable campaign, trying Groq...")
         except Exception as e:
+            fallback_reason = f"{type(e).__name__}: {e}"
+            record_call("openai", OPENAI_LLM_MODEL, (time.perf_counter() - start) * 1000, False,
+                        fallback_reason=fallback_reason, trend=trend)
             print(f"OpenAI error: {e}, trying Groq...")
     
     # Try Groq (free AI)
     if groq_client:
+        start = time.perf_counter()
         try:
             response = groq_client.chat.completions.create(
                 model=GROQ_LLM_MODEL,
@@ -172,10 +271,199 @@ Respond ONLY in valid JSON using this structure:
                 response_format={"type": "json_object"},
                 temperature=0.9  # Higher temperature for more creative, personalized responses
             )
+            latency_ms = (time.perf_counter() - start) * 1000
+            prompt_tokens, completion_tokens = _usage_tokens(response)
             content = response.choices[0].message.content
-            return json.loads(content)
+            result = parse(content)
+            fallback_reason = None if result else "unusable response"
+            record_call("groq", GROQ_LLM_MODEL, latency_ms, bool(result),
+                        prompt_tokens, completion_tokens, fallback_reason, trend)
+            if result:
+                return result
+            print("Groq returned no usable campaign, falling back to demo mode...")
         except Exception as e:
+            latency_ms = (time.perf_counter() - start) * 1000
+            failed_output = _failed_generation(e)
+            result = parse(failed_output) if failed_output else None
+            if result:
+                record_call("groq", GROQ_LLM_MODEL, latency_ms, True,
+                            fallback_reason="repaired failed_generation", trend=trend)
+                print("Groq rejected its own JSON, repaired the failed generation locally")
+                return result
+            fallback_reason = f"{type(e).__name__}: {e}"
+            record_call("groq", GROQ_LLM_MODEL, latency_ms, False, fallback_reason=fallback_reason, trend=trend)
             print(f"Groq error: {e}, falling back to demo mode...")
     
+    # Demo mode is free, but logging it shows how often generation degrades
+    record_call("demo", "templates", 0.0, True, fallback_reason=fallback_reason, trend=trend)
+    return None
+
+
+def generate_campaign_for_trend(trend: str, category: str = "general", use_cache: bool = True) -> dict:
+    """
+    Generates a structured Coca-Cola creative campaign concept using GPT.
+    Returns a dict with hero_concept, slogan, social_post, and moodboard.
+
+    Near-duplicate trends (e.g. "Super Bowl LIX" vs "Super Bowl Sunday") are served
+    from the local similarity cache without a network call when use_cache is True.
+    """
+    if use_cache:
+        cached = campaign_cache.get(trend, category)
+        if cached:
+            return cached
+
+    # Identical requests already running (other sessions, double-clicks) share one call
+    key = (trend.strip(), category, _active_llm_model())
+    return dict(_campaign_flight.do(key, _generate_campaign, trend, category))
+
+
+def _active_llm_model() -> str:
+    """Model that will answer first, used to key coalesced requests."""
+    if openai_client:
+        return OPENAI_LLM_MODEL
+    if groq_client:
+        return GROQ_LLM_MODEL
+    return "demo"
+
+
+def _generate_campaign(trend: str, category: str) -> dict:
+    """Uncached campaign generation: LLM providers first, demo templates as fallback."""
+    user_prompt = _build_user_prompt(trend, category)
+
+    campaign = _generate_with_providers(
+        user_prompt,
+        trend,
+        OPENAI_CAMPAIGN_RESPONSE_FORMAT,
+        lambda content: _campaign_from_content(content, trend, category)
+    )
+    if campaign:
+        # Demo campaigns are free to regenerate, so only LLM output is cached
+        campaign_cache.add(trend, category, campaign)
+        return campaign
+    
     # Fallback to demo mode
     return generate_demo_campaign(trend, category)
+
+
+def _build_variants_prompt(trend: str, category: str, n: int) -> str:
+    """
+    Builds the multi-variant prompt. The hero concept and moodboard are shared,
+    only slogan and social post vary, so output tokens grow with the short fields only.
+    """
+    return _build_user_prompt(trend, category).split("Respond ONLY in valid JSON")[0] + f"""
+Write ONE hero concept and ONE moodboard, then {n} DISTINCT slogan + social post variants for A/B testing.
+Each variant should take a different creative angle (emotional, playful, bold, nostalgic, communal...).
+
+Respond ONLY in valid JSON using this structure:
+
+{{
+  "hero_concept": "2-3 sentence cinematic campaign idea that is SPECIFIC to {trend}.",
+  "moodboard": "Visual keywords specific to {trend}: colors, environments, objects, people, activities, emotions, camera styles.",
+  "variants": [
+    {{
+      "slogan": "Short tagline (max 7 words) that references or evokes {trend}.",
+      "social_post": "Instagram/X caption (max 40 words) that mentions {trend} and creates excitement."
+    }}
+  ]
+}}
+
+The "variants" array must contain exactly {n} items.
+    """
+
+
+def _variants_from_content(content: str, trend: str, category: str, n: int) -> list[dict] | None:
+    """
+    Turns a raw multi-variant response into a list of n repaired campaigns.
+    Missing variants are topped up from the demo templates.
+    """
+    parsed = parse_campaign_json(content)
+    if not parsed:
+        return None
+
+    raw_variants = parsed.get("variants")
+    if not isinstance(raw_variants, list):
+        # Model ignored the variants structure but may have answered with one campaign
+        raw_variants = [parsed] if any(parsed.get(field) for field in CAMPAIGN_FIELDS) else []
+    raw_variants = [v for v in raw_variants if isinstance(v, dict)]
+    if not raw_variants and not parsed.get("hero_concept"):
+        return None
+
+    shared = {
+        "hero_concept": parsed.get("hero_concept"),
+        "moodboard": parsed.get("moodboard"),
+    }
+    fallback = generate_demo_campaign(trend, category)
+
+    campaigns = []
+    seen_slogans = set()
+    for variant in raw_variants:
+        campaign = repair_campaign({**shared, **{k: v for k, v in variant.items() if v}}, fallback)
+        if campaign["slogan"].lower() in seen_slogans:
+            continue
+        seen_slogans.add(campaign["slogan"].lower())
+        campaigns.append(campaign)
+        if len(campaigns) == n:
+            break
+
+    if len(campaigns) < n:
+        print(f"Only {len(campaigns)}/{n} usable variants returned, filling the rest from demo templates")
+        campaigns.extend(_demo_variants(trend, category, n - len(campaigns), shared, seen_slogans))
+    return campaigns
+
+
+def _demo_variants(trend: str, category: str, count: int, shared: dict = None, seen_slogans: set = None) -> list[dict]:
+    """Creates demo-mode variants with distinct slogans where the templates allow it."""
+    seen_slogans = set(seen_slogans or ())
+    slogans = [s for s in DEMO_SLOGANS if s.lower() not in seen_slogans]
+    random.shuffle(slogans)
+    posts = random.sample(DEMO_SOCIAL_POSTS, len(DEMO_SOCIAL_POSTS))
+
+    variants = []
+    for i in range(count):
+        campaign = generate_demo_campaign(trend, category)
+        if shared:
+            campaign = repair_campaign(shared, campaign)
+        else:
+            # Every variant keeps the first one's hero concept and moodboard
+            shared = {"hero_concept": campaign["hero_concept"], "moodboard": campaign["moodboard"]}
+        if i > 0 or campaign["slogan"].lower() in seen_slogans:
+            # The first variant's templated slogan may also be in the pool
+            while slogans and slogans[-1].lower() in seen_slogans:
+                slogans.pop()
+            if slogans:
+                campaign["slogan"] = slogans.pop()
+        campaign["social_post"] = posts[i % len(posts)].format(trend=trend)
+        seen_slogans.add(campaign["slogan"].lower())
+        variants.append(campaign)
+    return variants
+
+
+def generate_campaign_variants(trend: str, category: str = "general", n: int = 3) -> list[dict]:
+    """
+    Generates n campaign variants for A/B testing in a single LLM request.
+    All variants share one hero concept and moodboard; slogans and social posts differ.
+    The system prompt and round-trip are paid once regardless of n.
+
+    Args:
+        trend: The cultural trend name
+        category: Trend category (sports, entertainment, general)
+        n: Number of variants to return
+
+    Returns:
+        List of n campaign dicts (same shape as generate_campaign_for_trend)
+    """
+    n = max(1, int(n))
+    if n == 1:
+        return [generate_campaign_for_trend(trend, category)]
+
+    variants = _generate_with_providers(
+        _build_variants_prompt(trend, category, n),
+        trend,
+        openai_variants_response_format(n),
+        lambda content: _variants_from_content(content, trend, category, n)
+    )
+    if variants:
+        return variants
+
+    # Fallback to demo mode
+    return _demo_variants(trend, category, n)
@@ -0,0 +1,224 @@
+"""
+Exemplar Index Module - BM25 retrieval over past campaigns and their engagement
+Finds top-performing posts for similar trends so they can be used as few-shot examples
+"""
+import math
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Trend words count twice: similarity of trends matters more than caption wording
+TREND_WEIGHT = 2
+
+# How strongly engagement re-ranks lexically similar exemplars
+ENGAGEMENT_WEIGHT = 0.5
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int64)
+_EMPTY_TFS = np.zeros(0, dtype=np.float32)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "with", "your", "our", "we", "you", "this",
+    "that", "coca", "cola", "coke", "realmagic",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords (hashtags keep their word)."""
+    return [t for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class ExemplarIndex:
+    """
+    Incremental BM25 index over stored campaigns.
+    Each term's postings are a NumPy array plus a short list of pending appends
+    that is folded in on the next query, so adds stay cheap and a query scores
+    every matching document with a few vectorized operations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, list] = {}      # term -> [doc_ids array, tfs array, pending ids, pending tfs]
+        self._doc_ids: Dict[str, int] = {}        # post_id -> internal doc number
+        self._docs: List[Optional[dict]] = []     # internal doc number -> exemplar
+        self._doc_len = np.zeros(1024, dtype=np.float32)
+        self._engagement = np.zeros(1024, dtype=np.float32)
+        self._active = np.zeros(1024, dtype=bool)
+        self._total_len = 0.0
+        self._active_count = 0
+
+    def __len__(self) -> int:
+        return self._active_count
+
+    def _grow(self):
+        capacity = len(self._doc_len) * 2
+        for name in ("_doc_len", "_engagement", "_active"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, post_id: str, trend: str, caption: str, engagement_rate: float = 0.0):
+        """Adds (or replaces) one stored campaign in the index."""
+        terms = tokenize(trend) * TREND_WEIGHT + tokenize(caption)
+        if not terms:
+            return
+
+        with self._lock:
+            if post_id in self._doc_ids:
+                self._deactivate(self._doc_ids[post_id])
+
+            doc = len(self._docs)
+            if doc >= len(self._doc_len):
+                self._grow()
+            self._docs.append({
+                "post_id": post_id,
+                "trend": trend,
+                "caption": caption,
+            })
+            self._doc_ids[post_id] = doc
+            self._doc_len[doc] = len(terms)
+            self._engagement[doc] = engagement_rate or 0.0
+            self._active[doc] = True
+            self._total_len += len(terms)
+            self._active_count += 1
+
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = [_EMPTY_IDS, _EMPTY_TFS, [], []]
+                posting[2].append(doc)
+                posting[3].append(tf)
+
+    def _deactivate(self, doc: int):
+        if self._active[doc]:
+            self._active[doc] = False
+            self._total_len -= float(self._doc_len[doc])
+            self._active_count -= 1
+
+    def remove(self, post_id: str):
+        """Drops a post (e.g. deleted on Instagram) from future results."""
+        with self._lock:
+            doc = self._doc_ids.pop(post_id, None)
+            if doc is not None:
+                self._deactivate(doc)
+
+    def update_engagement(self, post_id: str, engagement_rate: float):
+        """Updates the engagement signal after fresh insights are fetched."""
+        with self._lock:
+            doc = self._doc_ids.get(post_id)
+            if doc is not None:
+                self._engagement[doc] = engagement_rate or 0.0
+
+    def _term_arrays(self, term: str):
+        posting = self._postings[term]
+        if posting[2]:
+            posting[0] = np.concatenate([posting[0], np.asarray(posting[2], dtype=np.int64)])
+            posting[1] = np.concatenate([posting[1], np.asarray(posting[3], dtype=np.float32)])
+            posting[2], posting[3] = [], []
+        return posting[0], posting[1]
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0,
+               min_engagement: Optional[float] = None) -> List[Dict]:
+        """
+        Returns the top-k exemplars for a trend, ranked by BM25 x engagement.
+
+        Args:
+            query: Trend name (or any text) to match against stored campaigns
+            k: Number of exemplars to return
+            min_score: Minimum BM25 score for an exemplar to count as similar
+            min_engagement: If set, only exemplars with an engagement rate above it
+
+        Returns:
+            List of dicts with post_id, trend, caption, engagement_rate and score
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or k <= 0:
+            return []
+
+        with self._lock:
+            terms = [t for t in query_terms if t in self._postings]
+            if not terms:
+                return []
+            n_docs = len(self._docs)
+            active_count = max(self._active_count, 1)
+            avg_len = self._total_len / active_count if self._total_len else 1.0
+            doc_len = self._doc_len[:n_docs]
+            active = self._active[:n_docs]
+
+            all_ids, all_scores = [], []
+            for term in terms:
+                ids, tfs = self._term_arrays(term)
+                df = int(active[ids].sum())  # Replaced and removed posts keep their postings
+                if df == 0:
+                    continue
+                idf = math.log(1 + (active_count - df + 0.5) / (df + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[ids] / avg_len)
+                all_ids.append(ids)
+                all_scores.append(idf * tfs * (BM25_K1 + 1) / (tfs + norm))
+
+            if not all_ids:
+                return []
+            ids = np.concatenate(all_ids)
+            scores = np.bincount(ids, weights=np.concatenate(all_scores), minlength=n_docs)
+            scores[~active] = 0.0
+            if min_engagement is not None:
+                scores[self._engagement[:n_docs] <= min_engagement] = 0.0
+            candidates = np.flatnonzero(scores > min_score)
+            if len(candidates) == 0:
+                return []
+
+            ranked = scores[candidates] * (1 + ENGAGEMENT_WEIGHT * np.log1p(self._engagement[candidates]))
+            if len(candidates) > k:
+                top = np.argpartition(-ranked, k)[:k]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(-ranked[top])]
+
+            results = []
+            for i in top:
+                doc = int(candidates[i])
+                exemplar = dict(self._docs[doc])
+                exemplar["engagement_rate"] = float(self._engagement[doc])
+                exemplar["score"] = round(float(ranked[i]), 3)
+                results.append(exemplar)
+            return results
+
+
+_index: Optional[ExemplarIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_exemplar_index() -> ExemplarIndex:
+    """
+    Returns the shared index, building it from post history on first use.
+    Later posts are added incrementally by post_history.save_post.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from .post_history import get_all_posts
+                index = ExemplarIndex()
+                try:
+                    for post in get_all_posts(include_deleted=False):
+                        index.add(post["post_id"], post["trend"] or "", post["caption"] or "",
+                                  post.get("engagement_rate") or 0.0)
+                except Exception as e:
+                    print(f"Could not load post history for exemplars: {e}")
+                _index = index
+    return _index
+
+
+def index_is_loaded() -> bool:
+    """True once the shared index has been built (used to skip needless loads)."""
+    return _index is not None
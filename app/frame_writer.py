@@ -0,0 +1,292 @@
+"""
+Frame Writer Module - Incremental animation encoders
+Frames are encoded and written as they arrive, so a frame generator can feed
+an animation of any length while only one frame is held in memory.
+(Pillow's save_all keeps every frame in a list until the file is written.)
+
+GIFs use one shared palette per animation: it is computed once and every frame
+is mapped onto it through a NumPy colour lookup table, instead of Pillow
+quantizing each frame separately (slow, and the palettes flicker).
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, GifImagePlugin, features
+
+ANIMATION_FORMATS = ("gif", "webp", "mp4")
+ANIMATION_MIME_TYPES = {"gif": "image/gif", "webp": "image/webp", "mp4": "video/mp4"}
+
+
+def webp_supported() -> bool:
+    """True if this Pillow build can write animated WebP."""
+    return features.check("webp")
+
+
+def _webp_encoder(size: Tuple[int, int], loop: int):
+    """Pillow's internal libwebp animation encoder (arguments mirror WebPImagePlugin._save_all)."""
+    from PIL import _webp
+
+    # size, background, loop, minimize_size, kmin, kmax, allow_mixed, verbose
+    return _webp.WebPAnimEncoder(size, 0, loop, False, 3, 5, False, False)
+
+
+@lru_cache(maxsize=None)
+def streaming_webp_supported() -> bool:
+    """
+    True if WebPWriter can stream frames through Pillow's internal WebP encoder.
+    That encoder isn't public API and its signature changes between Pillow
+    releases, so a two-frame animation is encoded once to check every call it makes.
+    """
+    try:
+        frames = [Image.new("RGB", (2, 2)), Image.new("RGB", (2, 2), "white")]
+        encoder = _webp_encoder(frames[0].size, 0)
+        for i, frame in enumerate(frames):
+            encoder.add(frame.getim(), i * 100, False, 80, 100, 0)
+        encoder.add(None, len(frames) * 100, False, 80, 100, 0)
+        return encoder.assemble("", "", "") is not None
+    except Exception as e:
+        print(f"Streaming WebP encoder unavailable in this Pillow build ({e}), buffering frames instead")
+        return False
+
+
+def resolve_animation_format(fmt: str) -> str:
+    """Normalizes a requested animation format, falling back to GIF when it can't be written here."""
+    fmt = (fmt or "gif").lower().lstrip(".")
+    if fmt not in ANIMATION_FORMATS:
+        print(f"Unknown animation format '{fmt}', using GIF")
+        return "gif"
+    if fmt == "webp" and not webp_supported():
+        print("Pillow was built without WebP support, using GIF")
+        return "gif"
+    return fmt
+
+
+class SharedPalette:
+    """
+    One 256-colour palette for a whole animation.
+    The palette comes from a median cut of sample frames; frames are then quantized
+    with a lookup table indexed by the top `bits` bits of each RGB channel. Table
+    entries are filled on first use, only for colours that actually occur.
+    """
+
+    def __init__(self, samples: List[Image.Image], colors: int = 256, bits: int = 5):
+        self.bits = bits
+        mosaic = self._mosaic(samples)
+        palette = mosaic.quantize(colors, method=Image.Quantize.MEDIANCUT).getpalette()[:colors * 3]
+        self.palette = palette + [0] * (768 - len(palette))  # GIF colour tables have 2^n entries
+        self._colors = np.array(palette, dtype=np.int32).reshape(-1, 3)
+        self._lut = np.full(1 << (3 * bits), -1, dtype=np.int16)
+        # Colour at the centre of each lookup cell
+        self._cell_centre = (np.arange(1 << bits, dtype=np.int32) << (8 - bits)) + (1 << (7 - bits))
+
+    @staticmethod
+    def _mosaic(samples: List[Image.Image], tile: int = 256) -> Image.Image:
+        """Small side-by-side copy of the samples, so the palette sees all of them."""
+        mosaic = Image.new("RGB", (tile * len(samples), tile))
+        for i, sample in enumerate(samples):
+            mosaic.paste(sample.convert("RGB").resize((tile, tile), Image.Resampling.BOX), (i * tile, 0))
+        return mosaic
+
+    def _fill(self, cells: np.ndarray):
+        """Computes the nearest palette colour for lookup cells that don't have one yet."""
+        shift = self.bits
+        mask = (1 << shift) - 1
+        rgb = np.stack([self._cell_centre[(cells >> (2 * shift)) & mask],
+                        self._cell_centre[(cells >> shift) & mask],
+                        self._cell_centre[cells & mask]], axis=1)
+        for start in range(0, len(cells), 1024):
+            chunk = rgb[start:start + 1024, None, :] - self._colors[None, :, :]
+            self._lut[cells[start:start + 1024]] = (chunk * chunk).sum(axis=2).argmin(axis=1)
+
+    def quantize(self, frame: Image.Image) -> Image.Image:
+        """Maps an RGB frame onto the shared palette (returns a "P" image)."""
+        pixels = np.asarray(frame.convert("RGB"), dtype=np.int32) >> (8 - self.bits)
+        cells = (pixels[..., 0] << (2 * self.bits)) | (pixels[..., 1] << self.bits) | pixels[..., 2]
+        present = np.flatnonzero(np.bincount(cells.ravel(), minlength=len(self._lut)))
+        missing = present[self._lut[present] < 0]
+        if len(missing):
+            self._fill(missing)
+        indexed = Image.frombytes("P", frame.size, self._lut[cells].astype(np.uint8).tobytes())
+        indexed.putpalette(self.palette)
+        return indexed
+
+
+class GifWriter:
+    """
+    Streams frames into an animated GIF with one global colour table.
+    Without `palette`, the shared palette is built from the first frame.
+    """
+
+    def __init__(self, path: str, duration: int = 100, loop: int = 0, palette: Optional[SharedPalette] = None):
+        self.path = path
+        self.duration = duration
+        self.loop = loop
+        self.palette = palette
+        self.frames_written = 0
+        self._fp = open(path, "wb")
+
+    def write(self, frame: Image.Image):
+        """Quantizes one frame against the shared palette and appends it to the file."""
+        if self.palette is None:
+            self.palette = SharedPalette([frame])
+        indexed = self.palette.quantize(frame)
+        chunks = []
+        if self.frames_written == 0:
+            chunks, _ = GifImagePlugin.getheader(indexed, info={"loop": self.loop, "duration": self.duration})
+        chunks += GifImagePlugin.getdata(indexed, duration=self.duration)
+        for chunk in chunks:
+            self._fp.write(chunk)
+        self.frames_written += 1
+
+    def close(self):
+        if self._fp.closed:
+            return
+        self._fp.write(b";")  # GIF trailer
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WebPWriter:
+    """
+    Streams frames into an animated WebP (lossy by default - much smaller than GIF,
+    with full colour). Frames go straight to libwebp's animation encoder, which
+    only keeps the compressed result; the file is written on close(). Where that
+    encoder can't be used (see streaming_webp_supported), frames are buffered
+    and written with Pillow's public save_all.
+    """
+
+    def __init__(self, path: str, duration: int = 100, loop: int = 0, quality: int = 80, method: int = 0,
+                 lossless: bool = False):
+        self.path = path
+        self.duration = duration
+        self.loop = loop
+        self.quality = quality
+        self.method = method  # 0 = fastest, 6 = smallest
+        self.lossless = lossless
+        self.frames_written = 0
+        self._encoder = None
+        self._frames: List[Image.Image] = []  # Only used without the streaming encoder
+
+    def write(self, frame: Image.Image):
+        """Compresses one frame into the animation."""
+        if frame.mode not in ("RGB", "RGBA"):
+            frame = frame.convert("RGB")
+        if not streaming_webp_supported():
+            self._frames.append(frame)  # Written with save_all on close()
+        else:
+            if self._encoder is None:
+                self._encoder = _webp_encoder(frame.size, self.loop)
+            self._encoder.add(frame.getim(), self.frames_written * self.duration, self.lossless,
+                              self.quality, 100, self.method)
+        self.frames_written += 1
+
+    def close(self):
+        if self._frames:
+            self._frames[0].save(self.path, format="WEBP", save_all=True, append_images=self._frames[1:],
+                                 duration=self.duration, loop=self.loop, quality=self.quality,
+                                 method=self.method, lossless=self.lossless)
+            self._frames = []
+        elif self._encoder is not None:
+            self._encoder.add(None, self.frames_written * self.duration, self.lossless, self.quality, 100, 0)
+            data = self._encoder.assemble("", "", "")
+            self._encoder = None
+            if data is None:
+                raise OSError("WebP encoder returned no data")
+            with open(self.path, "wb") as f:
+                f.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Mp4Writer:
+    """
+    Streams frames into an H.264 MP4 through an ffmpeg pipe (imageio-ffmpeg).
+    The frame size is taken from the first frame.
+    """
+
+    def __init__(self, path: str, fps: float = 10, quality: float = 7):
+        self.path = path
+        self.fps = fps
+        self.quality = quality
+        self.frames_written = 0
+        self._pipe = None
+        self._size: Optional[Tuple[int, int]] = None
+
+    def write(self, frame: Image.Image):
+        """Sends one frame to ffmpeg."""
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        if self._pipe is None:
+            import imageio_ffmpeg
+
+            self._size = frame.size
+            self._pipe = imageio_ffmpeg.write_frames(
+                self.path, self._size, fps=self.fps, quality=self.quality,
+                macro_block_size=2  # yuv420p only needs even dimensions
+            )
+            self._pipe.send(None)  # Start ffmpeg
+        elif frame.size != self._size:
+            frame = frame.resize(self._size, Image.Resampling.BICUBIC)
+        self._pipe.send(frame.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        if self._pipe is not None:
+            self._pipe.close()
+            self._pipe = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_frame_writer(path: str, fmt: str = "gif", duration: int = 100, loop: int = 0,
+                      palette_samples: Optional[List[Image.Image]] = None):
+    """
+    Creates an incremental writer for the given animation format.
+
+    Args:
+        path: Output file path
+        fmt: "gif", "webp" or "mp4"
+        duration: Milliseconds per frame
+        loop: Loop count for GIF/WebP (0 = forever)
+        palette_samples: Frames that represent the whole animation (GIF palette); defaults to the first frame
+
+    Returns:
+        Writer with write(frame) and close()
+    """
+    fmt = fmt.lower()
+    if fmt == "gif":
+        palette = SharedPalette(palette_samples) if palette_samples else None
+        return GifWriter(path, duration=duration, loop=loop, palette=palette)
+    if fmt == "webp":
+        return WebPWriter(path, duration=duration, loop=loop)
+    if fmt == "mp4":
+        return Mp4Writer(path, fps=1000 / duration)
+    raise ValueError(f"Unsupported animation format: {fmt}")
+
+
+def write_frames(frames: Iterable[Image.Image], path: str, fmt: str = "gif", duration: int = 100,
+                 loop: int = 0, palette_samples: Optional[List[Image.Image]] = None) -> int:
+    """
+    Encodes frames from any iterable (typically a generator) as they are produced.
+
+    Returns:
+        Number of frames written
+    """
+    with open_frame_writer(path, fmt, duration=duration, loop=loop, palette_samples=palette_samples) as writer:
+        for frame in frames:
+            writer.write(frame)
+        return writer.frames_written
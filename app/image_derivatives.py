@@ -0,0 +1,218 @@
+"""
+Image Derivatives Module - Every rendition of an image from a single decode
+The UI preview, PDF thumbnail, Instagram crops and video/animation sources all
+come from the same generated image. Instead of each consumer decoding and
+resizing it separately, the image is decoded and converted to RGB once, and each
+rendition is produced from that decode with one resample (crop and scale in a
+single boxed resize) the first time something asks for it. Decodes and
+renditions are cached in memory by the image's content hash, so a URL and a
+"store://" handle of the same bytes share them.
+
+Cached renditions are shared between sessions - treat them as read-only.
+"""
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from .config import DERIVATIVE_CACHE_IMAGES, VIDEO_SIZE
+from .image_store import get_image_store
+from .single_flight import SingleFlight
+
+# name -> (width, height, fit). "cover" crops to fill the exact size (upscaling if needed);
+# "contain" fits inside the size and never upscales.
+RENDITIONS: Dict[str, Tuple[int, int, str]] = {
+    "square": (VIDEO_SIZE, VIDEO_SIZE, "cover"),  # Instagram feed / working image of the video paths
+    "portrait": (1080, 1350, "cover"),       # Instagram 4:5 feed post
+    "story": (1080, 1920, "cover"),          # Instagram story / reel
+    "animation": (1024, 1024, "contain"),    # GIF / procedural animation source
+    "preview": (800, 800, "contain"),        # Streamlit display
+    "pdf_thumbnail": (400, 300, "contain"),  # Campaign brief cover
+}
+
+# Rendition every video path renders its frames from (see VIDEO_SIZE)
+WORKING_RENDITION = "square"
+
+
+def rendition_plan(source_size: Tuple[int, int], name: str) -> Tuple[Tuple[int, int], Tuple[float, float, float, float]]:
+    """
+    Output size and source box for a rendition.
+
+    Args:
+        source_size: (width, height) of the decoded image
+        name: Key of RENDITIONS
+
+    Returns:
+        (output size, crop box in source pixels)
+    """
+    width, height = source_size
+    target_width, target_height, fit = RENDITIONS[name]
+    if fit == "contain":
+        scale = min(target_width / width, target_height / height, 1.0)
+        return (max(1, round(width * scale)), max(1, round(height * scale))), (0, 0, width, height)
+
+    # Cover: the largest centred box with the target's aspect ratio
+    target_ratio = target_width / target_height
+    if width / height > target_ratio:
+        box_width, box_height = height * target_ratio, height
+    else:
+        box_width, box_height = width, width / target_ratio
+    left, top = (width - box_width) / 2, (height - box_height) / 2
+    return (target_width, target_height), (left, top, left + box_width, top + box_height)
+
+
+def render_derivatives(image: Image.Image, names: Iterable[str] = RENDITIONS) -> Dict[str, Image.Image]:
+    """
+    Produces renditions from one decoded image.
+
+    Args:
+        image: Decoded source image (converted to RGB once here)
+        names: Renditions to produce (default: all)
+
+    Returns:
+        name -> RGB image
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    renditions = {}
+    for name in names:
+        size, box = rendition_plan(image.size, name)
+        if size == image.size and box == (0, 0) + image.size:
+            renditions[name] = image
+        else:
+            # reducing_gap: large downscales shrink by an integer factor first (much faster, same look)
+            renditions[name] = image.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
+    return renditions
+
+
+class DerivativeCache:
+    """
+    Decoded images and their renditions, keyed by content hash (least recently used
+    images evicted). An image is decoded once; each rendition is rendered from that
+    decode the first time it is requested.
+    """
+
+    def __init__(self, max_images: int = DERIVATIVE_CACHE_IMAGES):
+        self.max_images = max_images
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # sha -> {"source": image, "renditions": {}}
+        self._decodes = SingleFlight("image-derivatives")
+        self._renders = SingleFlight("image-renditions")
+        self.stats = {"hits": 0, "decodes": 0, "renders": 0}
+
+    def _entry(self, sha: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(sha)
+            if entry is not None:
+                self._entries.move_to_end(sha)
+            return entry
+
+    def _decode(self, sha: str, load: Callable[[], Optional[bytes]]) -> Optional[dict]:
+        entry = self._entry(sha)
+        if entry is not None:
+            return entry
+        data = load()
+        if not data:
+            return None
+        with Image.open(BytesIO(data)) as image:
+            source = image.convert("RGB") if image.mode != "RGB" else image.copy()
+        entry = {"source": source, "renditions": {}}
+        with self._lock:
+            self.stats["decodes"] += 1
+            self._entries[sha] = entry
+            while len(self._entries) > self.max_images:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _render(self, entry: dict, name: str):
+        if name not in entry["renditions"]:
+            image = render_derivatives(entry["source"], [name])[name]
+            with self._lock:
+                entry["renditions"][name] = image
+                self.stats["renders"] += 1
+
+    def peek(self, sha: str, names: Iterable[str] = RENDITIONS) -> Optional[Dict[str, Image.Image]]:
+        """The requested renditions if all of them are cached already, or None (never decodes or renders)."""
+        entry = self._entry(sha)
+        if entry is None:
+            return None
+        with self._lock:
+            renditions = entry["renditions"]
+            if any(name not in renditions for name in names):
+                return None
+            self.stats["hits"] += 1
+            return {name: renditions[name] for name in names}
+
+    def get(self, sha: str, load: Callable[[], Optional[bytes]],
+            names: Iterable[str] = RENDITIONS) -> Optional[Dict[str, Image.Image]]:
+        """
+        Renditions of the image with this content hash.
+
+        Args:
+            sha: Content hash
+            load: Returns the image bytes; only called when the image isn't decoded yet
+            names: Renditions to return (missing ones are rendered now)
+
+        Returns:
+            name -> RGB image, or None if the bytes couldn't be loaded
+        """
+        names = list(names)
+        cached = self.peek(sha, names)
+        if cached is not None:
+            return cached
+        entry = self._entry(sha) or self._decodes.do(sha, self._decode, sha, load)
+        if entry is None:
+            return None
+        for name in names:
+            if name not in entry["renditions"]:
+                self._renders.do((sha, name), self._render, entry, name)
+        return {name: entry["renditions"][name] for name in names}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = DerivativeCache()
+
+
+def get_derivatives(url: str, names: Iterable[str] = RENDITIONS,
+                    timeout: int = 30) -> Optional[Dict[str, Image.Image]]:
+    """
+    Renditions of a URL's (or store handle's) image, from the shared image store.
+    Only the requested renditions are rendered.
+
+    Returns:
+        name -> RGB image, or None if the image can't be downloaded or decoded
+    """
+    store = get_image_store()
+    sha = store.fetch(url, timeout)
+    if not sha:
+        return None
+    try:
+        return _cache.get(sha, lambda: store.get_bytes(sha), names)
+    except Exception as e:
+        print(f"Could not decode image {sha[:12]}: {e}")
+        return None
+
+
+def get_derivative(url: str, name: str, timeout: int = 30) -> Optional[Image.Image]:
+    """One rendition (see RENDITIONS) of a URL's image, or None. Read-only - copy before drawing on it."""
+    derivatives = get_derivatives(url, [name], timeout)
+    return derivatives[name] if derivatives else None
+
+
+def get_derivative_bytes(url: str, name: str, fmt: str = "JPEG", quality: int = 90,
+                         timeout: int = 30) -> Optional[bytes]:
+    """A rendition encoded as JPEG (default) or PNG bytes, or None."""
+    image = get_derivative(url, name, timeout)
+    if image is None:
+        return None
+    buffer = BytesIO()
+    if fmt.upper() == "JPEG":
+        image.save(buffer, format="JPEG", quality=quality)
+    else:
+        image.save(buffer, format=fmt)
+    return buffer.getvalue()
@@ -0,0 +1,72 @@
+"""
+Image Hash Module - Perceptual hashes for spotting near-duplicate images
+Pollinations gives every seed a distinct URL even when two images look almost
+the same; aHash/dHash compare what the images actually look like.
+"""
+from io import BytesIO
+from typing import Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .config import IMAGE_DEDUP_DISTANCE
+
+HASH_SIZE = 8  # 8x8 bits = 64-bit hashes
+
+
+def _pack_bits(bits: np.ndarray) -> int:
+    """Packs a boolean array into one integer (row-major, first bit most significant)."""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def _grayscale(image: Union[bytes, Image.Image], size: Tuple[int, int]) -> np.ndarray:
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(BytesIO(image))
+        # Let the JPEG decoder downscale while decoding - much cheaper than a full decode
+        image.draft("L", (size[0] * 8, size[1] * 8))
+    return np.asarray(image.convert("L").resize(size, Image.Resampling.BOX), dtype=np.float32)
+
+
+def average_hash(image: Union[bytes, Image.Image], hash_size: int = HASH_SIZE) -> int:
+    """aHash: which cells of a tiny grayscale thumbnail are brighter than the mean."""
+    pixels = _grayscale(image, (hash_size, hash_size))
+    return _pack_bits(pixels > pixels.mean())
+
+
+def difference_hash(image: Union[bytes, Image.Image], hash_size: int = HASH_SIZE) -> int:
+    """dHash: whether brightness increases left-to-right between neighbouring cells."""
+    pixels = _grayscale(image, (hash_size + 1, hash_size))
+    return _pack_bits(pixels[:, 1:] > pixels[:, :-1])
+
+
+def image_hashes(image: Union[bytes, Image.Image], hash_size: int = HASH_SIZE) -> Tuple[int, int]:
+    """
+    Computes (aHash, dHash) from a single decode.
+
+    Args:
+        image: Encoded image bytes or a PIL image
+
+    Returns:
+        Tuple of two 64-bit integer hashes
+    """
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(BytesIO(image))
+        image.draft("L", (hash_size * 8, hash_size * 8))
+    # One shared small grayscale copy feeds both hashes
+    small = image.convert("L").resize(((hash_size + 1) * 4, hash_size * 4), Image.Resampling.BOX)
+    return average_hash(small, hash_size), difference_hash(small, hash_size)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def hash_distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    """Distance between two (aHash, dHash) pairs - the larger of the two bit distances."""
+    return max(hamming_distance(a[0], b[0]), hamming_distance(a[1], b[1]))
+
+
+def is_near_duplicate(a: Tuple[int, int], b: Tuple[int, int], threshold: int = IMAGE_DEDUP_DISTANCE) -> bool:
+    """True if both hashes are within `threshold` bits (a negative threshold disables the check)."""
+    return threshold >= 0 and hash_distance(a, b) <= threshold
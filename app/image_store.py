@@ -0,0 +1,386 @@
+"""
+Image Store Module - Content-addressed local blob store for generated images
+Every pipeline stage (UI, PDF, GIF, video) reads image bytes from here, so a
+generated image is downloaded once instead of once per stage.
+Blobs are keyed by SHA-256 of their content; a URL -> hash map remembers what
+each URL resolved to. Least recently used blobs are evicted past the size cap.
+Images that never had a URL (e.g. base64 API responses) get a
+"store://<sha>" handle that every reader accepts in place of a URL. There is
+nothing to download those from again, so they are evicted last - only once no
+cached download is left to drop - least recently used first. The size cap still
+holds, so a handle can expire after many newer handle-only images; readers then
+get None, like for any image that can't be fetched.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from .config import IMAGE_STORE_DIR, IMAGE_STORE_MAX_MB, IMAGE_DOWNLOAD_TIMEOUT, IMAGE_PREFETCH_WORKERS
+from .single_flight import SingleFlight
+
+STORE_URL_PREFIX = "store://"
+
+
+def is_store_handle(url: str) -> bool:
+    """True for "store://<sha>" handles of images that only exist in the local store."""
+    return isinstance(url, str) and url.startswith(STORE_URL_PREFIX)
+
+
+def handle_for(sha: str) -> str:
+    """Handle for a stored blob, usable wherever an image URL is expected (valid while it is stored)."""
+    return f"{STORE_URL_PREFIX}{sha}"
+
+
+# Magic numbers of the image formats the pipeline produces or downloads
+_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+    (b"BM", "image/bmp", ".bmp"),
+]
+
+
+def sniff_content_type(data: bytes) -> Optional[str]:
+    """Detects the image type from its first bytes (None if not a known image)."""
+    if not data:
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type, _ in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return None
+
+
+def _extension(data: bytes) -> str:
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    for signature, _, ext in _SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    return ".img"
+
+
+class ImageStore:
+    """
+    Size-capped, content-addressed image cache on local disk.
+    Blob files live at <root>/<sha[:2]>/<sha>.<ext>; their mtime is the LRU
+    clock, so recency survives restarts. The URL map and handle-only blobs are kept in SQLite.
+    """
+
+    def __init__(self, root: str = IMAGE_STORE_DIR, max_bytes: int = IMAGE_STORE_MAX_MB * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.db_path = str(self.root / "index.db")
+        self._lock = threading.Lock()
+        self._blobs: "OrderedDict[str, tuple]" = OrderedDict()  # sha -> (path, size), oldest first
+        self._urls: Dict[str, str] = {}                         # url -> sha
+        self._handle_only: set = set()                          # shas stored without a URL (evicted last)
+        self._total_bytes = 0
+        self._downloads = SingleFlight("image-download")
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=max(1, IMAGE_PREFETCH_WORKERS),
+                                                     thread_name_prefix="image-prefetch")
+        self._prefetches: Dict[str, Future] = {}
+        self.stats = {"hits": 0, "downloads": 0, "failed_downloads": 0, "evictions": 0}
+        self._load()
+
+    def _load(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha TEXT,
+                stored_at TIMESTAMP
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS handle_only (
+                sha TEXT PRIMARY KEY,
+                stored_at TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        self._urls = dict(c.execute('SELECT url, sha FROM urls').fetchall())
+        self._handle_only = {row[0] for row in c.execute('SELECT sha FROM handle_only').fetchall()}
+        conn.close()
+
+        blobs = []
+        for path in self.root.glob("??/*"):
+            if path.suffix == ".tmp":
+                continue
+            stat = path.stat()
+            blobs.append((stat.st_mtime, path.stem, str(path), stat.st_size))
+        for _, sha, path, size in sorted(blobs):
+            self._blobs[sha] = (path, size)
+            self._total_bytes += size
+
+    def _execute(self, query: str, params: tuple):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(query, params)
+        conn.commit()
+        conn.close()
+
+    def put_bytes(self, data: bytes, url: str = None) -> str:
+        """
+        Stores image bytes (deduplicated by content) and optionally maps a URL to them.
+        Bytes stored without a URL can only be reached through their "store://"
+        handle, so eviction drops them after every cached download.
+
+        Returns:
+            SHA-256 hex digest identifying the blob
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if sha in self._blobs:
+                self._touch(sha)
+            else:
+                path = self.root / sha[:2] / f"{sha}{_extension(data)}"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so readers never see a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._blobs[sha] = (str(path), len(data))
+                self._total_bytes += len(data)
+            if not url and sha not in self._handle_only:
+                self._handle_only.add(sha)
+                self._execute('INSERT OR REPLACE INTO handle_only (sha, stored_at) VALUES (?, ?)',
+                              (sha, datetime.now().isoformat()))
+            if url and self._urls.get(url) != sha:
+                self._urls[url] = sha
+                self._execute('INSERT OR REPLACE INTO urls (url, sha, stored_at) VALUES (?, ?, ?)',
+                              (url, sha, datetime.now().isoformat()))
+            self._evict()
+        return sha
+
+    def _touch(self, sha: str):
+        """Marks a blob as most recently used (caller holds the lock)."""
+        self._blobs.move_to_end(sha)
+        try:
+            os.utime(self._blobs[sha][0], None)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Drops blobs until under the size cap (caller holds the lock): least recently
+        used downloads first, then handle-only blobs. The newest blob always stays.
+        """
+        candidates = list(self._blobs)[:-1]
+        for handle_only in (False, True):
+            for sha in candidates:
+                if self._total_bytes <= self.max_bytes:
+                    return
+                if (sha in self._handle_only) == handle_only and sha in self._blobs:
+                    self._drop(sha)
+
+    def _drop(self, sha: str):
+        """Deletes one blob and everything pointing at it (caller holds the lock)."""
+        path, size = self._blobs.pop(sha)
+        self._total_bytes -= size
+        self.stats["evictions"] += 1
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        for url in [u for u, s in self._urls.items() if s == sha]:
+            del self._urls[url]
+        self._execute('DELETE FROM urls WHERE sha = ?', (sha,))
+        if sha in self._handle_only:
+            self._handle_only.discard(sha)
+            self._execute('DELETE FROM handle_only WHERE sha = ?', (sha,))
+
+    def path_for(self, sha: str) -> Optional[str]:
+        """Path of a stored blob, or None if it isn't (or is no longer) stored."""
+        with self._lock:
+            blob = self._blobs.get(sha)
+            if blob is None or not os.path.exists(blob[0]):
+                return None
+            self._touch(sha)
+            return blob[0]
+
+    def get_bytes(self, sha: str) -> Optional[bytes]:
+        """Bytes of a stored blob by content hash."""
+        path = self.path_for(sha)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Content hash a URL (or store handle) resolved to, if its blob is still stored."""
+        with self._lock:
+            sha = url[len(STORE_URL_PREFIX):] if is_store_handle(url) else self._urls.get(url)
+            if sha is None or sha not in self._blobs:
+                return None
+            return sha
+
+    def contains(self, url: str) -> bool:
+        """True if the URL's image is available locally without a download."""
+        return self.lookup(url) is not None
+
+    def _cached_sha(self, url: str) -> Optional[str]:
+        sha = self.lookup(url)
+        if sha and self.path_for(sha):
+            self.stats["hits"] += 1
+            return sha
+        return None
+
+    def fetch(self, url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Optional[str]:
+        """
+        Makes sure a URL's image is stored locally, downloading it at most once
+        at a time (concurrent callers for the same URL share one download).
+
+        Returns:
+            Content hash, or None if the image could not be downloaded
+        """
+        if not url:
+            return None
+        sha = self._cached_sha(url)
+        if sha:
+            return sha
+        if is_store_handle(url):
+            print(f"Stored image {url[len(STORE_URL_PREFIX):][:12]} is no longer in the image store")
+            return None  # Nothing to download from
+        return self._downloads.do(url, self._download, url, timeout)
+
+    def _download(self, url: str, timeout: int) -> Optional[str]:
+        sha = self._cached_sha(url)  # Finished while we were queued behind another download
+        if sha:
+            return sha
+
+        for attempt in range(2):
+            try:
+                response = requests.get(url, timeout=timeout)
+                content_type = response.headers.get("content-type", "")
+                if response.status_code == 200 and response.content and (
+                        content_type.startswith("image/") or sniff_content_type(response.content)):
+                    self.stats["downloads"] += 1
+                    return self.put_bytes(response.content, url)
+                print(f"Image download failed ({response.status_code}, {content_type or 'no content type'}): {url[:80]}")
+            except Exception as e:
+                print(f"Image download attempt {attempt + 1} failed: {e}")
+            if attempt == 0:
+                time.sleep(1)
+        self.stats["failed_downloads"] += 1
+        return None
+
+    def prefetch(self, url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Future:
+        """
+        Starts downloading a URL's image in the background.
+        Consumers that ask for the URL meanwhile join the same download.
+
+        Returns:
+            Future resolving to the content hash (None if the download failed)
+        """
+        with self._lock:
+            future = self._prefetches.get(url)
+            if future is not None:
+                return future
+            future = self._prefetches[url] = self._prefetch_executor.submit(self.fetch, url, timeout)
+        future.add_done_callback(lambda f: self._forget_prefetch(url, f))
+        return future
+
+    def _forget_prefetch(self, url: str, future: Future):
+        with self._lock:
+            if self._prefetches.get(url) is future:
+                del self._prefetches[url]
+
+    def is_ready(self, url: str) -> bool:
+        """True once the URL's image is stored locally (reading it won't block)."""
+        return self.contains(url)
+
+    def is_pending(self, url: str) -> bool:
+        """True while a background prefetch for the URL is running."""
+        with self._lock:
+            return url in self._prefetches
+
+    def wait(self, url: str, timeout: float = None) -> bool:
+        """
+        Waits for a pending prefetch of the URL (returns immediately if there is none).
+
+        Returns:
+            True if the image is stored locally afterwards
+        """
+        with self._lock:
+            future = self._prefetches.get(url)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.is_ready(url)
+
+    def get_image_bytes(self, url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Optional[bytes]:
+        """Image bytes for a URL, from the local store or downloaded once."""
+        sha = self.fetch(url, timeout)
+        return self.get_bytes(sha) if sha else None
+
+    def get_image_path(self, url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Optional[str]:
+        """
+        Local file path of a URL's image (downloaded once if needed).
+        The file belongs to the store - copy it instead of modifying or deleting it.
+        """
+        sha = self.fetch(url, timeout)
+        return self.path_for(sha) if sha else None
+
+
+_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Returns the shared store, created on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ImageStore()
+    return _store
+
+
+def get_image_bytes(url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Optional[bytes]:
+    """Image bytes for a URL via the shared store (None if it can't be downloaded)."""
+    return get_image_store().get_image_bytes(url, timeout)
+
+
+def get_image_path(url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Optional[str]:
+    """Local path of a URL's image via the shared store (read-only)."""
+    return get_image_store().get_image_path(url, timeout)
+
+
+def prefetch(url: str, timeout: int = IMAGE_DOWNLOAD_TIMEOUT) -> Future:
+    """Starts a background download of a URL's image into the shared store."""
+    return get_image_store().prefetch(url, timeout)
+
+
+def is_ready(url: str) -> bool:
+    """True once the URL's image is in the shared store."""
+    return get_image_store().is_ready(url)
+
+
+def put_bytes(data: bytes, url: str = None) -> str:
+    """Adds image bytes to the shared store, returning their content hash."""
+    return get_image_store().put_bytes(data, url)
+
+
+def store_image(data: bytes) -> str:
+    """Adds image bytes to the shared store and returns their "store://<sha>" handle."""
+    return handle_for(get_image_store().put_bytes(data))
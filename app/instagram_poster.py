@@ -8,6 +8,8 @@ import os
 import time
 from typing import Optional
 
+from .image_store import is_store_handle
+
 
 def post_to_instagram(
     image_url: str,
@@ -79,6 +81,12 @@ def post_to_instagram(
         media_url = f"https://graph.instagram.com/{account_id}/media"
         
         # Post as image (original behavior or fallback)
+        if is_store_handle(image_url):
+            return {
+                "success": False,
+                "error": "This image only exists in the local image store (DALLE_RESPONSE_FORMAT=b64_json). Instagram requires publicly accessible image URLs."
+            }
+        
         # Check if image URL is accessible
         try:
             image_check = requests.head(image_url, timeout=5, allow_redirects=True)
@@ -0,0 +1,155 @@
+"""
+Ken Burns Module - Zoom-in / zoom-out frame synthesis for animated fallbacks
+Each distinct zoom + brightness frame is rendered once: a single boxed resample
+does the centre crop and the scale-up, and a lookup table applies the brightness
+pulse. The zoom-out half reuses the zoom-in frames: iter_ken_burns_frames()
+yields the loop as it is rendered and only keeps the frames it will show again
+(at most num_frames - 2, whatever the image size), so incremental encoders get
+both the reuse and bounded memory.
+
+A base zoom (e.g. the multi-scene video's scene crop) is folded into the same
+resample, so a video frame is one resize of the working image, never a chain.
+"""
+from collections import Counter
+from functools import lru_cache
+from io import BytesIO
+from typing import Iterator, List, Tuple, Union
+
+from PIL import Image
+
+KEN_BURNS_FRAMES = 20        # Distinct frames in the zoom-in half
+KEN_BURNS_ZOOM = 0.1         # Zoom goes from 1.0 to 1.1
+KEN_BURNS_BRIGHTNESS = 0.15  # Brightness pulse goes up to +15%
+
+
+def prepare_source_image(image: Union[bytes, Image.Image], max_size: int = 1024) -> Image.Image:
+    """Decodes (if needed), converts to RGB and caps the longest side at max_size."""
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(BytesIO(image))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.width > max_size or image.height > max_size:
+        image = image.copy()
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return image
+
+
+def ken_burns_params(index: int, num_frames: int = KEN_BURNS_FRAMES, base_zoom: float = 1.0) -> Tuple[float, float]:
+    """(zoom, brightness) of frame `index` in the zoom-in half; base_zoom multiplies the whole zoom range."""
+    progress = index / num_frames
+    zoom = base_zoom * (1.0 + KEN_BURNS_ZOOM * progress)
+    brightness = 1.0 + KEN_BURNS_BRIGHTNESS * (0.5 + 0.5 * progress)
+    return zoom, brightness
+
+
+def ping_pong_order(num_frames: int = KEN_BURNS_FRAMES) -> List[int]:
+    """Frame indices for a seamless loop: zoom in, then back out without repeating the ends."""
+    return list(range(num_frames)) + list(range(num_frames - 2, 0, -1))
+
+
+@lru_cache(maxsize=64)
+def _brightness_lut(factor: float, bands: int = 3) -> Tuple[int, ...]:
+    """Per-band lookup table equivalent to ImageEnhance.Brightness(factor)."""
+    table = [min(255, int(value * factor + 0.5)) for value in range(256)]
+    return tuple(table * bands)
+
+
+def zoom_box(size: Tuple[int, int], zoom: float) -> Tuple[int, int, int, int]:
+    """Centre crop box (left, top, right, bottom) that fills `size` at the given zoom."""
+    width, height = size
+    new_width = int(width / zoom)
+    new_height = int(height / zoom)
+    left = (width - new_width) // 2
+    top = (height - new_height) // 2
+    return left, top, left + new_width, top + new_height
+
+
+def view_box(source_size: Tuple[int, int], output_size: Tuple[int, int],
+             zoom: float = 1.0) -> Tuple[float, float, float, float]:
+    """
+    Centre box of the source that, resized to output_size, gives the final view:
+    cropped to the output's aspect ratio (cover), then zoomed in by `zoom`.
+    """
+    width, height = source_size
+    output_ratio = output_size[0] / output_size[1]
+    if width / height > output_ratio:
+        box_width, box_height = height * output_ratio, height
+    else:
+        box_width, box_height = width, width / output_ratio
+    box_width, box_height = box_width / zoom, box_height / zoom
+    left, top = (width - box_width) / 2, (height - box_height) / 2
+    return left, top, left + box_width, top + box_height
+
+
+def render_frame(image: Image.Image, zoom: float, brightness: float,
+                 resample: Image.Resampling = Image.Resampling.BICUBIC) -> Image.Image:
+    """
+    Renders one Ken Burns frame from an RGB image.
+
+    Args:
+        image: Source image (RGB)
+        zoom: Zoom factor (1.0 = full image)
+        brightness: Brightness multiplier (1.0 = unchanged)
+        resample: Resampling filter for the crop + scale-up
+
+    Returns:
+        Frame the same size as the source image
+    """
+    if zoom == 1.0:
+        frame = image.copy()
+    else:
+        frame = image.resize(image.size, resample, box=zoom_box(image.size, zoom))
+    if brightness != 1.0:
+        frame = frame.point(_brightness_lut(brightness, len(frame.getbands())))
+    return frame
+
+
+def ken_burns_frames(image: Image.Image, num_frames: int = KEN_BURNS_FRAMES, base_zoom: float = 1.0) -> List[Image.Image]:
+    """
+    Builds the full zoom-in / zoom-out loop.
+
+    Args:
+        image: Source image (RGB)
+        num_frames: Distinct frames in the zoom-in half
+        base_zoom: Constant zoom applied on top of the Ken Burns zoom
+
+    Returns:
+        List of 2 * num_frames - 2 frames; the zoom-out half shares frame objects with the zoom-in half
+    """
+    return list(iter_ken_burns_frames(image, num_frames, base_zoom))
+
+
+def iter_ken_burns_frames(image: Image.Image, num_frames: int = KEN_BURNS_FRAMES,
+                          base_zoom: float = 1.0) -> Iterator[Image.Image]:
+    """
+    Yields the zoom-in / zoom-out loop one frame at a time, rendering each distinct
+    frame once. A zoom-in frame is held until the zoom-out half has shown it again,
+    so at most num_frames - 2 frames are alive. Treat yielded frames as read-only:
+    the same object is yielded twice.
+
+    Args:
+        image: Source image (RGB)
+        num_frames: Distinct frames in the zoom-in half
+        base_zoom: Constant zoom applied on top of the Ken Burns zoom
+    """
+    order = ping_pong_order(num_frames)
+    uses_left = Counter(order)
+    kept = {}
+    for i in order:
+        frame = kept.pop(i, None) or render_frame(image, *ken_burns_params(i, num_frames, base_zoom))
+        uses_left[i] -= 1
+        if uses_left[i]:
+            kept[i] = frame
+        yield frame
+
+
+def ken_burns_frame_at(t: float, num_frames: int = KEN_BURNS_FRAMES, frame_ms: int = 100) -> int:
+    """Zoom-in frame index shown at time t (seconds) of an endlessly repeating loop."""
+    order = ping_pong_order(num_frames)
+    return order[int(t * 1000 // frame_ms) % len(order)]
+
+
+def ken_burns_palette_samples(image: Image.Image, num_frames: int = KEN_BURNS_FRAMES,
+                              base_zoom: float = 1.0) -> List[Image.Image]:
+    """The widest/dimmest and closest/brightest frames - together they cover every colour in the loop."""
+    return [render_frame(image, *ken_burns_params(i, num_frames, base_zoom)) for i in (0, num_frames - 1)]
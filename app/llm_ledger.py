@@ -0,0 +1,187 @@
+"""
+LLM Ledger Module - Records every provider call with latency, tokens and cost
+Answers "how long does generation take and what does it cost per trend?"
+"""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .config import LLM_PRICING
+
+
+# Database setup
+DB_PATH = "data/llm_ledger.db"
+
+_init_lock = threading.Lock()
+_initialized_path = None
+
+
+def init_database():
+    """Initialize the SQLite database for the LLM call ledger."""
+    global _initialized_path
+    with _init_lock:
+        if _initialized_path == DB_PATH:
+            return
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                called_at TIMESTAMP,
+                provider TEXT,
+                model TEXT,
+                trend TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                latency_ms REAL,
+                success INTEGER,
+                fallback_reason TEXT,
+                cost_usd REAL DEFAULT 0
+            )
+        ''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_called_at ON llm_calls (called_at)')
+        conn.commit()
+        conn.close()
+        _initialized_path = DB_PATH
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of one call from the per-million-token price table."""
+    prices = LLM_PRICING.get(model)
+    if not prices:
+        return 0.0
+    return (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1_000_000
+
+
+def record_call(
+    provider: str,
+    model: str,
+    latency_ms: float,
+    success: bool,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    fallback_reason: str = None,
+    trend: str = None
+):
+    """
+    Save one provider call to the ledger.
+    Never raises - accounting must not break generation.
+    """
+    try:
+        init_database()
+        prompt_tokens = prompt_tokens or 0
+        completion_tokens = completion_tokens or 0
+        conn = sqlite3.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute('''
+            INSERT INTO llm_calls (called_at, provider, model, trend, prompt_tokens, completion_tokens,
+                                   latency_ms, success, fallback_reason, cost_usd)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            datetime.now().isoformat(), provider, model, trend, prompt_tokens, completion_tokens,
+            round(latency_ms, 1), int(bool(success)), (fallback_reason or "")[:300] or None,
+            estimate_cost(model, prompt_tokens, completion_tokens)
+        ))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Could not record LLM call: {e}")
+
+
+def get_recent_calls(limit: int = 50) -> List[Dict]:
+    """Most recent ledger entries, newest first."""
+    init_database()
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute('SELECT * FROM llm_calls ORDER BY id DESC LIMIT ?', (limit,))
+    calls = [dict(row) for row in c.fetchall()]
+    conn.close()
+    for call in calls:
+        call['success'] = bool(call['success'])
+    return calls
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank style percentile with linear interpolation."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_percentiles(days: int = 7, provider: Optional[str] = None, successful_only: bool = True) -> Dict[str, Dict]:
+    """
+    p50/p95 latency per provider over the last `days` days.
+
+    Returns:
+        {provider: {"p50": ms, "p95": ms, "calls": n}}
+    """
+    init_database()
+    since = (datetime.now() - timedelta(days=days)).isoformat()
+    query = 'SELECT provider, latency_ms FROM llm_calls WHERE called_at >= ?'
+    params = [since]
+    if provider:
+        query += ' AND provider = ?'
+        params.append(provider)
+    if successful_only:
+        query += ' AND success = 1'
+    query += ' ORDER BY provider, latency_ms'
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(query, params)
+    by_provider: Dict[str, List[float]] = {}
+    for name, latency in c.fetchall():
+        by_provider.setdefault(name, []).append(latency)
+    conn.close()
+
+    return {
+        name: {
+            "p50": round(_percentile(values, 50), 1),
+            "p95": round(_percentile(values, 95), 1),
+            "calls": len(values),
+        }
+        for name, values in by_provider.items()
+    }
+
+
+def daily_spend(days: int = 7, provider: Optional[str] = None) -> List[Dict]:
+    """
+    Estimated spend per provider per day, newest day first.
+
+    Returns:
+        List of {"day", "provider", "calls", "failures", "prompt_tokens", "completion_tokens", "cost_usd"}
+    """
+    init_database()
+    since = (datetime.now() - timedelta(days=days)).isoformat()
+    query = '''
+        SELECT substr(called_at, 1, 10) AS day, provider, COUNT(*), SUM(1 - success),
+               SUM(prompt_tokens), SUM(completion_tokens), SUM(cost_usd)
+        FROM llm_calls WHERE called_at >= ?
+    '''
+    params = [since]
+    if provider:
+        query += ' AND provider = ?'
+        params.append(provider)
+    query += ' GROUP BY day, provider ORDER BY day DESC, provider'
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(query, params)
+    rows = []
+    for day, name, calls, failures, prompt_tokens, completion_tokens, cost in c.fetchall():
+        rows.append({
+            "day": day,
+            "provider": name,
+            "calls": calls,
+            "failures": failures or 0,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "cost_usd": round(cost or 0.0, 6),
+        })
+    conn.close()
+    return rows
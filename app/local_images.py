@@ -0,0 +1,115 @@
+"""
+Local Images Module - Offline stand-in for the image generation APIs
+Renders a deterministic, Coca-Cola styled picture for a prompt with NumPy and
+Pillow: a two-tone gradient backdrop, soft bokeh lights, a stylised bottle and
+confetti. The layout is seeded from the prompt text, so the same prompt always
+gives the same bytes and every variation of a multi-scene set looks different.
+
+Used by IMAGE_BACKEND=local to run and benchmark the whole pipeline (GIF, PDF,
+video) without network access or API noise. The images are not meant to look
+like real campaign art.
+"""
+import hashlib
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+COKE_RED = (244, 0, 9)
+
+# Backdrop colour pairs (top, bottom)
+BACKDROPS = [
+    ((244, 0, 9), (120, 0, 10)),        # Coca-Cola red
+    ((20, 12, 40), (150, 20, 30)),      # Night event
+    ((30, 70, 140), (200, 220, 240)),   # Daylight / stadium
+    ((250, 235, 215), (230, 120, 60)),  # Warm sunset
+    ((10, 40, 30), (60, 140, 90)),      # Outdoor / festival green
+]
+
+
+def prompt_seed(text: str, seed: int = 0) -> int:
+    """Stable 64-bit seed for a prompt (same text -> same image); `seed` picks another image set."""
+    digest = hashlib.sha256(f"{seed}:{text}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _backdrop(rng: np.random.Generator, size: int) -> Image.Image:
+    top, bottom = (np.array(c, dtype=np.float32) for c in BACKDROPS[rng.integers(len(BACKDROPS))])
+    angle = rng.uniform(-0.6, 0.6)  # Tilted gradient
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    t = np.clip(ys + angle * (xs - 0.5), 0, 1)[..., None]
+    return Image.fromarray((top * (1 - t) + bottom * t).astype(np.uint8))
+
+
+def _bokeh(rng: np.random.Generator, size: int) -> Image.Image:
+    """Blurred light spots, as an RGBA layer."""
+    layer = Image.new("RGBA", (size, size), (255, 255, 255, 0))  # White, so blurred edges don't darken
+    draw = ImageDraw.Draw(layer)
+    for _ in range(rng.integers(12, 30)):
+        radius = size * rng.uniform(0.02, 0.09)
+        x, y = rng.uniform(0, size, 2)
+        warm = rng.random() < 0.5
+        color = (255, 210, 150) if warm else (255, 255, 255)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color + (int(rng.uniform(40, 120)),))
+    return layer.filter(ImageFilter.GaussianBlur(size / 100))
+
+
+def _bottle(draw: ImageDraw.ImageDraw, rng: np.random.Generator, size: int):
+    """Stylised contour bottle: body, neck, cap and a white ribbon."""
+    height = size * rng.uniform(0.45, 0.7)
+    width = height * 0.3
+    cx = size * rng.uniform(0.3, 0.7)
+    bottom = size * rng.uniform(0.85, 0.95)
+    top = bottom - height
+    neck_top = top + height * 0.08
+    shoulder = top + height * 0.35
+
+    draw.rounded_rectangle((cx - width / 2, shoulder, cx + width / 2, bottom), radius=width * 0.25, fill=COKE_RED)
+    draw.polygon([(cx - width / 2, shoulder + width * 0.2), (cx - width * 0.18, neck_top),
+                  (cx + width * 0.18, neck_top), (cx + width / 2, shoulder + width * 0.2)], fill=COKE_RED)
+    draw.rectangle((cx - width * 0.2, top, cx + width * 0.2, neck_top), fill=(200, 0, 10))  # Cap
+    # Ribbon wave across the label
+    label_y = shoulder + (bottom - shoulder) * 0.35
+    points = [(cx - width / 2 + width * i / 12,
+               label_y + width * 0.12 * np.sin(i / 12 * 2 * np.pi)) for i in range(13)]
+    draw.line(points, fill="white", width=max(2, int(width * 0.08)))
+    # Highlight
+    draw.line([(cx - width * 0.3, shoulder + width * 0.3), (cx - width * 0.3, bottom - width * 0.3)],
+              fill=(255, 120, 120), width=max(1, int(width * 0.05)))
+
+
+def _confetti(draw: ImageDraw.ImageDraw, rng: np.random.Generator, size: int):
+    for _ in range(rng.integers(40, 120)):
+        x, y = rng.uniform(0, size, 2)
+        w, h = size * rng.uniform(0.004, 0.012, 2)
+        color = COKE_RED if rng.random() < 0.6 else (255, 255, 255)
+        draw.rectangle((x, y, x + w, y + h), fill=color)
+
+
+def render_local_image(text: str, size: int = 1024, seed: int = 0) -> Image.Image:
+    """
+    Renders the stand-in image for a prompt.
+
+    Args:
+        text: Prompt text (only used to seed the layout)
+        size: Square image size in pixels
+        seed: Image set; change it to get a different picture for the same prompt
+
+    Returns:
+        RGB image
+    """
+    rng = np.random.default_rng(prompt_seed(text, seed))
+    image = _backdrop(rng, size).convert("RGBA")
+    image.alpha_composite(_bokeh(rng, size))
+    draw = ImageDraw.Draw(image)
+    _bottle(draw, rng, size)
+    _confetti(draw, rng, size)
+    return image.convert("RGB")
+
+
+def local_image_bytes(text: str, size: int = 1024, seed: int = 0, quality: int = 90) -> bytes:
+    """The stand-in image as JPEG bytes (deterministic for a given Pillow build)."""
+    buffer = BytesIO()
+    render_local_image(text, size, seed).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
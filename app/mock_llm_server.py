@@ -0,0 +1,257 @@
+"""
+Mock LLM Server - Local OpenAI/Groq-compatible stand-in for load testing
+Serves chat completions with configurable latency, errors, rate limits and
+malformed JSON so the generation path can be benchmarked without real quota.
+
+Run it:
+    python -m app.mock_llm_server --port 8765 --latency-ms 800 --error-rate 0.05
+
+Then point the app at it (any API key works):
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    GROQ_BASE_URL=http://127.0.0.1:8765
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Paths used by the OpenAI SDK (base_url .../v1) and the Groq SDK (base_url root)
+CHAT_PATHS = {"/v1/chat/completions", "/openai/v1/chat/completions", "/chat/completions"}
+
+
+class MockLLMConfig:
+    """
+    Behaviour knobs for the mock server.
+
+    Args:
+        latency_ms: Median response latency
+        latency_sigma: Spread of the log-normal latency distribution (0 = fixed latency)
+        error_rate: Fraction of requests answered with a 500
+        rate_limit_rate: Fraction of requests answered with a 429 + retry-after
+        malformed_rate: Fraction of successful responses with broken/truncated JSON
+        seed: Random seed for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 500.0,
+        latency_sigma: float = 0.3,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "malformed": 0}
+
+    def draw(self) -> tuple[int, float, str]:
+        """Numbers this request and picks its latency (seconds) and outcome."""
+        with self.lock:
+            self.stats["requests"] += 1
+            number = self.stats["requests"]
+            latency = self.latency_ms / 1000
+            if self.latency_sigma > 0:
+                latency *= self.random.lognormvariate(0, self.latency_sigma)
+            roll = self.random.random()
+            if roll < self.error_rate:
+                outcome = "errors"
+            elif roll < self.error_rate + self.rate_limit_rate:
+                outcome = "rate_limited"
+            elif self.random.random() < self.malformed_rate:
+                outcome = "malformed"
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+            return number, latency, outcome
+
+    def truncate_at(self, length: int) -> int:
+        with self.lock:
+            return self.random.randint(length // 3, max(length // 3 + 1, length - 2))
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _build_campaign(trend: str, angle: int = 0) -> dict:
+    angles = ["Together", "Cheers to", "Feel the", "Share", "Open"]
+    return {
+        "hero_concept": f"Friends gather for {trend}, sharing ice-cold Coca-Cola as the moment unfolds. "
+                        f"Every cheer and every laugh around {trend} turns into Real Magic.",
+        "slogan": f"{angles[angle % len(angles)]} {trend} Magic",
+        "social_post": f"{trend} is here! Grab your people and an ice-cold Coke. #RealMagic #{re.sub(r'[^A-Za-z0-9]', '', trend)}",
+        "moodboard": f"Coca-Cola red and white, {trend} crowds, golden hour, candid smiles, cinematic wide shots",
+    }
+
+
+def build_completion_content(messages: list) -> str:
+    """
+    Creates a plausible campaign JSON answer for the last user message.
+    Recognises the single-campaign and multi-variant prompts from creative_engine.
+    """
+    prompt = ""
+    for message in messages:
+        if message.get("role") == "user":
+            prompt = message.get("content") or ""
+
+    match = re.search(r"specifically for: \*\*(.+?)\*\*", prompt)
+    trend = match.group(1) if match else "this moment"
+
+    variants = re.search(r'"variants" array must contain exactly (\d+) items', prompt)
+    if variants:
+        count = int(variants.group(1))
+        base = _build_campaign(trend)
+        body = {
+            "hero_concept": base["hero_concept"],
+            "moodboard": base["moodboard"],
+            "variants": [
+                {k: v for k, v in _build_campaign(trend, i).items() if k in ("slogan", "social_post")}
+                for i in range(count)
+            ],
+        }
+    else:
+        body = _build_campaign(trend)
+    return json.dumps(body)
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Request handler; the server's `config` attribute controls behaviour."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            config = self.server.config
+            with config.lock:
+                self._send_json(200, dict(config.stats))
+            return
+        self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+
+        if self.path.split("?")[0] not in CHAT_PATHS:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        try:
+            request = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        number, latency, outcome = config.draw()
+        time.sleep(latency)
+
+        if outcome == "errors":
+            self._send_json(500, {"error": {"message": "Mock internal error", "type": "server_error"}})
+            return
+        if outcome == "rate_limited":
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error",
+                           "code": "rate_limit_exceeded"}},
+                headers={"retry-after": "1"}
+            )
+            return
+
+        messages = request.get("messages") or []
+        content = build_completion_content(messages)
+        if outcome == "malformed":
+            content = content[:config.truncate_at(len(content))]
+
+        prompt_tokens = sum(_estimate_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "length" if outcome == "malformed" else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, config: MockLLMConfig = None):
+    """
+    Starts the mock server on a background thread.
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.config = config or MockLLMConfig()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI/Groq-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), MockLLMHandler)
+    server.daemon_threads = True
+    server.config = config
+    print(f"Mock LLM server listening on http://{args.host}:{args.port}")
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{args.port}/v1")
+    print(f"  GROQ_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStats: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@
 Multi-Scene Video Creator - Combines multiple images/GIFs into one video with audio
 Creates a dynamic campaign video with multiple scenes
 """
-import requests
 import tempfile
 import os
 from typing import List, Optional
 
+from .config import SCENE_LOOP_FORMAT, SCENE_ZOOM
+from .image_derivatives import WORKING_RENDITION, get_derivative
+from .ken_burns import render_frame
+from .video_creator import ken_burns_clip, load_animation_clip, reframe_clip
+
 # Fix for Pillow 10.0.0+ compatibility (ANTIALIAS was removed)
 try:
     from PIL import Image
@@ -25,7 +29,8 @@ def create_multi_scene_video(
     transition_duration: float = 0.5,
     slogan: str = None,
     brand_name: str = "Coca-Cola",
-    num_scenes: Optional[int] = None
+    num_scenes: Optional[int] = None,
+    scene_format: str = SCENE_LOOP_FORMAT
 ) -> str:
     """
     Creates a multi-scene video by combining multiple images/GIFs with audio.
@@ -36,6 +41,8 @@ def create_multi_scene_video(
         gif_paths: Optional list of GIF file paths (if provided, uses these instead of creating from images)
         scene_duration: Duration of each scene in seconds (default: 3.0)
         transition_duration: Duration of transitions between scenes (default: 0.5)
+        scene_format: How per-scene loops are built from images: "clip" renders frames while the video
+            is written; "mp4", "gif" or "webp" go through an animation file first
     
     Returns:
         Path to the created video file
@@ -44,20 +51,20 @@ def create_multi_scene_video(
         # Try new import structure (moviepy 2.x)
         try:
             from moviepy import (
-                ImageClip, AudioFileClip, CompositeVideoClip, VideoFileClip,
+                ImageClip, AudioFileClip, CompositeVideoClip,
                 concatenate_videoclips, concatenate_audioclips, TextClip, ColorClip
             )
         except ImportError:
             # Fall back to old import structure (moviepy 1.x)
             try:
                 from moviepy.editor import (
-                    ImageClip, AudioFileClip, CompositeVideoClip, VideoFileClip,
+                    ImageClip, AudioFileClip, CompositeVideoClip,
                     concatenate_videoclips, concatenate_audioclips, TextClip, ColorClip
                 )
             except ImportError:
                 # Some versions don't have concatenate_audioclips, use alternative
                 from moviepy.editor import (
-                    ImageClip, AudioFileClip, CompositeVideoClip, VideoFileClip,
+                    ImageClip, AudioFileClip, CompositeVideoClip,
                     concatenate_videoclips, TextClip, ColorClip
                 )
                 # Define concatenate_audioclips as a fallback
@@ -233,11 +240,12 @@ def create_multi_scene_video(
             
             for i in range(num_scenes):
                 print(f"  Processing scene {i+1}/{num_scenes}...")
+                scene_framed = False  # True once the scene's frames already include the scene zoom at VIDEO_SIZE
                 try:
                     if gif_paths and i < len(gif_paths) and os.path.exists(gif_paths[i]):
                         # Use provided GIF
                         print(f"  Scene {i+1}/{num_scenes}: Using GIF {gif_paths[i]}")
-                        scene_clip = VideoFileClip(gif_paths[i])
+                        scene_clip = load_animation_clip(gif_paths[i])
                         # If GIF is shorter than scene_duration, loop it
                         if scene_clip.duration < scene_duration:
                             num_loops = int(scene_duration / scene_clip.duration) + 1
@@ -261,16 +269,37 @@ def create_multi_scene_video(
                             scene_clip = resize_clip(scene_clip, (1080, 1080))
                             scene_clip_created = True
                             print(f"    ✅ Scene {i+1}: Placeholder created (invalid URL)")
+                        elif scene_format == "clip":
+                            # Animate straight from the image: frames are rendered while the video is written,
+                            # so there is no GIF encode, temp file or ffmpeg decode
+                            print(f"  Scene {i+1}/{num_scenes}: Animating image {i+1} of {len(image_urls)}: {image_url_to_use[:50]}...")
+                            scene_clip_created = False
+                            try:
+                                # Working rendition in, final frame out: one resample per frame, scene zoom included
+                                source_image = get_derivative(image_url_to_use, WORKING_RENDITION)
+                                if source_image is not None:
+                                    scene_clip = ken_burns_clip(source_image, scene_duration, base_zoom=SCENE_ZOOM)
+                                    scene_clip_created = True
+                                    scene_framed = True
+                                    print(f"    ✅ Scene {i+1}: Animated clip created")
+                                else:
+                                    print(f"    ⚠️ Image download failed, falling back to static image...")
+                            except Exception as clip_error:
+                                print(f"    ⚠️ Animated clip failed for scene {i+1}: {clip_error}")
+                                print(f"    Falling back to static image...")
                         else:
                             print(f"  Scene {i+1}/{num_scenes}: Creating GIF from image {i+1} of {len(image_urls)}: {image_url_to_use[:50]}...")
                             from app.visual_engine import generate_animated_gif_fallback
                             
                             scene_clip_created = False
                             try:
-                                gif_path = generate_animated_gif_fallback(image_url_to_use)
+                                # Frames are rendered at the working resolution with the scene zoom already applied
+                                gif_path = generate_animated_gif_fallback(
+                                    image_url_to_use, fmt=scene_format, rendition=WORKING_RENDITION, base_zoom=SCENE_ZOOM
+                                )
                                 
                                 if gif_path and os.path.exists(gif_path):
-                                    scene_clip = VideoFileClip(gif_path)
+                                    scene_clip = load_animation_clip(gif_path)
                                     # If GIF is shorter than scene_duration, loop it
                                     if scene_clip.duration < scene_duration:
                                         num_loops = int(scene_duration / scene_clip.duration) + 1
@@ -279,6 +308,7 @@ def create_multi_scene_video(
                                     scene_clip = scene_clip.with_duration(scene_duration)
                                     temp_files.append(gif_path)  # Track for cleanup
                                     scene_clip_created = True
+                                    scene_framed = True
                                     print(f"    ✅ Scene {i+1}: GIF created successfully")
                                 else:
                                     print(f"    ⚠️ GIF path invalid or doesn't exist: {gif_path}")
@@ -303,62 +333,36 @@ def create_multi_scene_video(
                             else:
                                 fallback_idx = i
                             
-                            # Try to download the image with retry (faster timeout)
-                            img_downloaded = False
-                            img_response = None
-                            for retry_attempt in range(2):  # Only 2 attempts, fail faster
-                                try:
-                                    print(f"    Attempting to download image (attempt {retry_attempt + 1}/2, timeout: 30s)...")
-                                    img_response = requests.get(image_urls[fallback_idx], timeout=30)  # Faster timeout
-                                    if img_response.status_code == 200:
-                                        img_downloaded = True
-                                        # Cache the first successful image
-                                        if cached_image is None:
-                                            cached_image = img_response.content
-                                            print(f"    💾 Cached first successful image for reuse")
-                                        break
-                                    else:
-                                        print(f"    Download failed with status {img_response.status_code}")
-                                except Exception as download_error:
-                                    print(f"    Download attempt {retry_attempt + 1} failed: {download_error}")
-                                    if retry_attempt < 1:
-                                        import time
-                                        time.sleep(0.5)  # Shorter wait
+                            # Working rendition from the local store (usually already decoded by the GIF step)
+                            print(f"    Loading image (timeout: 30s)...")
+                            square_image = get_derivative(image_urls[fallback_idx], WORKING_RENDITION)
+                            img_downloaded = square_image is not None
+                            if img_downloaded and cached_image is None:
+                                # Cache the first successful image
+                                cached_image = square_image
+                                print(f"    💾 Cached first successful image for reuse")
                             
                             if not img_downloaded:
                                 # Try using cached image if available
                                 if cached_image is not None:
                                     print(f"    ⚠️ Image download failed, reusing cached image from scene 1")
-                                    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as img_file:
-                                        img_file.write(cached_image)
-                                        img_path = img_file.name
-                                        temp_files.append(img_path)
+                                    square_image = cached_image
                                     img_downloaded = True
                                 else:
                                     print(f"    ❌ ERROR: Could not download image and no cached image available")
                                     print(f"    Using a placeholder black image to ensure scene is created")
                                     # Create a black placeholder image
                                     from PIL import Image as PILImage
-                                    placeholder = PILImage.new('RGB', (1080, 1080), color='black')
-                                    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as img_file:
-                                        placeholder.save(img_file.name)
-                                        img_path = img_file.name
-                                        temp_files.append(img_path)
-                            else:
-                                with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as img_file:
-                                    img_file.write(img_response.content)
-                                    img_path = img_file.name
-                                    temp_files.append(img_path)
+                                    square_image = PILImage.new('RGB', (1080, 1080), color='black')
                             
                             try:
+                                import numpy as np
                                 print(f"    Creating ImageClip from downloaded image...")
-                                scene_clip = ImageClip(img_path, duration=scene_duration)
+                                # Already at the working size; the scene zoom is applied once here, not per frame
+                                scene_clip = ImageClip(np.asarray(render_frame(square_image, SCENE_ZOOM, 1.0)),
+                                                       duration=scene_duration)
+                                scene_framed = True
                                 print(f"    ImageClip created, duration: {scene_clip.duration}s")
-                                # Resize to Instagram-friendly size
-                                target_size = (1080, 1080)
-                                print(f"    Resizing to {target_size}...")
-                                scene_clip = resize_clip(scene_clip, target_size)
-                                print(f"    Resize complete, duration: {scene_clip.duration}s")
                                 # Set FPS
                                 if hasattr(scene_clip, 'with_fps'):
                                     scene_clip = scene_clip.with_fps(30)
@@ -375,31 +379,18 @@ def create_multi_scene_video(
                                 import traceback
                                 traceback.print_exc()
                                 print(f"    📷 Image URL that should be used: {image_urls[fallback_idx][:100]}...")
-                                # Try to use the image with a different approach
-                                try:
-                                    # Try using VideoFileClip (might work for static images in some MoviePy versions)
-                                    print(f"    Trying VideoFileClip as alternative...")
-                                    scene_clip = VideoFileClip(img_path)
-                                    scene_clip = scene_clip.with_duration(scene_duration)
-                                    if hasattr(scene_clip, 'with_fps'):
-                                        scene_clip = scene_clip.with_fps(30)
-                                    scene_clip_created = True
-                                    print(f"    ✅ Scene {i+1}: Created using VideoFileClip")
-                                except Exception as videofile_error:
-                                    print(f"    ⚠️ VideoFileClip also failed: {videofile_error}")
-                                    # Last resort: Use ColorClip but at least log that we have the image
-                                    print(f"    ⚠️ Using ColorClip placeholder (ImageClip/VideoFileClip unavailable)")
-                                    if basic_fallback_clip is not None:
-                                        try:
-                                            scene_clip = basic_fallback_clip.with_duration(scene_duration) if hasattr(basic_fallback_clip, 'with_duration') else basic_fallback_clip
-                                        except:
-                                            scene_clip = ColorClip(size=(1080, 1080), color=(0, 0, 0), duration=scene_duration)
-                                    else:
+                                print(f"    ⚠️ Using ColorClip placeholder (ImageClip unavailable)")
+                                if basic_fallback_clip is not None:
+                                    try:
+                                        scene_clip = basic_fallback_clip.with_duration(scene_duration) if hasattr(basic_fallback_clip, 'with_duration') else basic_fallback_clip
+                                    except:
                                         scene_clip = ColorClip(size=(1080, 1080), color=(0, 0, 0), duration=scene_duration)
-                                    if hasattr(scene_clip, 'with_fps'):
-                                        scene_clip = scene_clip.with_fps(30)
-                                    scene_clip_created = True
-                                    print(f"    ⚠️ Scene {i+1}: Using ColorClip placeholder")
+                                else:
+                                    scene_clip = ColorClip(size=(1080, 1080), color=(0, 0, 0), duration=scene_duration)
+                                if hasattr(scene_clip, 'with_fps'):
+                                    scene_clip = scene_clip.with_fps(30)
+                                scene_clip_created = True
+                                print(f"    ⚠️ Scene {i+1}: Using ColorClip placeholder")
                         
                         # Ensure scene_clip is set
                         if not scene_clip_created:
@@ -499,6 +490,7 @@ def create_multi_scene_video(
                     # Note: Fade transitions not available in MoviePy 2.x
                     # Scenes will transition directly (still looks good!)
                     
+                    scene_clip.framed = scene_framed
                     scene_clips.append(scene_clip)
                     print(f"  ✅ Scene {i+1}/{num_scenes} successfully added to scene_clips")
                 except Exception as e:
@@ -866,30 +858,14 @@ def create_multi_scene_video(
                     print(f"  ⚠️ Could not create intro: {e}")
             
             for i, scene_clip in enumerate(scene_clips):
-                # Add subtle zoom effect for more dynamic feel
-                # Simple approach: resize slightly larger, then crop to center
+                # Add subtle zoom effect for more dynamic feel (crop into the centre)
                 try:
-                    if hasattr(scene_clip, 'size') and scene_clip.size:
-                        w, h = scene_clip.size
-                        # More visible zoom (20% for commercial feel)
-                        zoom_factor = 1.2
-                        new_w = int(w * zoom_factor)
-                        new_h = int(h * zoom_factor)
-                        
-                        # Resize to larger size
-                        scene_clip = resize_clip(scene_clip, (new_w, new_h))
-                        
-                        # Crop to center to create ken burns effect
-                        # Calculate crop area (center of larger image)
-                        x_center = new_w // 2
-                        y_center = new_h // 2
-                        x1 = x_center - w // 2
-                        y1 = y_center - h // 2
-                        x2 = x1 + w
-                        y2 = y1 + h
-                        
-                        scene_clip = scene_clip.cropped(x1=x1, y1=y1, x2=x2, y2=y2)
-                        print(f"  ✅ Scene {i+1}: Added zoom effect (20% zoom, ken burns style)")
+                    if getattr(scene_clip, 'framed', False):
+                        print(f"  ✅ Scene {i+1}: Zoom already rendered into the frames ({SCENE_ZOOM:.0%} scale)")
+                    elif hasattr(scene_clip, 'size') and scene_clip.size:
+                        # Scale, crop and zoom in one resample per frame (not resize -> resize -> crop)
+                        scene_clip = reframe_clip(scene_clip, zoom=SCENE_ZOOM)
+                        print(f"  ✅ Scene {i+1}: Added zoom effect ({SCENE_ZOOM:.0%} scale, ken burns style)")
                     else:
                         print(f"  ⚠️ Scene {i+1}: No size attribute, skipping zoom")
                 except Exception as e:
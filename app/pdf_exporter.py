@@ -9,8 +9,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from io import BytesIO
-import requests
-from PIL import Image as PILImage
+
+from .image_derivatives import get_derivative_bytes
 
 
 def create_campaign_pdf(campaign: dict, trend: str, category: str, image_url: str = None) -> BytesIO:
@@ -118,18 +118,10 @@ def create_campaign_pdf(campaign: dict, trend: str, category: str, image_url: st
     # Add image if available
     if image_url:
         try:
-            img_response = requests.get(image_url, timeout=10)
-            if img_response.status_code == 200:
-                img_buffer = BytesIO(img_response.content)
-                pil_img = PILImage.open(img_buffer)
-                # Resize if too large
-                max_width, max_height = 400, 300
-                if pil_img.width > max_width or pil_img.height > max_height:
-                    pil_img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
-                    img_buffer = BytesIO()
-                    pil_img.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-                
+            # 400x300 thumbnail from the shared renditions (decoded once for every consumer)
+            thumbnail = get_derivative_bytes(image_url, "pdf_thumbnail", fmt="PNG", timeout=10)
+            if thumbnail:
+                img_buffer = BytesIO(thumbnail)
                 cover_data.append([Spacer(1, 0.3*inch)])
                 cover_data.append([Image(img_buffer, width=400, height=300)])
         except:
@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import requests
 
+from .exemplar_index import get_exemplar_index, index_is_loaded
+
 
 # Database setup
 DB_PATH = "data/post_history.db"
@@ -34,6 +36,12 @@ def init_database():
         c.execute('ALTER TABLE posts ADD COLUMN status TEXT DEFAULT "active"')
     except sqlite3.OperationalError:
         pass  # Column already exists
+    # Last known performance, used to rank few-shot exemplars
+    for column in ('engagement_rate REAL DEFAULT 0', 'total_engagement INTEGER DEFAULT 0'):
+        try:
+            c.execute(f'ALTER TABLE posts ADD COLUMN {column}')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
     conn.commit()
     conn.close()
 
@@ -51,9 +59,28 @@ def save_post(post_id: str, trend: str, caption: str, image_url: str = None):
         conn.commit()
     except Exception as e:
         print(f"Error saving post: {e}")
+        return
     finally:
         conn.close()
 
+    # Keep the exemplar index current without rebuilding it
+    if index_is_loaded():
+        get_exemplar_index().add(post_id, trend, caption)
+
+
+def update_post_metrics(post_id: str, engagement_rate: float, total_engagement: int):
+    """Store the latest engagement numbers for a post."""
+    init_database()
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('UPDATE posts SET engagement_rate = ?, total_engagement = ? WHERE post_id = ?',
+              (engagement_rate, total_engagement, post_id))
+    conn.commit()
+    conn.close()
+
+    if index_is_loaded():
+        get_exemplar_index().update_engagement(post_id, engagement_rate)
+
 
 def get_all_posts(include_deleted: bool = True) -> List[Dict]:
     """Get all posts from the database."""
@@ -74,7 +101,9 @@ def get_all_posts(include_deleted: bool = True) -> List[Dict]:
             'image_url': row[4],
             'posted_at': row[5],
             'created_at': row[6],
-            'status': row[7] if len(row) > 7 else 'active'
+            'status': row[7] if len(row) > 7 else 'active',
+            'engagement_rate': row[8] if len(row) > 8 else 0,
+            'total_engagement': row[9] if len(row) > 9 else 0
         })
     conn.close()
     return posts
@@ -89,6 +118,9 @@ def mark_post_deleted(post_id: str):
     conn.commit()
     conn.close()
 
+    if index_is_loaded():
+        get_exemplar_index().remove(post_id)
+
 
 def get_post_insights(post_id: str, access_token: str) -> Optional[Dict]:
     """
@@ -207,6 +239,10 @@ def get_all_posts_with_insights(access_token: str, include_deleted: bool = True)
             else:
                 post.update(insights)
                 post['status'] = 'active'
+                try:
+                    update_post_metrics(post['post_id'], insights['engagement_rate'], insights['total_engagement'])
+                except Exception as e:
+                    print(f"Could not store post metrics: {e}")
         else:
             # If insights fail, still show the post with basic info
             post.update({
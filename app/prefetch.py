@@ -0,0 +1,84 @@
+"""
+Prefetch Module - Starts campaign generation as soon as a trend is selected
+The Generate button then attaches to the in-flight (or finished) result
+instead of starting from scratch.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from .config import PREFETCH_ON_SELECT, PREFETCH_WORKERS
+from .trend_classifier import classify_trend
+from .creative_engine import generate_campaign_for_trend
+from .warm_pool import warm_pool
+
+# Shared by every Streamlit session in this process
+_executor = ThreadPoolExecutor(max_workers=max(1, PREFETCH_WORKERS), thread_name_prefix="prefetch")
+
+
+def _prefetch_campaign(trend: str, cancelled: threading.Event) -> Optional[dict]:
+    """Background job: classify the trend, then generate its campaign unless cancelled."""
+    if cancelled.is_set():
+        return None
+    category = classify_trend(trend)
+    if category == "skip" or cancelled.is_set():
+        return {"category": category, "campaign": None}
+
+    warmed = warm_pool.get(trend)
+    if warmed:
+        return {"category": category, "campaign": warmed["campaign"]}
+
+    # Once the provider call starts it can't be interrupted, but its result
+    # still lands in the campaign cache, so the work isn't wasted
+    return {"category": category, "campaign": generate_campaign_for_trend(trend, category)}
+
+
+class CampaignPrefetch:
+    """
+    One per Streamlit session: tracks the prefetch for the currently selected trend.
+    Selecting another trend cancels the previous job (dropped if still queued,
+    told to stop at its next checkpoint if already running).
+    """
+
+    def __init__(self, enabled: bool = PREFETCH_ON_SELECT):
+        self.enabled = enabled
+        self.trend: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._cancelled = threading.Event()
+
+    def start(self, trend: str):
+        """Begins prefetching for a trend; a no-op if it is already being prefetched."""
+        if not self.enabled or not trend:
+            return
+        if trend == self.trend and self._future is not None and not self._future.cancelled():
+            return
+        self.cancel()
+        self.trend = trend
+        self._cancelled = threading.Event()
+        self._future = _executor.submit(_prefetch_campaign, trend, self._cancelled)
+
+    def cancel(self):
+        """Abandons the current prefetch."""
+        if self._future is not None:
+            self._future.cancel()
+            self._cancelled.set()
+        self.trend = None
+        self._future = None
+
+    def result(self, trend: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Waits for the prefetched campaign of `trend`.
+
+        Returns:
+            {"category", "campaign"} or None if nothing usable was prefetched for this trend
+        """
+        if trend != self.trend or self._future is None or self._future.cancelled():
+            return None
+        try:
+            prefetched = self._future.result(timeout=timeout)
+        except Exception as e:
+            print(f"Prefetch for '{trend}' failed: {e}")
+            return None
+        if not prefetched or not prefetched["campaign"]:
+            return None
+        return {"category": prefetched["category"], "campaign": dict(prefetched["campaign"])}
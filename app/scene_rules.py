@@ -0,0 +1,146 @@
+"""
+Scene Rules Module - Declarative trend -> scene table for image and video prompts
+Rules live in data/scene_rules.json and are compiled once into a single regex,
+so a trend's image and video scene are resolved in one pass.
+"""
+import json
+import re
+import string
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import SCENE_RULES_PATH
+
+# Path to data folder
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Used when the rule file is missing or broken, so prompts can always be built
+BUILTIN_DEFAULT = {
+    "image_scene": "A specific scene celebrating {trend}: People gathered together, experiencing {trend} in an "
+                   "authentic way. The scene features {key_elements}. People are sharing Coca-Cola while "
+                   "engaging with {trend}, creating genuine moments of connection and joy.",
+    "video_scene": "Celebratory scene: People gathered for {trend}, sharing joy and Coca-Cola. Dynamic, "
+                   "uplifting atmosphere capturing the essence of {trend}.",
+}
+
+
+# Placeholders a scene template may use
+TEMPLATE_FIELDS = {"trend", "key_elements"}
+SCENE_KEYS = ("image_scene", "video_scene")
+
+
+def template_error(template) -> Optional[str]:
+    """Why a scene template can't be rendered (unknown placeholder, stray brace...), or None if it can."""
+    if not isinstance(template, str):
+        return "not a string"
+    try:
+        for _, field, _, _ in string.Formatter().parse(template):
+            if field is not None and field not in TEMPLATE_FIELDS:
+                return f"unknown placeholder {{{field}}}"
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def _moodboard_key_elements(moodboard: str) -> str:
+    """Extract key visual words from the moodboard."""
+    moodboard_words = [w.strip() for w in (moodboard or "").split(",") if len(w.strip()) > 3]
+    return ", ".join(moodboard_words[:5]) if moodboard_words else "celebration and connection"
+
+
+class SceneRuleTable:
+    """
+    Ordered keyword rules compiled into one matcher.
+    Each rule becomes a lookahead branch `(?=.*?(?:kw1|kw2|...))` anchored at the
+    start of the trend; the regex engine tries branches in order, so the first
+    rule with any keyword anywhere in the trend wins - the same priority as a
+    chain of `if any(word in trend ...)` checks, in a single search.
+
+    Templates may only use {trend} and {key_elements}. A rule with a broken
+    template is skipped (and a broken default replaced by the built-in one) with
+    a warning, so one typo in the data file can't break prompts for every trend.
+    """
+
+    def __init__(self, rules: List[dict], default: dict):
+        self.rules = []
+        for rule in rules:
+            if not rule.get("keywords"):
+                continue
+            errors = [f"{key}: {error}" for key in SCENE_KEYS if rule.get(key)
+                      for error in [template_error(rule[key])] if error]
+            if errors:
+                print(f"Skipping scene rule {rule.get('category', rule['keywords'][:3])}: {'; '.join(errors)}")
+                continue
+            self.rules.append(rule)
+
+        self.default = dict(BUILTIN_DEFAULT)
+        for key, template in (default or {}).items():
+            error = template_error(template) if key in SCENE_KEYS else None
+            if error:
+                print(f"Ignoring default {key} scene: {error}")
+            else:
+                self.default[key] = template
+
+        branches = []
+        for i, rule in enumerate(self.rules):
+            keywords = "|".join(re.escape(k.lower()) for k in rule["keywords"])
+            branches.append(f"(?=.*?(?:{keywords}))(?P<rule{i}>)")
+        self._pattern = re.compile("^(?:" + "|".join(branches) + ")", re.DOTALL) if branches else None
+
+    def match(self, trend: str) -> Optional[dict]:
+        """First rule whose keywords appear in the trend, or None for the default scene."""
+        if self._pattern is None:
+            return None
+        m = self._pattern.match((trend or "").lower())
+        if not m:
+            return None
+        return self.rules[int(m.lastgroup[4:])]
+
+    def scenes(self, trend: str, moodboard: str = "") -> Dict[str, str]:
+        """
+        Resolves the trend once and renders both scenes.
+
+        Returns:
+            {"category", "image_scene", "video_scene"}
+        """
+        rule = self.match(trend) or {}
+        image_template = rule.get("image_scene") or self.default["image_scene"]
+        video_template = rule.get("video_scene") or self.default["video_scene"]
+        key_elements = "" if rule else _moodboard_key_elements(moodboard)
+        return {
+            "category": rule.get("category", "default"),
+            "image_scene": image_template.format(trend=trend, key_elements=key_elements),
+            "video_scene": video_template.format(trend=trend, key_elements=key_elements),
+        }
+
+
+def load_scene_rules(path: str = None) -> SceneRuleTable:
+    """
+    Loads and compiles a scene rule file.
+
+    Args:
+        path: JSON rule file (defaults to SCENE_RULES_PATH or data/scene_rules.json)
+    """
+    path = Path(path or SCENE_RULES_PATH or DATA_DIR / "scene_rules.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return SceneRuleTable(data.get("rules", []), data.get("default", {}))
+    except Exception as e:
+        print(f"Could not load scene rules from {path}: {e}, using the default scene only")
+        return SceneRuleTable([], BUILTIN_DEFAULT)
+
+
+_table: Optional[SceneRuleTable] = None
+_table_lock = threading.Lock()
+
+
+def get_scene_rules() -> SceneRuleTable:
+    """Returns the shared rule table, compiled on first use."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = load_scene_rules()
+    return _table
@@ -0,0 +1,81 @@
+"""
+Single-Flight Module - Coalesces identical in-flight requests
+When several Streamlit sessions (or a double-click) ask for the same campaign,
+image or voice-over at once, only one underlying call runs and everyone shares its result.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Process-wide request coalescing keyed by an arbitrary hashable key.
+    Streamlit runs every session as a thread of the same server process,
+    so a module-level instance is shared across all sessions.
+    """
+
+    def __init__(self, name: str = "single-flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Runs fn(*args, **kwargs) unless an identical call is already running,
+        in which case waits for it and returns (or raises) the same outcome.
+
+        Args:
+            key: Identifies identical requests, e.g. (trend, category, model)
+            fn: The expensive call to make at most once per key at a time
+
+        Returns:
+            The result of the single underlying call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["calls"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking followers so later requests start fresh
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.followers:
+                print(f"{self.name}: shared one result with {call.followers} identical request(s)")
+            call.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        """True while a call for this key is running."""
+        with self._lock:
+            return key in self._calls
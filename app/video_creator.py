@@ -2,22 +2,135 @@
 Video Creation Module - Combines images and audio into videos for Instagram
 """
 from io import BytesIO
-import requests
 import tempfile
 import os
 from PIL import Image
 
+from .config import VIDEO_SIZE
+from .image_derivatives import WORKING_RENDITION, get_derivative
+from .ken_burns import KEN_BURNS_FRAMES, ken_burns_frame_at, ken_burns_params, render_frame, view_box
+
+
+def load_animation_clip(path: str):
+    """
+    Loads an animation file (GIF, WebP or MP4) as a moviepy clip.
+    ffmpeg can't decode animated WebP, so WebP frames are decoded with Pillow
+    one at a time, as the clip asks for them.
+    
+    Args:
+        path: Path to the animation file
+    
+    Returns:
+        moviepy clip
+    """
+    try:
+        from moviepy import VideoClip, VideoFileClip
+    except ImportError:
+        from moviepy.editor import VideoClip, VideoFileClip
+    
+    if not path.lower().endswith(".webp"):
+        return VideoFileClip(path)
+    
+    import numpy as np
+    from bisect import bisect_right
+    animation = Image.open(path)
+    # libwebp merges unchanged frames into longer ones, so durations vary per frame
+    starts, total_ms, shortest_ms = [], 0, None
+    for index in range(getattr(animation, "n_frames", 1)):
+        animation.seek(index)
+        animation.load()  # Frame duration is only known once the frame is decoded
+        frame_ms = animation.info.get("duration") or 100
+        starts.append(total_ms)
+        total_ms += frame_ms
+        shortest_ms = min(shortest_ms or frame_ms, frame_ms)
+    current = {"index": None, "frame": None}
+    
+    def frame_function(t):
+        index = max(0, bisect_right(starts, t * 1000) - 1)
+        if index != current["index"]:
+            animation.seek(index)
+            current["index"], current["frame"] = index, np.asarray(animation.convert("RGB"))
+        return current["frame"]
+    
+    clip = VideoClip(frame_function, duration=total_ms / 1000)
+    fps = min(30, 1000 / shortest_ms)
+    return clip.with_fps(fps) if hasattr(clip, "with_fps") else clip.set_fps(fps)
+
+
+def ken_burns_clip(image: Image.Image, duration: float, num_frames: int = KEN_BURNS_FRAMES, frame_ms: int = 100,
+                   base_zoom: float = 1.0):
+    """
+    The Ken Burns loop of generate_animated_gif_fallback as a moviepy clip whose
+    frames are rendered from the source image when the video is written.
+    No GIF is encoded, written to disk or decoded again, and the clip loops by
+    itself for any duration.
+    
+    Args:
+        image: Source image (RGB), normally the working rendition at VIDEO_SIZE
+        duration: Clip duration in seconds
+        num_frames: Distinct frames in the zoom-in half
+        frame_ms: Milliseconds each animation frame is shown
+        base_zoom: Constant zoom folded into each frame's single resample (e.g. SCENE_ZOOM)
+    
+    Returns:
+        moviepy clip
+    """
+    try:
+        from moviepy import VideoClip
+    except ImportError:
+        from moviepy.editor import VideoClip
+    
+    import numpy as np
+    current = {"index": None, "frame": None}
+    
+    def frame_function(t):
+        index = ken_burns_frame_at(t, num_frames, frame_ms)
+        if index != current["index"]:  # Output fps is higher than the animation's - reuse the last frame
+            frame = render_frame(image, *ken_burns_params(index, num_frames, base_zoom))
+            current["index"], current["frame"] = index, np.asarray(frame)
+        return current["frame"]
+    
+    clip = VideoClip(frame_function, duration=duration)
+    fps = 1000 / frame_ms
+    return clip.with_fps(fps) if hasattr(clip, "with_fps") else clip.set_fps(fps)
+
+
+def reframe_clip(clip, size: tuple = (VIDEO_SIZE, VIDEO_SIZE), zoom: float = 1.0):
+    """
+    Scales, crops (to the output's aspect ratio) and zooms a clip's frames in one
+    boxed resample each, instead of chaining moviepy resize and crop.
+    
+    Args:
+        clip: moviepy clip of any size
+        size: Output frame size
+        zoom: Constant zoom towards the centre (1.0 = none)
+    
+    Returns:
+        moviepy clip with frames of the given size
+    """
+    import numpy as np
+    size = tuple(size)
+    if tuple(clip.size) == size and zoom == 1.0:
+        return clip
+    box = view_box(tuple(clip.size), size, zoom)
+    
+    def reframe(frame):
+        return np.asarray(Image.fromarray(frame).resize(size, Image.Resampling.BICUBIC, box=box))
+    
+    # moviepy 2.x / 1.x
+    return clip.image_transform(reframe) if hasattr(clip, "image_transform") else clip.fl_image(reframe)
+
 
 def create_video_with_audio(image_url: str, audio_bytes: bytes, duration: float = None, gif_path: str = None) -> str:
     """
     Creates a video by combining an image/GIF with audio.
-    If a GIF is provided, it will be used instead of the static image for a more dynamic video.
+    If a GIF (or WebP/MP4 loop) is provided, it will be used instead of the static image for a more dynamic video.
     
     Args:
         image_url: URL of the image to use (fallback if no GIF)
         audio_bytes: Audio file as bytes (MP3)
         duration: Duration of video in seconds (default: audio length)
-        gif_path: Optional path to a GIF file (will be used instead of image if provided)
+        gif_path: Optional path to a GIF, WebP or MP4 loop (will be used instead of image if provided)
     
     Returns:
         Path to the created video file
@@ -39,17 +152,12 @@ def create_video_with_audio(image_url: str, audio_bytes: bytes, duration: float
         if use_gif:
             # Use the GIF file directly
             media_path = gif_path
-            print(f"Using animated GIF: {gif_path}")
+            print(f"Using animation: {gif_path}")
         else:
-            # Download image
-            img_response = requests.get(image_url, timeout=30)
-            if img_response.status_code != 200:
-                raise Exception(f"Failed to download image: {img_response.status_code}")
-            
-            # Save image temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as img_file:
-                img_file.write(img_response.content)
-                media_path = img_file.name
+            # 1080x1080 rendition from the local store (decoded once, shared with other stages)
+            square_image = get_derivative(image_url, WORKING_RENDITION)
+            if square_image is None:
+                raise Exception(f"Failed to download image: {image_url[:80]}")
         
         # Save audio temporarily
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as audio_file:
@@ -79,7 +187,7 @@ def create_video_with_audio(image_url: str, audio_bytes: bytes, duration: float
             # Create clip from GIF or image
             if use_gif:
                 # Load GIF as video clip (GIFs are already animated)
-                image_clip = VideoFileClip(media_path)
+                image_clip = load_animation_clip(media_path)
                 gif_duration = image_clip.duration
                 
                 # If GIF is shorter than audio, loop it to match audio duration
@@ -96,14 +204,12 @@ def create_video_with_audio(image_url: str, audio_bytes: bytes, duration: float
                     # GIF is longer, trim to audio duration
                     image_clip = image_clip.with_duration(audio_duration)
                     video_duration = audio_duration
-                # Don't resize GIF - keep its original animation
+                # Bring the animation to the working resolution (one resample per frame, none if it already is)
+                image_clip = reframe_clip(image_clip)
             else:
-                # Create static image clip
-                image_clip = ImageClip(media_path, duration=video_duration)
-                
-                # Resize image to Instagram-friendly size (square, 1080x1080 recommended)
-                target_size = (1080, 1080)
-                image_clip = image_clip.resized(target_size)
+                # Create static image clip, already at the Instagram-friendly size (square, 1080x1080)
+                import numpy as np
+                image_clip = ImageClip(np.asarray(square_image), duration=video_duration)
             
             # Set FPS (required for video)
             image_clip = image_clip.with_fps(30)
@@ -129,17 +235,12 @@ def create_video_with_audio(image_url: str, audio_bytes: bytes, duration: float
             audio_clip.close()
             final_video.close()
             image_clip.close()
-            # Only delete if we created a temp file (not if we used provided GIF)
-            if not use_gif:
-                os.unlink(media_path)
             os.unlink(audio_path)
             
             return output_path
             
         except Exception as e:
             # Cleanup on error
-            if not use_gif and os.path.exists(media_path):
-                os.unlink(media_path)
             if os.path.exists(audio_path):
                 os.unlink(audio_path)
             raise e
@@ -0,0 +1,223 @@
+"""
+Video Jobs Module - Background Hugging Face image-to-video jobs
+Stable Video Diffusion on the free Inference API either takes a minute or two,
+or answers 503 while the model loads. Jobs run that request off the Streamlit
+thread, wait out cold starts as long as the API's estimated_time suggests, and
+remember whether the model is warm so later jobs don't hammer a loading model.
+Callers show the animated GIF fallback meanwhile and swap in the video when done.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from .config import (
+    HF_VIDEO_WORKERS, HF_VIDEO_MAX_WAIT_SECONDS, HF_VIDEO_MIN_POLL_SECONDS,
+    HF_VIDEO_MAX_POLL_SECONDS, HF_WARM_TTL_SECONDS, HF_VIDEO_JOB_TTL_SECONDS, HF_VIDEO_MAX_JOBS
+)
+
+
+class ModelState:
+    """Last known warm/cold state of the hosted video model (shared by all jobs)."""
+
+    def __init__(self, warm_ttl_seconds: float = HF_WARM_TTL_SECONDS):
+        self.warm_ttl_seconds = warm_ttl_seconds
+        self._lock = threading.Lock()
+        self._warm_at: Optional[float] = None
+        self._ready_at: Optional[float] = None  # When a loading model should be up
+
+    def mark_warm(self):
+        with self._lock:
+            self._warm_at = time.time()
+            self._ready_at = None
+
+    def mark_loading(self, estimated_time: float):
+        with self._lock:
+            self._warm_at = None
+            self._ready_at = time.time() + max(0.0, estimated_time)
+
+    def record(self, result: "VideoResult"):
+        """Updates the state from a request's result (failures say nothing about warmth)."""
+        if result.status == "done":
+            self.mark_warm()
+        elif result.status == "loading":
+            self.mark_loading(result.estimated_time or 0)
+
+    def wait_seconds(self) -> float:
+        """How long a new request should wait for a model that is still loading (0 if none)."""
+        with self._lock:
+            if self._ready_at is None:
+                return 0.0
+            return max(0.0, self._ready_at - time.time())
+
+    def status(self) -> dict:
+        """{"state": "warm" | "loading" | "unknown", "ready_in": seconds until a loading model is up}"""
+        with self._lock:
+            now = time.time()
+            if self._warm_at is not None and now - self._warm_at < self.warm_ttl_seconds:
+                return {"state": "warm", "ready_in": 0}
+            if self._ready_at is not None:
+                return {"state": "loading", "ready_in": max(0, int(self._ready_at - now))}
+            return {"state": "unknown", "ready_in": 0}
+
+
+@dataclass(frozen=True)
+class VideoResult:
+    """
+    Outcome of one image-to-video request.
+
+    status: "done", "loading" (model cold-starting, 503) or "failed"
+    video_path: Local video file when done
+    estimated_time: Seconds until a loading model should be up, if the API said
+    error: What went wrong when failed
+    """
+    status: str
+    video_path: Optional[str] = None
+    estimated_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+class VideoJob:
+    """One image-to-video request. status: "pending", "loading", "done" or "failed"."""
+
+    def __init__(self, image_url: str):
+        self.image_url = image_url
+        self.status = "pending"
+        self.video_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "video_path": self.video_path,
+            "error": self.error,
+            "attempts": self.attempts,
+            "elapsed": int((self.finished_at or time.time()) - self.started_at),
+        }
+
+
+def _request_video(image_url: str) -> VideoResult:
+    from .visual_engine import generate_video_url_huggingface
+    return generate_video_url_huggingface(image_url)
+
+
+class VideoJobManager:
+    """
+    Runs Hugging Face video jobs in the background, one per image.
+    Submitting the same image again returns the running (or finished) job.
+    Finished jobs are forgotten after job_ttl_seconds, or oldest first once
+    there are more than max_jobs; running jobs are never dropped.
+    """
+
+    def __init__(self, max_workers: int = HF_VIDEO_WORKERS, max_wait_seconds: float = HF_VIDEO_MAX_WAIT_SECONDS,
+                 min_poll_seconds: float = HF_VIDEO_MIN_POLL_SECONDS,
+                 max_poll_seconds: float = HF_VIDEO_MAX_POLL_SECONDS,
+                 request_fn: Callable[[str], VideoResult] = _request_video,
+                 model_state: Optional[ModelState] = None, job_ttl_seconds: float = HF_VIDEO_JOB_TTL_SECONDS,
+                 max_jobs: int = HF_VIDEO_MAX_JOBS):
+        self.max_wait_seconds = max_wait_seconds
+        self.min_poll_seconds = min_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.model_state = model_state or ModelState()
+        self.job_ttl_seconds = job_ttl_seconds
+        self.max_jobs = max_jobs
+        self._request_fn = request_fn
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, VideoJob] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="video-job")
+
+    def submit(self, image_url: str) -> VideoJob:
+        """Starts a video job for the image unless one is running or already succeeded."""
+        with self._lock:
+            job = self._jobs.get(image_url)
+            if job is not None and job.status != "failed":
+                return job
+            job = self._jobs[image_url] = VideoJob(image_url)
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _prune(self):
+        """Drops expired finished jobs, then the oldest finished ones over max_jobs (caller holds the lock)."""
+        now = time.time()
+        finished = sorted((job.finished_at, url) for url, job in self._jobs.items()
+                          if job.finished and job.finished_at is not None)
+        excess = len(self._jobs) - self.max_jobs
+        for finished_at, url in finished:
+            if now - finished_at > self.job_ttl_seconds or excess > 0:
+                del self._jobs[url]
+                excess -= 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def get(self, image_url: str) -> Optional[VideoJob]:
+        with self._lock:
+            return self._jobs.get(image_url)
+
+    def model_status(self) -> dict:
+        """Warm/cold state of the video model, for display."""
+        return self.model_state.status()
+
+    def _poll_delay(self, estimated_time: Optional[float], loading_polls: int) -> float:
+        """Follow the API's estimate when it gives one, otherwise back off exponentially."""
+        if estimated_time:
+            delay = estimated_time
+        else:
+            delay = self.min_poll_seconds * (2 ** (loading_polls - 1))
+        return min(self.max_poll_seconds, max(self.min_poll_seconds, delay))
+
+    def _run(self, job: VideoJob):
+        deadline = job.started_at + self.max_wait_seconds
+        loading_polls = 0
+        try:
+            # Another job already found the model loading - don't ask again before it should be up
+            wait = self.model_state.wait_seconds()
+            if wait:
+                job.status = "loading"
+                time.sleep(min(wait, max(0.0, deadline - time.time())))
+
+            while time.time() < deadline:
+                job.attempts += 1
+                result = self._request_fn(job.image_url)
+                self.model_state.record(result)
+
+                if result.status == "done":
+                    job.video_path = result.video_path
+                    job.status = "done"
+                    print(f"Video job finished after {job.attempts} request(s): {result.video_path}")
+                    return
+                if result.status != "loading":
+                    job.status = "failed"
+                    job.error = result.error or "Hugging Face video generation failed"
+                    return
+
+                # 503 - model is loading
+                loading_polls += 1
+                job.status = "loading"
+                delay = min(self._poll_delay(result.estimated_time, loading_polls),
+                            max(0.0, deadline - time.time()))
+                print(f"Video model loading, retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+            job.status = "failed"
+            job.error = f"Model did not become ready within {self.max_wait_seconds:.0f}s"
+        except Exception as e:
+            print(f"Video job error: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+
+
+# Shared by every Streamlit session in this process
+video_jobs = VideoJobManager()
@@ -1,8 +1,24 @@
+import base64
 import requests
 import urllib.parse
 import random
 import time
-from .config import openai_client, IMAGE_MODEL
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Iterable, List
+from .config import openai_client, IMAGE_MODEL, IMAGE_BACKEND, LOCAL_IMAGE_SIZE, LOCAL_IMAGE_SEED, DALLE_RESPONSE_FORMAT, POLLINATIONS_EAGER_FETCH, IMAGE_BATCH_WORKERS, ANIMATION_FORMAT, HF_VIDEO_ENABLED, VIDEO_ENGINE, PROCEDURAL_VIDEO_FORMAT, PROCEDURAL_MAX_SIZE, VIDEO_SIZE
+from .single_flight import SingleFlight
+from .scene_rules import get_scene_rules
+from .image_store import get_image_bytes, get_image_store, prefetch, sniff_content_type, store_image
+from .image_hash import hash_distance, image_hashes, is_near_duplicate
+from .video_jobs import VideoResult
+
+# Shared by every Streamlit session in this process
+_image_flight = SingleFlight("image")
+
+# Pollinations puts the prompt in the URL, so keep it short
+POLLINATIONS_MAX_PROMPT_CHARS = 600
 
 # Base visual instructions for Coca-Cola "Real Magic" style
 BASE_VISUAL_PROMPT = """
@@ -20,25 +36,75 @@ Guidelines:
 """
 
 
+@dataclass(frozen=True)
+class VisualPrompt:
+    """
+    Structured image/video prompt for one trend.
+    Carries the pieces the renderers need, so no provider has to parse another
+    provider's prompt text. Frozen (hashable) so renders can be memoized.
+    """
+    trend: str
+    moodboard: str
+    scene: str
+    video_scene: str
+    variation: str = ""  # e.g. "wide angle shot, variation 2" for multi-scene images
+
+    def with_variation(self, variation: str) -> "VisualPrompt":
+        """Same prompt with a variation hint (used for multi-scene image sets)."""
+        return replace(self, variation=variation)
+
+    def to_dalle(self) -> str:
+        """Full, detailed prompt for DALL-E."""
+        return _render_dalle(self)
+
+    def to_pollinations(self) -> str:
+        """Compact, trend-first prompt that fits in a Pollinations.ai URL."""
+        return _render_pollinations(self)
+
+    def to_video(self) -> str:
+        """Short, action-focused prompt for AI video generation."""
+        return _render_video(self)
+
+    def __str__(self) -> str:
+        return self.to_dalle()
+
+
+@lru_cache(maxsize=256)
+def build_visual_prompt(trend: str, moodboard: str) -> VisualPrompt:
+    """
+    Creates a HIGHLY PERSONALIZED structured prompt specific to the trend.
+    Memoized per (trend, moodboard), so reruns and multi-scene variations reuse it.
+    """
+    # One rule lookup gives both the image and the video scene
+    scenes = get_scene_rules().scenes(trend, moodboard)
+    return VisualPrompt(
+        trend=trend,
+        moodboard=moodboard,
+        scene=scenes["image_scene"],
+        video_scene=scenes["video_scene"],
+    )
+
+
 def build_dalle_prompt(trend: str, moodboard: str) -> str:
     """
     Creates a HIGHLY PERSONALIZED image prompt specific to the trend.
     The prompt is designed to generate images that are unmistakably about this specific trend.
     """
-    trend_lower = trend.lower()
-    
-    # Build trend-specific visual scene description
-    trend_scene = _build_trend_specific_scene(trend, trend_lower, moodboard)
-    
-    return f"""{BASE_VISUAL_PROMPT}
+    return build_visual_prompt(trend, moodboard).to_dalle()
+
+
+@lru_cache(maxsize=512)
+def _render_dalle(prompt: VisualPrompt) -> str:
+    trend = prompt.trend
+    text = f"""{BASE_VISUAL_PROMPT}
 
 CRITICAL: This image is specifically for {trend}. Every visual element must directly relate to {trend}.
 
 TREND-SPECIFIC VISUAL SCENE:
-{trend_scene}
+{prompt.scene}
 
 MOODBOARD VISUAL ELEMENTS:
-{moodboard}
+{prompt.moodboard}
 
 COMPOSITION REQUIREMENTS:
 - The scene must be unmistakably about {trend} - anyone looking at the image should immediately recognize it's about {trend}
@@ -53,109 +119,35 @@ TECHNICAL SPECS:
 - Cinematic, photorealistic quality
 - High contrast, vibrant colors
 """.strip()
+    if prompt.variation:
+        text += f", {prompt.variation}"
+    return text
 
 
-def _build_trend_specific_scene(trend: str, trend_lower: str, moodboard: str) -> str:
+@lru_cache(maxsize=512)
+def _render_pollinations(prompt: VisualPrompt) -> str:
     """
-    Builds a highly specific visual scene description based on the trend.
+    Optimizes the prompt for Pollinations.ai with a highly detailed, trend-specific text.
+    Uses prompt engineering: subject + details + style + quality.
     """
-    # Sports trends
-    if any(word in trend_lower for word in ["super bowl", "nfl", "football", "sports", "game", "championship", "olympics", "wimbledon", "tennis", "basketball", "soccer"]):
-        return f"""A vibrant scene capturing the essence of {trend}: Fans gathered together, wearing team colors or {trend}-themed apparel, cheering and celebrating. Stadium or viewing party atmosphere with {trend} branding visible. People sharing Coca-Cola bottles while watching or celebrating {trend}. The energy is electric, with high-fives, hugs, and shared excitement. Include specific {trend} elements like footballs, trophies, scoreboards, or {trend}-specific decorations."""
-    
-    # Entertainment/Music trends
-    elif any(word in trend_lower for word in ["coachella", "festival", "concert", "music", "grammy", "oscar", "award", "movie", "film", "show", "concert", "tour"]):
-        return f"""A dynamic scene celebrating {trend}: People gathered at a {trend} event or watching {trend} together. Friends sharing reactions, dancing, or experiencing {trend} moments. Include {trend}-specific elements like stages, screens, red carpets, musical instruments, or {trend} branding. The atmosphere is energetic and celebratory, with people connecting over shared love of {trend} while enjoying Coca-Cola."""
-    
-    # Holiday trends
-    elif any(word in trend_lower for word in ["christmas", "valentine", "easter", "halloween", "thanksgiving", "new year", "holiday", "hanukkah", "diwali", "ramadan"]):
-        return f"""A heartwarming scene during {trend}: People celebrating {trend} traditions together. Include {trend}-specific decorations, colors, and symbols. Families or friends gathered, sharing {trend} moments and Coca-Cola. The atmosphere is warm, joyful, and filled with {trend} spirit. Show authentic {trend} elements like decorations, food, or {trend}-specific activities."""
-    
-    # Cultural/Social trends
-    elif any(word in trend_lower for word in ["pride", "mardi gras", "carnival", "cultural", "heritage", "tradition"]):
-        return f"""A vibrant celebration of {trend}: Diverse groups of people coming together to celebrate {trend}. Colorful {trend}-themed decorations, costumes, or symbols. People sharing joy, connection, and Coca-Cola during {trend} festivities. The scene captures the inclusive, celebratory spirit of {trend}."""
-    
-    # Shopping trends
-    elif any(word in trend_lower for word in ["black friday", "cyber monday", "shopping", "sale"]):
-        return f"""An energetic scene during {trend}: People shopping, finding deals, and celebrating {trend} together. Shopping bags, {trend} signage, and people sharing the excitement of {trend} while enjoying Coca-Cola. The atmosphere is bustling and joyful."""
-    
-    # Technology/Tech trends
-    elif any(word in trend_lower for word in ["tech", "innovation", "ai", "digital", "gaming", "streaming"]):
-        return f"""A modern scene featuring {trend}: People engaging with {trend} technology or content together. Screens, devices, or {trend}-related elements visible. Friends sharing the {trend} experience while enjoying Coca-Cola. The atmosphere is contemporary and connected."""
-    
-    # Food/Dining trends
-    elif any(word in trend_lower for word in ["food", "dining", "restaurant", "cuisine", "cooking"]):
-        return f"""A social dining scene around {trend}: People gathered around tables, sharing {trend} food and Coca-Cola. The atmosphere is warm and convivial, with {trend}-specific dishes or settings visible. Friends and family connecting over {trend}."""
-    
-    # Travel trends
-    elif any(word in trend_lower for word in ["travel", "vacation", "beach", "adventure", "explore"]):
-        return f"""A scenic travel moment inspired by {trend}: People experiencing {trend} destinations together, sharing adventures and Coca-Cola. Beautiful {trend}-specific locations, landmarks, or settings. The atmosphere is adventurous and joyful."""
-    
-    # Default - use moodboard to create specific scene
-    else:
-        # Extract key visual words from moodboard
-        moodboard_words = [w.strip() for w in moodboard.split(",") if len(w.strip()) > 3]
-        key_elements = ", ".join(moodboard_words[:5]) if moodboard_words else "celebration and connection"
-        
-        return f"""A specific scene celebrating {trend}: People gathered together, experiencing {trend} in an authentic way. Include {trend}-specific elements, settings, and details that make it unmistakably about {trend}. The scene features {key_elements}. People are sharing Coca-Cola while engaging with {trend}, creating genuine moments of connection and joy."""
-
-
-def _optimize_prompt_for_pollinations(full_prompt: str) -> str:
-    """
-    Optimizes the prompt for Pollinations.ai by extracting key visual elements
-    and creating a highly detailed, trend-specific prompt.
-    Uses advanced prompt engineering techniques for better results.
-    """
-    # Extract trend name
-    trend = ""
-    if "specifically for" in full_prompt.lower():
-        parts = full_prompt.split("specifically for")
-        if len(parts) > 1:
-            trend = parts[1].split(".")[0].strip()
-    
-    # Extract scene description (the most important part)
-    scene_start = full_prompt.find("TREND-SPECIFIC VISUAL SCENE:")
-    scene_end = full_prompt.find("MOODBOARD VISUAL ELEMENTS:")
-    if scene_start > 0 and scene_end > 0:
-        scene = full_prompt[scene_start:scene_end].replace("TREND-SPECIFIC VISUAL SCENE:", "").strip()
-    else:
-        scene = ""
-    
-    # Extract moodboard
-    moodboard_start = full_prompt.find("MOODBOARD VISUAL ELEMENTS:")
-    moodboard_end = full_prompt.find("COMPOSITION REQUIREMENTS:")
-    if moodboard_start > 0 and moodboard_end > 0:
-        moodboard = full_prompt[moodboard_start:moodboard_end].replace("MOODBOARD VISUAL ELEMENTS:", "").strip()
-    else:
-        moodboard = ""
-    
-    # Build highly optimized prompt with better structure
-    # Use prompt engineering: subject + details + style + quality
+    head = f"Coca-Cola advertisement featuring {prompt.trend}, {prompt.scene}"
+    if prompt.variation:
+        head += f", {prompt.variation}"
     optimized_parts = [
-        f"Coca-Cola advertisement featuring {trend}",
-        scene,
-        moodboard,
+        head,
+        prompt.moodboard.strip(),
         "photorealistic, cinematic lighting, 8k quality, professional photography",
         "Coca-Cola red (#F40009) and white color scheme",
         "joyful atmosphere, human connection, celebration",
         "trending on artstation, highly detailed, sharp focus"
     ]
-    
     optimized = ", ".join([p for p in optimized_parts if p])
-    
-    # Limit length but prioritize trend-specific content
-    if len(optimized) > 600:
-        # Keep trend name and scene, trim the rest
-        trend_part = f"Coca-Cola advertisement featuring {trend}, {scene}"
-        remaining = optimized[len(trend_part):]
-        if len(trend_part) + len(remaining) > 600:
-            remaining = remaining[:600-len(trend_part)]
-        optimized = trend_part + remaining
-    
-    return optimized
+
+    # Limit length but never cut into the trend name, scene or variation
+    return optimized[:max(POLLINATIONS_MAX_PROMPT_CHARS, len(head))]
 
 
-def generate_image_url_pollinations(prompt: str) -> str:
+def generate_image_url_pollinations(prompt: "VisualPrompt | str") -> str:
     """
     Generates image using Pollinations.ai (FREE, no API key needed).
     Returns the image URL with a unique seed to ensure different images each time.
@@ -165,8 +157,11 @@ def generate_image_url_pollinations(prompt: str) -> str:
         # Pollinations.ai free API - no key needed!
         base_url = "https://image.pollinations.ai/prompt/"
         
-        # Optimize prompt for Pollinations (more concise, trend-focused)
-        optimized_prompt = _optimize_prompt_for_pollinations(prompt)
+        # Compact, trend-focused rendering (plain strings are used as given)
+        if isinstance(prompt, VisualPrompt):
+            optimized_prompt = prompt.to_pollinations()
+        else:
+            optimized_prompt = prompt[:POLLINATIONS_MAX_PROMPT_CHARS]
         
         # Encode the prompt
         encoded_prompt = urllib.parse.quote(optimized_prompt)
@@ -180,9 +175,12 @@ def generate_image_url_pollinations(prompt: str) -> str:
         # seed=random_seed ensures different images each time (not cached)
         image_url = f"{base_url}{encoded_prompt}?model=flux&width=1024&height=1024&seed={random_seed}"
         
-        # Pollinations generates images on-demand, so we return the URL directly
-        # The image will be generated when the URL is accessed
+        # Pollinations generates images on-demand, when the URL is first accessed.
+        # Start that now in the background so the UI, PDF and video stages find
+        # the bytes ready (or join the in-flight fetch) instead of waiting themselves.
         # If Pollinations is down, the GIF fallback will create a placeholder
+        if POLLINATIONS_EAGER_FETCH:
+            prefetch(image_url)
         return image_url
             
     except Exception as e:
@@ -192,20 +190,69 @@ def generate_image_url_pollinations(prompt: str) -> str:
         return "https://placeholder.pollinations.ai/1024x1024/F40009/FFFFFF?text=Coca-Cola"
 
 
-def generate_image_url(prompt: str) -> str:
+def generate_image_url_local(prompt: "VisualPrompt | str") -> str:
+    """
+    Renders a deterministic stand-in image offline (IMAGE_BACKEND=local).
+    The image goes straight into the local image store; the returned
+    "store://<sha>" handle works everywhere a URL does, except Instagram posting.
+    Same prompt (and LOCAL_IMAGE_SEED) -> same image, so pipeline runs are repeatable.
+    """
+    from .local_images import local_image_bytes
+    
+    text = prompt.to_pollinations() if isinstance(prompt, VisualPrompt) else str(prompt)
+    return store_image(local_image_bytes(text, size=LOCAL_IMAGE_SIZE, seed=LOCAL_IMAGE_SEED))
+
+
+def _image_backend() -> str:
+    """Backend selected by IMAGE_BACKEND ("auto" -> DALL-E with an OpenAI key, else Pollinations)."""
+    if IMAGE_BACKEND in ("pollinations", "local"):
+        return IMAGE_BACKEND
+    if IMAGE_BACKEND == "dalle" and not openai_client:
+        print("IMAGE_BACKEND=dalle but no OpenAI API key is set, using Pollinations")
+    return IMAGE_MODEL if openai_client else "pollinations"
+
+
+def generate_image_url(prompt: "VisualPrompt | str") -> str:
     """
     Generates an image URL using available services.
     Priority: OpenAI DALL-E (if available, paid) > Enhanced Pollinations.ai (FREE)
     
     NOTE: By default, uses Pollinations.ai which is 100% FREE.
     Only uses OpenAI DALL-E if you have an OpenAI API key (paid).
+    IMAGE_BACKEND forces a backend; "local" renders offline stand-in images.
+    Identical prompts requested at the same time share one generation.
+
+    With DALLE_RESPONSE_FORMAT=b64_json, DALL-E images are decoded straight into the
+    local image store and returned as a "store://<sha>" handle, which every pipeline
+    stage accepts like a URL and which never expires.
+
+    Args:
+        prompt: A VisualPrompt (rendered per provider) or a ready-made prompt string
     """
+    backend = _image_backend()
+    return _image_flight.do((prompt, backend), _generate_image_url, prompt, backend)
+
+
+def _generate_image_url(prompt: "VisualPrompt | str", backend: str = None) -> str:
+    backend = backend or _image_backend()
+    if backend == "local":
+        return generate_image_url_local(prompt)
+    
     # Try OpenAI DALL-E first (best quality, but PAID - requires API key)
-    if openai_client:
+    if backend == IMAGE_MODEL:
         try:
+            if DALLE_RESPONSE_FORMAT == "b64_json":
+                result = openai_client.images.generate(
+                    model=IMAGE_MODEL,
+                    prompt=str(prompt),
+                    size="1024x1024",
+                    response_format="b64_json",
+                )
+                # Image bytes come with the response - no second download
+                return store_image(base64.b64decode(result.data[0].b64_json))
             result = openai_client.images.generate(
                 model=IMAGE_MODEL,
-                prompt=prompt,
+                prompt=str(prompt),
                 size="1024x1024",
             )
             return result.data[0].url
@@ -216,27 +263,135 @@ def generate_image_url(prompt: str) -> str:
     return generate_image_url_pollinations(prompt)
 
 
+def _retry_prompt(prompt: "VisualPrompt | str", hint: str) -> "VisualPrompt | str":
+    if isinstance(prompt, VisualPrompt):
+        return prompt.with_variation(f"{prompt.variation}, {hint}" if prompt.variation else hint)
+    return f"{prompt}, {hint}"
+
+
+@lru_cache(maxsize=1024)
+def _perceptual_hashes(sha: str) -> tuple | None:
+    """(aHash, dHash) of a stored image, computed once per content hash."""
+    data = get_image_store().get_bytes(sha)
+    if not data:
+        return None
+    try:
+        return image_hashes(data)
+    except Exception as e:
+        print(f"Could not hash image {sha[:12]}: {e}")
+        return None
+
+
+def _generate_and_fetch(prompt: "VisualPrompt | str") -> tuple:
+    """Generates one image, waits until its bytes are in the image store and hashes them."""
+    try:
+        url = generate_image_url(prompt)
+    except Exception as e:
+        print(f"Image generation failed: {e}")
+        return None, None, None
+    if not url or not isinstance(url, str) or not url.strip():
+        return None, None, None
+    # Joins the eager Pollinations fetch if one is already running
+    sha = get_image_store().fetch(url.strip())
+    return url.strip(), sha, _perceptual_hashes(sha) if sha else None
+
+
+def generate_image_urls(
+    prompts: List["VisualPrompt | str"],
+    max_workers: int = IMAGE_BATCH_WORKERS,
+    exclude: Iterable[str] = (),
+    fallback_url: str = None,
+    retry_hint: str = "completely different scene, unique composition"
+) -> List[str]:
+    """
+    Generates a set of images concurrently (e.g. multi-scene variations) and
+    returns once every image is downloaded into the local store.
+
+    Each prompt is generated, fetched and perceptually hashed in parallel with
+    bounded concurrency. Failed downloads and duplicates (same URL, same bytes
+    or a near-identical look by aHash/dHash, including anything in `exclude`)
+    are regenerated once with `retry_hint`. A scene still missing gets the
+    rejected candidate that looks least like the accepted ones, and only
+    then `fallback_url`.
+
+    Args:
+        prompts: One prompt per image
+        max_workers: Maximum parallel generations
+        exclude: URLs the new images must differ from (e.g. the hero image)
+        fallback_url: Used for scenes that could not be generated
+
+    Returns:
+        List of image URLs, one per prompt (always the same length as prompts)
+    """
+    if not prompts:
+        return []
+
+    store = get_image_store()
+    seen_urls = {u.strip() for u in exclude if u}
+    seen_shas = {store.lookup(u) for u in seen_urls} - {None}
+    accepted_hashes = [h for h in (_perceptual_hashes(sha) for sha in seen_shas) if h]
+    near_duplicates = []  # (url, sha, hashes) rejected for looking like an accepted image
+    results: List = [None] * len(prompts)
+
+    def accept(index: int, url: str, sha: str, hashes: tuple) -> bool:
+        if not url or not sha or url in seen_urls or sha in seen_shas:
+            return False
+        if hashes and any(is_near_duplicate(hashes, other) for other in accepted_hashes):
+            near_duplicates.append((url, sha, hashes))
+            return False
+        seen_urls.add(url)
+        seen_shas.add(sha)
+        if hashes:
+            accepted_hashes.append(hashes)
+        results[index] = url
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as pool:
+        first = list(pool.map(_generate_and_fetch, prompts))
+        retry = [i for i, candidate in enumerate(first) if not accept(i, *candidate)]
+
+        if retry:
+            print(f"Regenerating {len(retry)} of {len(prompts)} images (failed or duplicate)")
+            second = pool.map(_generate_and_fetch, [_retry_prompt(prompts[i], retry_hint) for i in retry])
+            for i, candidate in zip(retry, second):
+                accept(i, *candidate)
+
+    missing = [i for i, url in enumerate(results) if url is None]
+    for i in missing:
+        # Prefer the rejected candidate that differs most from everything accepted
+        candidates = [c for c in near_duplicates if c[0] not in seen_urls and c[1] not in seen_shas]
+        if not candidates:
+            break
+        url, sha, hashes = max(candidates, key=lambda c: min(
+            (hash_distance(c[2], other) for other in accepted_hashes), default=64))
+        seen_urls.add(url)
+        seen_shas.add(sha)
+        accepted_hashes.append(hashes)
+        results[i] = url
+
+    missing = [i for i, url in enumerate(results) if url is None]
+    if missing:
+        fallback = fallback_url or next((url for url in results if url), None)
+        print(f"Using fallback image for {len(missing)} of {len(prompts)} scenes")
+        for i in missing:
+            results[i] = fallback
+    return results
+
+
 def build_video_prompt(trend: str, moodboard: str, campaign_concept: str = "") -> str:
     """
     Creates a video prompt optimized for AI video generation.
     Videos work best with dynamic, action-oriented descriptions.
     """
-    trend_lower = trend.lower()
-    
-    # Build dynamic scene description for video
-    if any(word in trend_lower for word in ["super bowl", "nfl", "football", "sports", "game", "championship"]):
-        video_scene = f"Dynamic scene: Fans celebrating {trend}, cheering, high-fives, people sharing Coca-Cola bottles. Camera moves through the crowd, capturing joyful moments. Stadium atmosphere with {trend} energy."
-    elif any(word in trend_lower for word in ["coachella", "festival", "concert", "music"]):
-        video_scene = f"Energetic scene: People at {trend}, dancing, music playing, friends sharing Coca-Cola. Camera follows the celebration, capturing the vibrant {trend} atmosphere."
-    elif any(word in trend_lower for word in ["christmas", "valentine", "easter", "holiday"]):
-        video_scene = f"Heartwarming scene: Families celebrating {trend} together, sharing moments and Coca-Cola. Warm, joyful atmosphere with {trend} decorations visible."
-    else:
-        video_scene = f"Celebratory scene: People gathered for {trend}, sharing joy and Coca-Cola. Dynamic, uplifting atmosphere capturing the essence of {trend}."
-    
+    return build_visual_prompt(trend, moodboard).to_video()
+
+
+@lru_cache(maxsize=512)
+def _render_video(prompt: VisualPrompt) -> str:
     # Optimize for video generation (shorter, action-focused)
     optimized_parts = [
-        f"Coca-Cola advertisement video: {trend}",
-        video_scene,
+        f"Coca-Cola advertisement video: {prompt.trend}",
+        prompt.video_scene,
         "smooth camera movement, cinematic, professional",
         "Coca-Cola red and white colors",
         "joyful, energetic, human connection"
@@ -245,33 +400,27 @@ def build_video_prompt(trend: str, moodboard: str, campaign_concept: str = "") -
     return ", ".join([p for p in optimized_parts if p])
 
 
-def generate_video_url_huggingface(image_url: str) -> str | None:
+def generate_video_url_huggingface(image_url: str) -> VideoResult:
     """
     Generates video using Hugging Face's free Stable Video Diffusion API.
     Uses image-to-video: takes the generated image and creates a short animated video (3-5 seconds).
     
     Free tier: ~30 requests/hour, perfect for testing!
+
+    Returns:
+        VideoResult - "done" with the local video path, "loading" with the API's
+        estimated_time while the model cold-starts, or "failed" with the reason
     """
     try:
-        # Download the image first
-        print(f"Downloading image from {image_url[:50]}...")
-        img_response = requests.get(image_url, timeout=60)
-        if img_response.status_code != 200:
-            print(f"Failed to download image: {img_response.status_code}")
-            return None
-        
-        image_data = img_response.content
+        # Get the image from the local store (downloaded once, shared with other stages)
+        print(f"Loading image from {image_url[:50]}...")
+        image_data = get_image_bytes(image_url)
+        if not image_data:
+            print("Failed to download image")
+            return VideoResult("failed", error="Could not download the image")
         
-        # Determine image format from content or URL
-        content_type = "image/png"  # Default
-        # Check URL extension
-        if image_url.lower().endswith(('.jpg', '.jpeg')):
-            content_type = "image/jpeg"
-        # Check actual image content (more reliable)
-        elif img_response.headers.get('content-type', '').startswith('image/jpeg'):
-            content_type = "image/jpeg"
-        elif img_response.headers.get('content-type', '').startswith('image/png'):
-            content_type = "image/png"
+        # Determine image format from the actual content
+        content_type = sniff_content_type(image_data) or "image/png"
         
         # Hugging Face Stable Video Diffusion model (image-to-video)
         # This model takes an image and creates a short video from it
@@ -296,7 +445,7 @@ def generate_video_url_huggingface(image_url: str) -> str | None:
             )
         except requests.exceptions.RequestException as e:
             print(f"Request exception: {e}")
-            return None
+            return VideoResult("failed", error=f"Request failed: {e}")
         
         if response.status_code == 200:
             # Success! Save the video
@@ -309,23 +458,21 @@ def generate_video_url_huggingface(image_url: str) -> str | None:
             
             print(f"Video generated successfully: {video_path}")
             # Return the file path - Streamlit can display local video files
-            return video_path
+            return VideoResult("done", video_path=video_path)
             
         elif response.status_code == 503:
             # Model is loading (cold start) - this is normal for free tier
             try:
-                error_data = response.json()
-                estimated_time = error_data.get("estimated_time", 30)
-                print(f"Model is loading, estimated wait: {estimated_time} seconds")
-                # Return a special indicator that we need to wait
-                return f"LOADING:{estimated_time}"
-            except:
-                return "LOADING:30"  # Default wait time
+                estimated_time = float(response.json().get("estimated_time"))
+            except Exception:
+                estimated_time = None  # The job backs off on its own without an estimate
+            print(f"Model is loading, estimated wait: {estimated_time} seconds")
+            return VideoResult("loading", estimated_time=estimated_time)
             
         elif response.status_code == 429:
             # Rate limit exceeded
             print("Rate limit exceeded - free tier has limits")
-            return None
+            return VideoResult("failed", error="Hugging Face rate limit exceeded (429)")
             
         else:
             # Other error
@@ -335,143 +482,103 @@ def generate_video_url_huggingface(image_url: str) -> str | None:
             except:
                 error_text = response.text
             print(f"Hugging Face API error ({response.status_code}): {error_text[:200]}")
-            return None
+            return VideoResult("failed", error=f"Hugging Face API error ({response.status_code})")
             
     except requests.exceptions.Timeout:
         print("Hugging Face API timeout - video generation takes time (up to 2 minutes)")
-        return None
+        return VideoResult("failed", error="Hugging Face API timeout")
     except Exception as e:
         print(f"Error generating video with Hugging Face: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return VideoResult("failed", error=str(e))
 
 
-def generate_animated_gif_fallback(image_url: str) -> str | None:
+def _load_animation_source(image_url: str, max_size: int = 1024, rendition: str = "animation"):
+    """
+    Source image for the local animation paths, as RGB capped at max_size.
+    `rendition` picks the cached rendition to start from (see app.image_derivatives).
+    Falls back to a Coca-Cola red placeholder when the image can't be downloaded.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    from .ken_burns import prepare_source_image
+    from .image_derivatives import get_derivative
+    
+    # Rendition from the local store (downloaded and decoded once for every consumer)
+    image = get_derivative(image_url, rendition)
+    if image is not None:
+        return prepare_source_image(image, max_size=max_size)
+    
+    # If download failed, create a placeholder image
+    print("  ⚠️ Image download failed, creating placeholder image...")
+    # Create a simple placeholder with Coca-Cola branding
+    placeholder = Image.new('RGB', (1024, 1024), color='#F40009')  # Coca-Cola red
+    draw = ImageDraw.Draw(placeholder)
+    # Add text
+    try:
+        # Try to use a larger font
+        font_size = 80
+        try:
+            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
+        except:
+            font = ImageFont.load_default()
+        text = "Coca-Cola"
+        bbox = draw.textbbox((0, 0), text, font=font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        position = ((1024 - text_width) // 2, (1024 - text_height) // 2)
+        draw.text(position, text, fill='white', font=font)
+    except:
+        # If font fails, just draw a simple rectangle
+        draw.rectangle([200, 400, 824, 624], fill='white', outline='white', width=5)
+    return prepare_source_image(placeholder, max_size=max_size)
+
+
+def generate_animated_gif_fallback(image_url: str, fmt: str = ANIMATION_FORMAT, rendition: str = "animation",
+                                   base_zoom: float = 1.0) -> str | None:
     """
     Fallback: Creates a simple animated GIF from the image.
     This ensures we always have video output even if external APIs fail.
     
     Creates a subtle animation with zoom/pan effects - perfect for social media!
+    
+    Args:
+        image_url: URL of the image to animate
+        fmt: "gif", "webp" (smaller, full colour) or "mp4" (for consumers that re-encode with ffmpeg)
+        rendition: Rendition to animate - "animation" (up to 1024px) for display, or the video
+            working rendition so a video can use the frames without resampling them again
+        base_zoom: Constant zoom folded into each frame's resample (a video's scene crop)
+    
+    Returns:
+        Path to the animation file (extension matches the format), or None on failure
     """
     try:
-        from PIL import Image, ImageEnhance, ImageDraw, ImageFont
         import tempfile
-        import io
-        
-        # Download the image with retry
-        print("Creating animated GIF from image...")
-        img_response = None
-        for attempt in range(2):  # Try 2 times
-            try:
-                img_response = requests.get(image_url, timeout=30)
-                if img_response.status_code == 200:
-                    break
-            except Exception as e:
-                print(f"  Download attempt {attempt + 1} failed: {e}")
-                if attempt < 1:
-                    import time
-                    time.sleep(1)
-        
-        # If download failed, create a placeholder image
-        if not img_response or img_response.status_code != 200:
-            print("  ⚠️ Image download failed, creating placeholder image...")
-            # Create a simple placeholder with Coca-Cola branding
-            placeholder = Image.new('RGB', (1024, 1024), color='#F40009')  # Coca-Cola red
-            draw = ImageDraw.Draw(placeholder)
-            # Add text
-            try:
-                # Try to use a larger font
-                font_size = 80
-                from PIL import ImageFont
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-                except:
-                    font = ImageFont.load_default()
-                text = "Coca-Cola"
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                position = ((1024 - text_width) // 2, (1024 - text_height) // 2)
-                draw.text(position, text, fill='white', font=font)
-            except:
-                # If font fails, just draw a simple rectangle
-                draw.rectangle([200, 400, 824, 624], fill='white', outline='white', width=5)
-            
-            # Use the placeholder directly
-            image = placeholder
-        else:
-            # Open the downloaded image
-            image = Image.open(io.BytesIO(img_response.content))
+        from .ken_burns import iter_ken_burns_frames, ken_burns_palette_samples
+        from .frame_writer import resolve_animation_format, write_frames
         
-        # Convert to RGB if needed (GIFs need RGB)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        fmt = resolve_animation_format(fmt)
         
-        # Resize if too large (GIFs work better at reasonable sizes)
-        max_size = 1024
-        if image.width > max_size or image.height > max_size:
-            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        
-        # Create frames for animation (subtle zoom/pan effect)
-        frames = []
-        num_frames = 20  # 20 frames for smooth animation
-        duration = 100  # 100ms per frame = 2 seconds total
+        print(f"Creating animated {fmt.upper()} from image...")
+        # Decode, convert to RGB and cap the size (GIFs work better at reasonable sizes)
+        image = _load_animation_source(image_url, max_size=max(1024, VIDEO_SIZE), rendition=rendition)
         
-        # Create subtle animation: slight zoom in + brightness pulse
-        for i in range(num_frames):
-            # Calculate zoom factor (1.0 to 1.1)
-            zoom = 1.0 + (0.1 * i / num_frames)
-            
-            # Calculate crop box (center crop with zoom)
-            width, height = image.size
-            new_width = int(width / zoom)
-            new_height = int(height / zoom)
-            left = (width - new_width) // 2
-            top = (height - new_height) // 2
-            
-            # Crop and resize back to original size
-            frame = image.crop((left, top, left + new_width, top + new_height))
-            frame = frame.resize((width, height), Image.Resampling.LANCZOS)
-            
-            # Add subtle brightness pulse (1.0 to 1.15)
-            brightness_factor = 1.0 + (0.15 * (0.5 + 0.5 * (i / num_frames)))
-            enhancer = ImageEnhance.Brightness(frame)
-            frame = enhancer.enhance(brightness_factor)
-            
-            frames.append(frame)
-        
-        # Create reverse frames for smooth loop (zoom out)
-        for i in range(num_frames - 2, 0, -1):
-            zoom = 1.0 + (0.1 * i / num_frames)
-            width, height = image.size
-            new_width = int(width / zoom)
-            new_height = int(height / zoom)
-            left = (width - new_width) // 2
-            top = (height - new_height) // 2
-            
-            frame = image.crop((left, top, left + new_width, top + new_height))
-            frame = frame.resize((width, height), Image.Resampling.LANCZOS)
-            
-            brightness_factor = 1.0 + (0.15 * (0.5 + 0.5 * (i / num_frames)))
-            enhancer = ImageEnhance.Brightness(frame)
-            frame = enhancer.enhance(brightness_factor)
-            
-            frames.append(frame)
-        
-        # Save as animated GIF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.gif') as tmp_file:
-            frames[0].save(
-                tmp_file.name,
-                save_all=True,
-                append_images=frames[1:],
-                duration=duration,
-                loop=0,  # Infinite loop
-                optimize=True
-            )
+        # Stream the animation: slight zoom in + brightness pulse, then back out.
+        # Frames are rendered on demand and encoded as they come, so only one is in memory.
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{fmt}') as tmp_file:
             gif_path = tmp_file.name
+        num_frames = 20  # 20 frames for smooth animation
+        write_frames(
+            iter_ken_burns_frames(image, num_frames=num_frames, base_zoom=base_zoom),
+            gif_path,
+            fmt=fmt,
+            duration=100,  # 100ms per frame
+            loop=0,  # Infinite loop
+            # One GIF palette for the whole loop, covering its dimmest and brightest frames
+            palette_samples=ken_burns_palette_samples(image, num_frames, base_zoom) if fmt == "gif" else None
+        )
         
-        print(f"Animated GIF created: {gif_path}")
+        print(f"Animated {fmt.upper()} created: {gif_path}")
         return gif_path
         
     except ImportError:
@@ -484,25 +591,89 @@ def generate_animated_gif_fallback(image_url: str) -> str | None:
         return None
 
 
-def generate_video_url(prompt: str, image_url: str = None) -> str | None:
+def generate_procedural_video(image_url: str, fmt: str = PROCEDURAL_VIDEO_FORMAT, pan: str = "orbit") -> str | None:
+    """
+    Renders a short looping video from the image locally - no network, CPU only.
+    Parallax between a foreground and background layer, a camera pan, Coca-Cola
+    red sparkles and a light sweep (see app.procedural_animation).
+    
+    Args:
+        image_url: URL of the image to animate
+        fmt: "mp4", "webp" or "gif"
+        pan: Pan path ("orbit", "drift", "rise" or "diagonal")
+    
+    Returns:
+        Path to the video file, or None on failure
+    """
+    try:
+        import tempfile
+        from .procedural_animation import (
+            PROCEDURAL_DURATION, PROCEDURAL_FPS, ProceduralAnimation, iter_procedural_frames,
+            procedural_palette_samples
+        )
+        from .frame_writer import resolve_animation_format, write_frames
+        
+        fmt = resolve_animation_format(fmt)
+        print(f"Rendering procedural {fmt.upper()} from image...")
+        image = _load_animation_source(image_url, max_size=PROCEDURAL_MAX_SIZE)
+        animation = ProceduralAnimation(image, pan=pan)
+        
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{fmt}') as tmp_file:
+            video_path = tmp_file.name
+        write_frames(
+            iter_procedural_frames(image, PROCEDURAL_DURATION, PROCEDURAL_FPS, animation=animation),
+            video_path,
+            fmt=fmt,
+            duration=round(1000 / PROCEDURAL_FPS),
+            loop=0,
+            palette_samples=procedural_palette_samples(animation) if fmt == "gif" else None
+        )
+        
+        print(f"Procedural {fmt.upper()} created: {video_path}")
+        return video_path
+    
+    except Exception as e:
+        print(f"Error rendering procedural video: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def generate_video_url(prompt: str, image_url: str = None, engine: str = VIDEO_ENGINE) -> str | None:
     """
-    Generates a video using Hugging Face's free Stable Video Diffusion API.
-    Takes the generated image and creates a short animated video (3-5 seconds).
+    Generates a short animated video (3-5 seconds) from the campaign image.
     
-    If Hugging Face fails, falls back to creating an animated GIF from the image.
+    Engines:
+        "huggingface": Hugging Face's free Stable Video Diffusion API (~30 requests/hour).
+            The request runs as a background job (app.video_jobs), so this returns the
+            animated GIF fallback right away. Check video_jobs.get(image_url) to swap in
+            the real video once the job is done.
+        "procedural": Local parallax / sparkle / light sweep animation, rendered in a few seconds
+        "kenburns": Animated GIF fallback only
     
-    Free tier: ~30 requests/hour - perfect for testing!
+    Args:
+        prompt: Video prompt (kept for API compatibility; the engines animate the image)
+        image_url: URL of the image to animate
+        engine: One of the engines above (defaults to VIDEO_ENGINE)
+    
+    Returns:
+        Path to the video or animation file, or None on failure
     """
     if not image_url:
         print("No image URL provided for video generation")
         return None
     
-    # Try Hugging Face's free image-to-video API first
-    video_result = generate_video_url_huggingface(image_url)
+    if engine == "procedural":
+        video_path = generate_procedural_video(image_url)
+        if video_path:
+            return video_path
     
-    # If Hugging Face fails or returns loading state, use GIF fallback
-    if not video_result or video_result.startswith("LOADING:"):
-        print("Hugging Face unavailable, using animated GIF fallback...")
-        return generate_animated_gif_fallback(image_url)
+    # Start Hugging Face's free image-to-video API in the background
+    elif engine == "huggingface" and HF_VIDEO_ENABLED:
+        from .video_jobs import video_jobs
+        job = video_jobs.submit(image_url)
+        if job.status == "done" and job.video_path:
+            return job.video_path
     
-    return video_result
+    # Serve the animated GIF now; a Hugging Face video replaces it when the job finishes
+    return generate_animated_gif_fallback(image_url)
@@ -0,0 +1,137 @@
+"""
+Warm Pool Module - Speculative pre-generation for top-ranked trends
+A background worker prepares the campaign, image URL and slogan audio for the
+first few trends of the current snapshot so clicking Generate on them is instant.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .config import WARM_POOL_SIZE, WARM_POOL_WORKERS, WARM_POOL_TTL_SECONDS
+from .trend_classifier import classify_trend
+from .creative_engine import generate_campaign_for_trend
+from .visual_engine import build_visual_prompt, generate_image_url
+from .audio_generator import get_audio_bytes
+
+
+def build_campaign_assets(trend: str, category: str) -> dict:
+    """
+    Generates everything the results page needs for one trend.
+
+    Returns:
+        Dict with trend, category, campaign, visual_prompt, image_url, audio_bytes and created_at
+    """
+    campaign = generate_campaign_for_trend(trend, category)
+    visual_prompt = build_visual_prompt(trend, campaign.get("moodboard", ""))
+    image_url = generate_image_url(visual_prompt)
+
+    audio_bytes = None
+    slogan = campaign.get("slogan", "")
+    if slogan:
+        try:
+            audio_bytes = get_audio_bytes(slogan)
+        except Exception as e:
+            print(f"Warm pool: audio failed for '{trend}': {e}")
+
+    return {
+        "trend": trend,
+        "category": category,
+        "campaign": campaign,
+        "visual_prompt": visual_prompt,
+        "image_url": image_url,
+        "audio_bytes": audio_bytes,
+        "created_at": time.time(),
+    }
+
+
+class WarmPool:
+    """
+    Keeps pre-generated assets for the top `size` safe trends.
+    Shared by all sessions; the most recent trend snapshot decides what stays warm.
+    """
+
+    def __init__(self, size: int = WARM_POOL_SIZE, max_workers: int = WARM_POOL_WORKERS,
+                 ttl_seconds: int = WARM_POOL_TTL_SECONDS):
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._futures: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="warm-pool") \
+            if size > 0 else None
+
+    def _targets(self, trends: List[str]) -> Dict[str, str]:
+        """First `size` trends that are safe to generate for, with their category."""
+        targets = {}
+        for trend in trends:
+            if len(targets) >= self.size:
+                break
+            category = classify_trend(trend)
+            if category != "skip":
+                targets[trend] = category
+        return targets
+
+    def warm(self, trends: List[str]):
+        """
+        Schedules pre-generation for the top trends of a snapshot and evicts
+        entries for trends that dropped out of it. Cheap to call on every rerun.
+        """
+        if not self._executor:
+            return
+
+        targets = self._targets(trends)
+        now = time.time()
+        submitted = []
+        with self._lock:
+            for trend in list(self._entries):
+                entry = self._entries[trend]
+                if trend not in targets or now - entry["created_at"] > self.ttl_seconds:
+                    del self._entries[trend]
+            for trend in list(self._futures):
+                if trend not in targets:
+                    # Queued jobs are dropped, a running one finishes and is discarded
+                    self._futures.pop(trend).cancel()
+
+            for trend, category in targets.items():
+                if trend in self._entries or trend in self._futures:
+                    continue
+                future = self._executor.submit(build_campaign_assets, trend, category)
+                self._futures[trend] = future
+                submitted.append((trend, future))
+
+        # Outside the lock: a callback on an already-finished future runs right away
+        for trend, future in submitted:
+            future.add_done_callback(lambda f, t=trend: self._store(t, f))
+
+    def _store(self, trend: str, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        with self._lock:
+            if self._futures.get(trend) is not future:
+                return  # Evicted while running
+            del self._futures[trend]
+            if error is None:
+                self._entries[trend] = future.result()
+        if error is not None:
+            print(f"Warm pool: could not pre-generate '{trend}': {error}")
+
+    def get(self, trend: str) -> Optional[dict]:
+        """Returns a ready entry for the trend (a copy), or None if it isn't warm."""
+        with self._lock:
+            entry = self._entries.get(trend)
+            if entry is None or time.time() - entry["created_at"] > self.ttl_seconds:
+                return None
+            entry = dict(entry)
+        entry["campaign"] = dict(entry["campaign"])
+        return entry
+
+    def status(self) -> Dict[str, int]:
+        """Counts of ready and pending entries, for the sidebar."""
+        with self._lock:
+            return {"ready": len(self._entries), "pending": len(self._futures)}
+
+
+# Shared by every Streamlit session in this process
+warm_pool = WarmPool()
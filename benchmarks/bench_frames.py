@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Ken Burns frame synthesis in the animated GIF fallback.
+Compares the original per-frame crop + LANCZOS resize + ImageEnhance loop with
+app.ken_burns (one boxed resample + brightness LUT per distinct frame, reused
+for the zoom-out half). Runs offline on a synthetic image.
+
+The encode section writes a whole animation per run in a fresh subprocess and
+reports its peak RSS and file size: the original list + save_all GIF (a palette
+per frame) against generator frames streamed through app.frame_writer as GIF
+(one shared palette), WebP and MP4, at growing frame counts.
+
+Usage:
+    python benchmarks/bench_frames.py --size 1024 --repeat 3 --encode-size 512 --frame-counts 10 20 40
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageEnhance
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.frame_writer import write_frames
+from app.ken_burns import KEN_BURNS_FRAMES, iter_ken_burns_frames, ken_burns_frames, ken_burns_palette_samples
+
+ENCODERS = ["legacy", "gif", "webp", "mp4"]
+
+
+def synthetic_image(size: int) -> Image.Image:
+    """Smooth random colour field with some detail - stands in for a generated ad image."""
+    rng = np.random.default_rng(7)
+    cells = (rng.random((48, 48, 3)) * 255).astype(np.uint8)
+    return Image.fromarray(cells).resize((size, size), Image.Resampling.BICUBIC)
+
+
+def legacy_frames(image: Image.Image, num_frames: int = KEN_BURNS_FRAMES):
+    """The frame loop generate_animated_gif_fallback used before app.ken_burns."""
+    frames = []
+    indices = list(range(num_frames)) + list(range(num_frames - 2, 0, -1))
+    for i in indices:
+        zoom = 1.0 + (0.1 * i / num_frames)
+        width, height = image.size
+        new_width = int(width / zoom)
+        new_height = int(height / zoom)
+        left = (width - new_width) // 2
+        top = (height - new_height) // 2
+        frame = image.crop((left, top, left + new_width, top + new_height))
+        frame = frame.resize((width, height), Image.Resampling.LANCZOS)
+        brightness_factor = 1.0 + (0.15 * (0.5 + 0.5 * (i / num_frames)))
+        frame = ImageEnhance.Brightness(frame).enhance(brightness_factor)
+        frames.append(frame)
+    return frames
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far.
+    Linux: VmHWM, since ru_maxrss keeps the parent's peak across fork + exec.
+    Elsewhere: ru_maxrss (bytes on macOS, KB on other platforms).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def encode(implementation: str, image: Image.Image, num_frames: int, path: str):
+    if implementation == "legacy":
+        frames = legacy_frames(image, num_frames)
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, loop=0, optimize=True)
+    else:
+        samples = ken_burns_palette_samples(image, num_frames) if implementation == "gif" else None
+        write_frames(iter_ken_burns_frames(image, num_frames), path, fmt=implementation, duration=100, loop=0,
+                     palette_samples=samples)
+
+
+def run_worker(implementation: str, size: int, num_frames: int):
+    """Encodes one animation and prints timing and memory as JSON (runs in its own process)."""
+    image = synthetic_image(size)
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench." + ("gif" if implementation == "legacy" else implementation))
+        start = time.perf_counter()
+        encode(implementation, image, num_frames, path)
+        elapsed = time.perf_counter() - start
+        file_mb = os.path.getsize(path) / (1024 * 1024)
+    print(json.dumps({"seconds": elapsed, "baseline_mb": baseline, "peak_mb": peak_rss_mb(), "file_mb": file_mb}))
+
+
+def measure_encode(implementation: str, size: int, num_frames: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--worker", implementation, "--size", str(size), "--frames", str(num_frames)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_frames(build, image, repeat):
+    timings = []
+    frames = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = build(image)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Ken Burns frame synthesis")
+    parser.add_argument("--size", type=int, default=1024, help="Square source image size in pixels")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (median reported)")
+    parser.add_argument("--encode-size", type=int, default=512,
+                        help="Source image size for the encode section (legacy per-frame quantization is slow)")
+    parser.add_argument("--frame-counts", type=int, nargs="+", default=[10, 20, 40],
+                        help="Zoom-in frame counts for the encode / peak memory section")
+    parser.add_argument("--encoders", nargs="+", choices=ENCODERS, default=ENCODERS,
+                        help="Encoders to compare in the encode section")
+    parser.add_argument("--worker", choices=ENCODERS, help=argparse.SUPPRESS)
+    parser.add_argument("--frames", type=int, default=KEN_BURNS_FRAMES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.size, args.frames)
+        return
+
+    image = synthetic_image(args.size)
+    legacy_time, legacy = time_frames(legacy_frames, image, args.repeat)
+    new_time, new = time_frames(ken_burns_frames, image, args.repeat)
+
+    diffs = [np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).mean()
+             for a, b in zip(legacy, new)]
+    unique = len({id(frame) for frame in new})
+
+    print(f"Source image: {args.size}x{args.size}, {len(legacy)} output frames, median of {args.repeat} runs")
+    print(f"{'implementation':<28}{'seconds':>10}{'frames/s':>12}{'rendered':>10}")
+    print(f"{'legacy (crop+LANCZOS+enhance)':<28}{legacy_time:>10.3f}{len(legacy) / legacy_time:>12.1f}{len(legacy):>10}")
+    print(f"{'ken_burns (boxed+LUT+reuse)':<28}{new_time:>10.3f}{len(new) / new_time:>12.1f}{unique:>10}")
+    print(f"Speedup: {legacy_time / new_time:.1f}x  |  mean abs pixel difference: {statistics.mean(diffs):.2f} / 255")
+
+    print()
+    print(f"Encode at {args.encode_size}x{args.encode_size}, one subprocess per run "
+          f"(+MB = peak RSS above the process baseline):")
+    print(f"{'implementation':<16}{'frames':>8}{'seconds':>10}{'peak MB':>10}{'+MB':>8}{'file MB':>10}")
+    for num_frames in args.frame_counts:
+        output_frames = 2 * num_frames - 2
+        for implementation in args.encoders:
+            result = measure_encode(implementation, args.encode_size, num_frames)
+            print(f"{implementation:<16}{output_frames:>8}{result['seconds']:>10.2f}{result['peak_mb']:>10.0f}"
+                  f"{result['peak_mb'] - result['baseline_mb']:>8.0f}{result['file_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the campaign generation path against the local mock LLM server.
+No network or API quota needed - everything runs on 127.0.0.1.
+
+Usage:
+    python benchmarks/bench_generation.py --latency-ms 200 --malformed-rate 0.2
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.mock_llm_server import MockLLMConfig, start_mock_server
+
+
+TRENDS = [
+    "Super Bowl LIX", "Grammys", "Coachella", "World Cup Qualifiers", "Christmas Markets",
+    "Summer Road Trip", "Taylor Swift Eras Tour", "NBA Finals", "Pride Month", "Back to School",
+]
+NEAR_DUPLICATES = [
+    "Super Bowl LIX", "Super Bowl Sunday", "Super Bowl halftime",
+    "Christmas Eve", "Christmas Markets", "Christmas Day",
+    "NBA Finals", "NBA Finals Game 7",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round((len(ordered) - 1) * pct / 100)))
+    return ordered[index]
+
+
+def report(name, latencies_ms):
+    print(f"  {name:<38} n={len(latencies_ms):<4} p50={percentile(latencies_ms, 50):7.1f}ms "
+          f"p95={percentile(latencies_ms, 95):7.1f}ms mean={statistics.mean(latencies_ms):7.1f}ms")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )
+    server, base_url = start_mock_server(config=config)
+
+    # Point the app at the mock server before app.config is imported
+    os.environ["GROQ_API_KEY"] = "mock"
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "your_openai_api_key_here"  # Placeholder value = OpenAI disabled
+    os.environ["LLM_MAX_RETRIES"] = "0"
+    os.environ["EXEMPLAR_TOP_K"] = "0"
+
+    from app import llm_ledger
+    llm_ledger.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_ledger.db")
+    from app.creative_engine import generate_campaign_for_trend, generate_campaign_variants
+    from app.campaign_cache import campaign_cache
+
+    print(f"Mock server: {base_url}  (latency {args.latency_ms}ms, errors {args.error_rate}, "
+          f"429s {args.rate_limit_rate}, malformed {args.malformed_rate})")
+    print("=" * 80)
+
+    # 1. Cold generation, no cache
+    latencies = [timed(generate_campaign_for_trend, t, "general", use_cache=False)[1] for t in TRENDS]
+    report("cold generation (no cache)", latencies)
+
+    # 2. Near-duplicate trends through the similarity cache
+    campaign_cache.clear()
+    before = config.stats["requests"]
+    latencies = [timed(generate_campaign_for_trend, t, "sports")[1] for t in NEAR_DUPLICATES]
+    report("near-duplicate trends (cache on)", latencies)
+    print(f"  {'':<38} LLM requests: {config.stats['requests'] - before}/{len(NEAR_DUPLICATES)}")
+
+    # 3. Variants in one request vs. N separate requests
+    for n in (1, 3, 5):
+        _, single_ms = timed(generate_campaign_variants, "Grammys", "entertainment", n)
+        separate = [timed(generate_campaign_for_trend, "Grammys", "entertainment", use_cache=False)[1] for _ in range(n)]
+        print(f"  variants n={n}: one request {single_ms:7.1f}ms vs {n} requests {sum(separate):7.1f}ms")
+
+    # 4. Concurrent identical requests (duplicate clicks from several sessions)
+    campaign_cache.clear()
+    before = config.stats["requests"]
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: generate_campaign_for_trend("Coachella", "entertainment", use_cache=False),
+                      range(args.concurrency)))
+        wall_ms = (time.perf_counter() - start) * 1000
+    print(f"  {args.concurrency} concurrent identical requests: {wall_ms:7.1f}ms wall, "
+          f"{config.stats['requests'] - before} LLM requests")
+
+    # Ledger summary
+    print("=" * 80)
+    for name, stats in llm_ledger.latency_percentiles(days=1, successful_only=False).items():
+        print(f"  ledger {name:<8} p50={stats['p50']:7.1f}ms p95={stats['p95']:7.1f}ms calls={stats['calls']}")
+    for row in llm_ledger.daily_spend(days=1):
+        print(f"  ledger {row['provider']:<8} tokens in/out={row['prompt_tokens']}/{row['completion_tokens']} "
+              f"failures={row['failures']} est. cost=${row['cost_usd']:.4f}")
+    print(f"  mock server stats: {config.stats}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark that runs fully offline.
+Images come from the local stand-in backend (IMAGE_BACKEND=local) and go
+straight into a temporary image store, so every downstream stage - renditions,
+animated GIF, procedural video, PDF brief, multi-scene video - is timed without
+network latency or API noise. Instagram posting needs a public URL and is not
+part of the run.
+
+Each run uses a fresh store and different prompts, so nothing is cached between
+runs; the medians are reported.
+
+Usage:
+    python benchmarks/bench_pipeline.py --scenes 3 --audio-seconds 8 --runs 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# The backend and store are read from the environment when app.config is imported
+os.environ["IMAGE_BACKEND"] = "local"
+os.environ["HF_VIDEO_ENABLED"] = "false"
+os.environ.setdefault("IMAGE_STORE_DIR", tempfile.mkdtemp(prefix="bench-store-"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app.image_store as image_store_module
+from app.image_derivatives import get_derivatives
+from app.multi_scene_video import create_multi_scene_video
+from app.pdf_exporter import export_campaign_to_pdf
+from app.visual_engine import (
+    build_visual_prompt, generate_animated_gif_fallback, generate_image_urls, generate_procedural_video
+)
+
+STAGES = ["images", "renditions", "gif", "procedural", "pdf", "multi_scene"]
+VARIATIONS = ["wide angle shot", "close-up detail", "crowd celebration", "aerial view", "night scene"]
+CAMPAIGN = {
+    "slogan": "Real Magic Tastes Like This",
+    "hero_concept": "Friends share ice-cold Coca-Cola under stadium lights.",
+    "moodboard": "Red and white confetti, stadium lights, warm smiles",
+    "social_caption": "Share the moment.",
+    "hashtags": ["#RealMagic", "#CocaCola"],
+}
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """Silent MP3 of the given length (the voice-over stand-in)."""
+    import imageio_ffmpeg
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "silence.mp3")
+        subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono",
+                        "-t", str(seconds), "-q:a", "9", path], check=True, capture_output=True)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def run_pipeline(run: int, scenes: int, audio: bytes, stages: list) -> dict:
+    """Runs every stage once against a fresh store; returns seconds per stage."""
+    image_store_module._store = image_store_module.ImageStore(root=tempfile.mkdtemp(prefix="bench-store-"))
+    trend = f"Super Bowl run {run}"
+    base = build_visual_prompt(trend, CAMPAIGN["moodboard"])
+    timings = {}
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    urls = timed("images", lambda: generate_image_urls([base.with_variation(v) for v in VARIATIONS[:scenes]]))
+    hero = urls[0]
+    if "renditions" in stages:
+        timed("renditions", lambda: [get_derivatives(url) for url in urls])
+    if "gif" in stages:
+        timed("gif", lambda: generate_animated_gif_fallback(hero))
+    if "procedural" in stages:
+        timed("procedural", lambda: generate_procedural_video(hero))
+    if "pdf" in stages:
+        timed("pdf", lambda: export_campaign_to_pdf(CAMPAIGN, trend, "Sports", hero))
+    if "multi_scene" in stages:
+        timed("multi_scene", lambda: create_multi_scene_video(urls, audio, num_scenes=scenes,
+                                                              slogan=CAMPAIGN["slogan"]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--scenes", type=int, default=3, choices=range(2, len(VARIATIONS) + 1),
+                        help="Scene images per campaign")
+    parser.add_argument("--audio-seconds", type=float, default=8.0, help="Voice-over length (multi-scene video)")
+    parser.add_argument("--runs", type=int, default=1, help="Pipeline runs (median reported)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Stages to run after image generation")
+    args = parser.parse_args()
+
+    audio = silent_mp3(args.audio_seconds)
+    runs = [run_pipeline(run, args.scenes, audio, args.stages) for run in range(args.runs)]
+
+    print(f"Offline pipeline: {args.scenes} scene images, {args.audio_seconds:g}s audio, "
+          f"median of {args.runs} run(s)")
+    print(f"{'stage':<14}{'seconds':>10}")
+    total = 0.0
+    for stage in STAGES:
+        if stage in runs[0]:
+            seconds = statistics.median(run[stage] for run in runs)
+            total += seconds
+            print(f"{stage:<14}{seconds:>10.2f}")
+    print(f"{'total':<14}{total:>10.2f}")
+    images = statistics.median(run["images"] for run in runs)
+    print(f"Image backend throughput: {args.scenes / images:.1f} images/s")
+
+
+if __name__ == "__main__":
+    main()
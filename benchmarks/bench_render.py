@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-frame resampling in the multi-scene video path.
+Renders one Ken Burns scene the way each version of the pipeline did and times
+producing every video frame (optionally also encoding the MP4):
+
+  gif-chain:   1024 source -> 1024 GIF -> decode -> resize 1080 -> resize 1296 -> crop 1080
+  clip-chain:  1024 source -> per-frame Ken Burns clip -> resize 1.2x -> crop
+  single-plan: working rendition (VIDEO_SIZE) -> one boxed resample per frame with the
+               scene zoom folded in (app.ken_burns base_zoom)
+
+Runs offline on a synthetic image.
+
+Usage:
+    python benchmarks/bench_render.py --duration 3 --fps 30 --repeat 2 [--encode]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_frames import synthetic_image
+from app.config import SCENE_ZOOM, VIDEO_SIZE
+from app.frame_writer import write_frames
+from app.image_derivatives import WORKING_RENDITION, render_derivatives
+from app.ken_burns import iter_ken_burns_frames, ken_burns_palette_samples
+from app.video_creator import ken_burns_clip, load_animation_clip
+
+try:
+    from moviepy import concatenate_videoclips
+except ImportError:
+    from moviepy.editor import concatenate_videoclips
+
+PIPELINES = ["gif-chain", "clip-chain", "single-plan"]
+
+
+def zoom_and_crop(clip, size):
+    """The multi-scene zoom before the single resample plan: resize up by SCENE_ZOOM, crop the centre."""
+    w, h = clip.size
+    new_w, new_h = int(w * SCENE_ZOOM), int(h * SCENE_ZOOM)
+    clip = clip.resized((new_w, new_h))
+    x1, y1 = new_w // 2 - size[0] // 2, new_h // 2 - size[1] // 2
+    return clip.cropped(x1=x1, y1=y1, x2=x1 + size[0], y2=y1 + size[1])
+
+
+def build_scene(pipeline: str, source, duration: float, tmp_dir: str):
+    """Returns (clip, resamples per output frame) for one scene."""
+    if pipeline == "gif-chain":
+        image = render_derivatives(source, ["animation"])["animation"]
+        path = os.path.join(tmp_dir, "scene.gif")
+        write_frames(iter_ken_burns_frames(image), path, fmt="gif", palette_samples=ken_burns_palette_samples(image))
+        clip = load_animation_clip(path)
+        clip = concatenate_videoclips([clip] * (int(duration / clip.duration) + 1)).with_duration(duration)
+        clip = clip.resized((VIDEO_SIZE, VIDEO_SIZE))
+        return zoom_and_crop(clip, (VIDEO_SIZE, VIDEO_SIZE)), 3
+    if pipeline == "clip-chain":
+        image = render_derivatives(source, ["animation"])["animation"]
+        return zoom_and_crop(ken_burns_clip(image, duration), image.size), 2
+    image = render_derivatives(source, [WORKING_RENDITION])[WORKING_RENDITION]
+    return ken_burns_clip(image, duration, base_zoom=SCENE_ZOOM), 1
+
+
+def run(pipeline: str, source, duration: float, fps: int, encode: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        clip, resamples = build_scene(pipeline, source, duration, tmp_dir)
+        if encode:
+            clip.write_videofile(os.path.join(tmp_dir, "scene.mp4"), fps=fps, codec="libx264", audio=False,
+                                 logger=None)
+            frames = int(duration * fps)
+            size = tuple(clip.size)
+        else:
+            frames = 0
+            for frame in clip.iter_frames(fps=fps):
+                frames += 1
+                size = frame.shape[1], frame.shape[0]
+        elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "frames": frames, "size": size, "resamples": resamples}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-frame resampling in the scene video path")
+    parser.add_argument("--size", type=int, default=1024, help="Square source image size in pixels")
+    parser.add_argument("--duration", type=float, default=3.0, help="Scene duration in seconds")
+    parser.add_argument("--fps", type=int, default=30, help="Output frames per second")
+    parser.add_argument("--repeat", type=int, default=2, help="Runs per pipeline (median reported)")
+    parser.add_argument("--encode", action="store_true", help="Also encode the MP4 (includes libx264 time)")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=PIPELINES)
+    args = parser.parse_args()
+
+    source = synthetic_image(args.size)
+    mode = "frames + MP4 encode" if args.encode else "frame synthesis only"
+    print(f"Scene: {args.duration:g}s at {args.fps} fps from a {args.size}px source, {mode}, "
+          f"median of {args.repeat} runs (VIDEO_SIZE={VIDEO_SIZE}, SCENE_ZOOM={SCENE_ZOOM})")
+    print(f"{'pipeline':<14}{'seconds':>10}{'ms/frame':>10}{'frames':>8}{'output':>12}{'resamples':>11}")
+    results = {}
+    for pipeline in args.pipelines:
+        runs = [run(pipeline, source, args.duration, args.fps, args.encode) for _ in range(args.repeat)]
+        result = dict(runs[0], seconds=statistics.median(r["seconds"] for r in runs))
+        results[pipeline] = result
+        size = "x".join(map(str, result["size"]))
+        print(f"{pipeline:<14}{result['seconds']:>10.2f}{1000 * result['seconds'] / result['frames']:>10.1f}"
+              f"{result['frames']:>8}{size:>12}{result['resamples']:>11}")
+
+    if "single-plan" in results:
+        for pipeline in ("gif-chain", "clip-chain"):
+            if pipeline in results:
+                saved = results[pipeline]["seconds"] - results["single-plan"]["seconds"]
+                print(f"single-plan vs {pipeline}: {results[pipeline]['seconds'] / results['single-plan']['seconds']:.1f}x"
+                      f" faster, {saved:.2f}s saved per scene")
+
+
+if __name__ == "__main__":
+    main()
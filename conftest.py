@@ -0,0 +1,18 @@
+"""
+Pytest setup shared by the root test files.
+"""
+import os
+
+import pytest
+
+# Turn off background Pollinations downloads before app.config is imported: some
+# test_*.py files are scripts that generate images when pytest imports them, and
+# their prefetches would otherwise still be running (on the network) during the tests.
+os.environ["POLLINATIONS_EAGER_FETCH"] = "false"
+
+
+@pytest.fixture(autouse=True)
+def no_eager_pollinations_fetch(monkeypatch):
+    import app.visual_engine as visual_engine
+
+    monkeypatch.setattr(visual_engine, "POLLINATIONS_EAGER_FETCH", False)
@@ -2,19 +2,25 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 import time
-import requests
 from datetime import datetime
 
 from app.trend_fetcher import get_all_trends
 from app.trend_classifier import classify_trend
 from app.creative_engine import generate_campaign_for_trend
-from app.visual_engine import build_dalle_prompt, generate_image_url, build_video_prompt, generate_video_url
-from app.config import openai_client  # Import for checking which service generated images
+from app.visual_engine import build_visual_prompt, generate_image_url, generate_image_urls, build_video_prompt, generate_video_url
+from app.config import openai_client, IMAGE_BACKEND, VIDEO_ENGINE  # Import for checking which service generated images
 from app.instagram_poster import post_to_instagram, format_campaign_caption
 from app.pdf_exporter import export_campaign_to_pdf
 from app.post_history import get_all_posts_with_insights, init_database
+from app.llm_ledger import latency_percentiles, daily_spend
 from app.audio_generator import generate_slogan_audio, get_audio_bytes
 from app.multi_scene_video import create_multi_scene_video
+from app.warm_pool import warm_pool
+from app.video_jobs import video_jobs
+from app.image_store import get_image_bytes, is_ready as is_image_ready, is_store_handle
+from app.image_derivatives import get_derivative_bytes
+from app.frame_writer import ANIMATION_MIME_TYPES
+from app.prefetch import CampaignPrefetch
 
 load_dotenv()
 # Check if we have any AI API keys
@@ -353,7 +359,7 @@ with st.sidebar:
         st.session_state.pop("last_trend", None)
         st.session_state.pop("last_category", None)
         st.session_state.pop("campaign_generated", None)
-        st.session_state.pop("last_dalle_prompt", None)
+        st.session_state.pop("last_visual_prompt", None)
         st.session_state.pop("last_video_url", None)
         st.session_state.pop("multi_scene_video_path", None)
         st.session_state.pop("slogan_audio_bytes", None)
@@ -418,6 +424,33 @@ with st.sidebar:
     
     st.divider()
     
+    # LLM Usage Section (reads from the local call ledger)
+    st.markdown("### ⏱️ LLM Usage")
+    try:
+        latencies = {name: stats for name, stats in latency_percentiles(days=7).items() if name != "demo"}
+        today = datetime.now().strftime("%Y-%m-%d")
+        spend_today = [row for row in daily_spend(days=1) if row["day"] == today]
+        
+        if latencies:
+            for name, stats in latencies.items():
+                st.markdown(f"**{name.title()}:** p50 {stats['p50'] / 1000:.1f}s · p95 {stats['p95'] / 1000:.1f}s ({stats['calls']} calls)")
+        else:
+            st.caption("No LLM calls recorded in the last 7 days")
+        
+        if spend_today:
+            total_cost = sum(row["cost_usd"] for row in spend_today)
+            total_calls = sum(row["calls"] for row in spend_today)
+            failures = sum(row["failures"] for row in spend_today)
+            st.markdown(f"**Today:** ${total_cost:.4f} · {total_calls} calls · {failures} failed")
+    except Exception as e:
+        st.caption(f"LLM ledger unavailable: {e}")
+    
+    if warm_pool.size:
+        warm_status = warm_pool.status()
+        st.caption(f"⚡ Pre-generated: {warm_status['ready']} of top {warm_pool.size} trends ready")
+    
+    st.divider()
+    
     # Mode indicator (compact)
     if IS_DEMO_MODE:
         st.caption("🎭 Demo Mode")
@@ -445,7 +478,21 @@ if len(trends) == 0:
     st.error("No trends available right now. Try again later.")
     st.stop()
 
-selected_trend = st.selectbox("Select Cultural Trend", trends, key="trend_select")
+# Pre-generate the top trends in the background so clicking Generate on them is instant
+warm_pool.warm(trends)
+
+if "campaign_prefetch" not in st.session_state:
+    st.session_state["campaign_prefetch"] = CampaignPrefetch()
+campaign_prefetch = st.session_state["campaign_prefetch"]
+
+selected_trend = st.selectbox(
+    "Select Cultural Trend",
+    trends,
+    key="trend_select",
+    # Start generating for the new selection right away (cancels the previous prefetch)
+    on_change=lambda: st.session_state["campaign_prefetch"].start(st.session_state["trend_select"])
+)
+campaign_prefetch.start(selected_trend)  # Covers the initial selection; no-op if already running
 
 # Generate Campaign Button
 generate_clicked = st.button("✨ Generate Campaign", type="primary", width='stretch', key="generate_btn")
@@ -460,8 +507,27 @@ if generate_clicked:
         )
         st.stop()
 
+    warmed = warm_pool.get(selected_trend)
+    if warmed:
+        # Already pre-generated in the background - show it right away
+        st.session_state["last_campaign"] = warmed["campaign"]
+        st.session_state["last_trend"] = selected_trend
+        st.session_state["last_category"] = category
+        st.session_state["last_image_url"] = warmed["image_url"]
+        st.session_state["last_visual_prompt"] = warmed["visual_prompt"]
+        if warmed["audio_bytes"]:
+            st.session_state["slogan_audio_bytes"] = warmed["audio_bytes"]
+            st.session_state["last_slogan"] = warmed["campaign"].get("slogan", "")
+        st.session_state["campaign_generated"] = True
+        st.rerun()
+
     with st.spinner("Generating creative concept..."):
-        campaign = generate_campaign_for_trend(selected_trend, category)
+        # Attach to the prefetch started when the trend was selected
+        prefetched = campaign_prefetch.result(selected_trend)
+        if prefetched:
+            campaign = prefetched["campaign"]
+        else:
+            campaign = generate_campaign_for_trend(selected_trend, category)
         
         # Store campaign in session state for Instagram posting
         st.session_state["last_campaign"] = campaign
@@ -542,16 +608,16 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
     
     # Generate image if not already stored
     if not st.session_state.get("last_image_url"):
-        dalle_prompt = build_dalle_prompt(
+        visual_prompt = build_visual_prompt(
             selected_trend, campaign.get("moodboard", "")
         )
         with st.spinner("Generating image..."):
-            image_url = generate_image_url(dalle_prompt)
+            image_url = generate_image_url(visual_prompt)
             st.session_state["last_image_url"] = image_url
-            st.session_state["last_dalle_prompt"] = dalle_prompt
+            st.session_state["last_visual_prompt"] = visual_prompt
     else:
         image_url = st.session_state["last_image_url"]
-        dalle_prompt = st.session_state.get("last_dalle_prompt", "")
+        visual_prompt = st.session_state.get("last_visual_prompt")
     
     if image_url:
         # Debug: Show image URL (helpful for troubleshooting)
@@ -559,11 +625,20 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
             st.code(image_url, language=None)
         
         try:
-            # Try to display the image directly from URL
-            st.image(image_url, width='stretch')
+            # Display from the local image store (the PDF and videos reuse the same bytes),
+            # or straight from the URL if it can't be downloaded here.
+            # A background fetch started when the URL was created is joined, not repeated.
+            if is_image_ready(image_url):
+                image_data = get_derivative_bytes(image_url, "preview")
+            else:
+                with st.spinner("Rendering image..."):
+                    image_data = get_derivative_bytes(image_url, "preview")
+            st.image(image_data or image_url, width='stretch')
             st.caption("This image was created based on your selected trend and campaign concept.")
             # Show which service was used
-            if openai_client:
+            if is_store_handle(image_url) and IMAGE_BACKEND == "local":
+                st.caption("🧪 Rendered offline by the local stand-in image backend")
+            elif openai_client:
                 st.caption("✨ Generated with OpenAI DALL·E")
             else:
                 st.caption("🆓 Generated with Pollinations.ai (Free)")
@@ -571,17 +646,18 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
             # If direct URL display fails, try downloading and displaying
             st.warning("⚠️ Could not display image directly. Trying alternative method...")
             try:
-                import requests
-                img_response = requests.get(image_url, timeout=30)
-                if img_response.status_code == 200:
-                    st.image(img_response.content, width='stretch')
+                image_data = get_image_bytes(image_url, timeout=30)
+                if image_data:
+                    st.image(image_data, width='stretch')
                     st.caption("This image was created based on your selected trend and campaign concept.")
-                    if openai_client:
+                    if is_store_handle(image_url) and IMAGE_BACKEND == "local":
+                        st.caption("🧪 Rendered offline by the local stand-in image backend")
+                    elif openai_client:
                         st.caption("✨ Generated with OpenAI DALL·E")
                     else:
                         st.caption("🆓 Generated with Pollinations.ai (Free)")
                 else:
-                    st.error(f"⚠️ Could not load image (Status {img_response.status_code}). URL: {image_url[:100]}...")
+                    st.error(f"⚠️ Could not load image. URL: {image_url[:100]}...")
                     st.info("💡 The image may still be generating. Please wait a moment and refresh.")
             except Exception as download_error:
                 st.error(f"⚠️ Could not display image: {download_error}")
@@ -662,46 +738,48 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
             campaign.get("hero_concept", "")
         )
         
-        # Check if video is still loading
-        if st.session_state.get("video_loading"):
-            st.warning("⏳ Video is still generating... This can take 60-90 seconds. Please wait.")
-            st.info("💡 **Tip:** Hugging Face free tier may queue requests. The video will appear when ready!")
+        with st.spinner("🎬 Animating image..."):
+            # Starts the Hugging Face video job and returns the animated GIF straight away
+            video_result = generate_video_url(video_prompt, image_url)
+        
+        if video_result:
+            st.session_state["last_video_url"] = video_result
+            st.session_state["last_video_prompt"] = video_prompt
         else:
-            with st.spinner("🎬 Generating video from image (60-90 seconds - Hugging Face free tier)..."):
-                # Pass the image URL to generate video
-                video_result = generate_video_url(video_prompt, image_url)
-                
-                if video_result and video_result.startswith("LOADING:"):
-                    # Model is loading, store loading state
-                    estimated_time = video_result.split(":")[1]
-                    st.session_state["video_loading"] = True
-                    st.session_state["video_estimated_time"] = estimated_time
-                    st.warning(f"⏳ Model is loading (estimated {estimated_time}s). Please wait and try again in a moment.")
-                elif video_result:
-                    # Video generated successfully
-                    st.session_state["last_video_url"] = video_result
-                    st.session_state["last_video_prompt"] = video_prompt
-                    st.session_state["video_loading"] = False
-                    st.rerun()  # Refresh to show video
-                else:
-                    # Generation failed
-                    st.session_state["video_loading"] = False
-                    st.error("⚠️ Video generation failed. This can happen with free tier rate limits. Try again in a few minutes.")
-    else:
-        video_url = st.session_state.get("last_video_url")
-        video_prompt = st.session_state.get("last_video_prompt", "")
+            st.error("⚠️ Video generation failed. This can happen with free tier rate limits. Try again in a few minutes.")
+    
+    # Upgrade the GIF to the Hugging Face video once its background job finishes
+    video_job = video_jobs.get(image_url) if image_url else None
+    if video_job and not video_job.finished:
+        @st.fragment(run_every=5)
+        def video_job_status():
+            if video_job.finished:
+                if video_job.status == "done":
+                    st.session_state["last_video_url"] = video_job.video_path
+                st.rerun()
+            model = video_jobs.model_status()
+            if model["state"] == "loading":
+                st.info(f"⏳ Hugging Face video model is starting up (about {model['ready_in']}s). "
+                        "Showing the animated GIF until the video is ready.")
+            else:
+                st.info(f"⏳ Generating video with Hugging Face ({video_job.to_dict()['elapsed']}s so far). "
+                        "Showing the animated GIF until it's ready.")
+        
+        video_job_status()
     
     # Display video if available
     video_url = st.session_state.get("last_video_url")
-    if video_url and not video_url.startswith("LOADING:"):
+    if video_url:
         try:
                 # Check if it's a file path (local) or URL
                 if os.path.exists(str(video_url)):
-                    # Determine file type
-                    is_gif = video_url.lower().endswith('.gif')
-                    file_type = "GIF" if is_gif else "Video"
-                    mime_type = "image/gif" if is_gif else "video/mp4"
-                    file_extension = ".gif" if is_gif else ".mp4"
+                    # Determine file type (animated fallbacks are GIF or WebP, shown as images)
+                    file_extension = os.path.splitext(video_url)[1].lower()
+                    is_gif = file_extension in (".gif", ".webp")
+                    if not is_gif:
+                        file_extension = ".mp4"
+                    file_type = file_extension.lstrip(".").upper() if is_gif else "Video"
+                    mime_type = ANIMATION_MIME_TYPES.get(file_extension.lstrip("."), "video/mp4")
                     
                     # Local file - display based on type
                     try:
@@ -709,11 +787,14 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
                             # Display GIF using st.image() - this shows animated GIFs properly!
                             with open(video_url, "rb") as gif_file:
                                 gif_bytes = gif_file.read()
-                                st.image(gif_bytes, caption="🆓 Generated as animated GIF (fallback - always works!)")
+                                st.image(gif_bytes, caption=f"🆓 Generated as animated {file_type} (fallback - always works!)")
                         else:
                             # Display video using st.video()
                             st.video(video_url)
-                            st.caption("🆓 Generated with Hugging Face Stable Video Diffusion (Free)")
+                            if VIDEO_ENGINE == "procedural":
+                                st.caption("🆓 Rendered locally with the procedural animation engine")
+                            else:
+                                st.caption("🆓 Generated with Hugging Face Stable Video Diffusion (Free)")
                         
                         # Download button
                         try:
@@ -737,9 +818,9 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
                     try:
                         if is_gif_url:
                             # For GIF URLs, download and display
-                            gif_response = requests.get(video_url, timeout=30)
-                            if gif_response.status_code == 200:
-                                st.image(gif_response.content, caption="🆓 Generated animated GIF")
+                            gif_data = get_image_bytes(video_url, timeout=30)
+                            if gif_data:
+                                st.image(gif_data, caption="🆓 Generated animated GIF")
                             else:
                                 st.video(video_url)  # Fallback to video display
                         else:
@@ -790,103 +871,41 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
                     try:
                         
                         st.info(f"Generating {num_scenes} image variations...")
-                        image_urls = [image_url]  # Start with the original
-                        st.write(f"✅ Image 1/5: Using original image")
+                        st.write(f"✅ Image 1/{num_scenes}: Using original image")
                         
                         # Get trend and campaign from session state
                         current_trend = st.session_state.get("last_trend", "Trend")
                         current_campaign = st.session_state.get("last_campaign", {})
                         
-                        # Generate additional image variations
-                        dalle_prompt = build_dalle_prompt(
+                        # Generate num_scenes - 1 additional images (we already have 1)
+                        visual_prompt = build_visual_prompt(
                             current_trend, current_campaign.get("moodboard", "")
                         )
+                        # Make each variation more distinct
+                        variation_descriptors = [
+                            "wide angle shot",
+                            "close-up detail",
+                            "different perspective",
+                            "alternative composition",
+                            "unique camera angle"
+                        ]
+                        variation_prompts = [
+                            visual_prompt.with_variation(f"{variation_descriptors[(i-1) % len(variation_descriptors)]}, variation {i+1}")
+                            for i in range(1, num_scenes)
+                        ]
                         
-                        # Generate num_scenes - 1 additional images (we already have 1)
-                        # Loop from 1 to num_scenes (exclusive), which gives us num_scenes - 1 iterations
-                        # CRITICAL: We MUST have exactly num_scenes images at the end
-                        for i in range(1, num_scenes):
-                            # Add variation to prompt for different images
-                            # Make each variation more distinct
-                            variation_descriptors = [
-                                "wide angle shot",
-                                "close-up detail",
-                                "different perspective",
-                                "alternative composition",
-                                "unique camera angle"
-                            ]
-                            descriptor = variation_descriptors[(i-1) % len(variation_descriptors)]
-                            variation_prompt = dalle_prompt + f", {descriptor}, variation {i+1}"
-                            
-                            st.write(f"🖼️ Generating image {i+1}/{num_scenes}...")
-                            
-                            # Ensure we always add an image (even if it's a duplicate)
-                            image_added = False
-                            
-                            # Try to generate a unique image
-                            try:
-                                variation_url = generate_image_url(variation_prompt)
-                                
-                                # Check if we got a valid, unique URL
-                                if variation_url and isinstance(variation_url, str) and len(variation_url.strip()) > 0:
-                                    if variation_url.strip() != image_url.strip() and variation_url.strip() not in [url.strip() for url in image_urls]:
-                                        image_urls.append(variation_url)
-                                        st.write(f"✅ Generated unique image {i+1}/{num_scenes} (total: {len(image_urls)}/{num_scenes})")
-                                        image_added = True
-                                    else:
-                                        st.warning(f"⚠️ Generated duplicate URL for image {i+1}, retrying...")
-                                else:
-                                    st.warning(f"⚠️ Invalid URL returned for image {i+1}, retrying...")
-                            except Exception as e:
-                                st.warning(f"⚠️ Error generating image {i+1}: {e}, retrying...")
-                            
-                            # Retry if first attempt failed
-                            if not image_added:
-                                st.warning(f"⚠️ Could not generate unique image {i+1}, retrying...")
-                                try:
-                                    retry_prompt = dalle_prompt + f", completely different scene, variation {i+1}, unique composition"
-                                    retry_url = generate_image_url(retry_prompt)
-                                    
-                                    if retry_url and isinstance(retry_url, str) and len(retry_url.strip()) > 0:
-                                        if retry_url.strip() != image_url.strip() and retry_url.strip() not in [url.strip() for url in image_urls]:
-                                            image_urls.append(retry_url)
-                                            st.write(f"✅ Generated image {i+1}/{num_scenes} on retry (total: {len(image_urls)}/{num_scenes})")
-                                            image_added = True
-                                except Exception as e:
-                                    st.warning(f"⚠️ Retry also failed for image {i+1}: {e}")
-                            
-                            # Final fallback: ALWAYS add original if we still don't have an image
-                            # This ensures we have exactly num_scenes images
-                            if not image_added:
-                                st.error(f"❌ Failed to generate image {i+1}, using original as fallback")
-                                image_urls.append(image_url)  # Fallback to original (will create duplicate, but ensures we have 5 images)
-                                st.write(f"✅ Added fallback image {i+1}/{num_scenes} (total: {len(image_urls)}/{num_scenes})")
-                                image_added = True  # Mark as added
-                            
-                            # Double-check that we actually added an image
-                            if not image_added or len(image_urls) < i + 1:
-                                st.error(f"❌ CRITICAL: Image {i+1} was not added! Current count: {len(image_urls)}")
-                                # Force add original as emergency fallback
-                                image_urls.append(image_url)
-                                st.write(f"✅ Emergency fallback: Added image {i+1}/{num_scenes} (total: {len(image_urls)}/{num_scenes})")
-                        
-                        # CRITICAL VERIFICATION: We MUST have exactly num_scenes images
-                        if len(image_urls) < num_scenes:
-                            st.error(f"❌ CRITICAL ERROR: Only {len(image_urls)} images in list, but {num_scenes} scenes requested!")
-                            st.error(f"   Adding {num_scenes - len(image_urls)} fallback images to reach {num_scenes} total...")
-                            # Add missing images using original as fallback
-                            while len(image_urls) < num_scenes:
-                                image_urls.append(image_url)
-                            st.write(f"✅ Fixed: Now have {len(image_urls)} images (some may be duplicates)")
-                        elif len(image_urls) > num_scenes:
-                            st.warning(f"⚠️ WARNING: {len(image_urls)} images generated, but only {num_scenes} requested. Using first {num_scenes}.")
-                            image_urls = image_urls[:num_scenes]
+                        # All variations are generated and downloaded in parallel; duplicates and
+                        # failures are retried once, anything still missing falls back to the original
+                        with st.spinner(f"🖼️ Generating {num_scenes - 1} images in parallel..."):
+                            variation_urls = generate_image_urls(
+                                variation_prompts, exclude=[image_url], fallback_url=image_url
+                            )
+                        image_urls = [image_url] + variation_urls
                         
-                        # Final verification
-                        if len(image_urls) == num_scenes:
-                            st.success(f"✅ Successfully prepared {len(image_urls)} images for {num_scenes} scenes!")
-                        else:
-                            st.error(f"❌ FATAL: Still have {len(image_urls)} images instead of {num_scenes}!")
+                        fallbacks = sum(1 for url in variation_urls if url == image_url)
+                        if fallbacks:
+                            st.warning(f"⚠️ {fallbacks} image(s) could not be generated, using the original as fallback")
+                        st.success(f"✅ Successfully prepared {len(image_urls)} images for {num_scenes} scenes!")
                         
                         # Get audio
                         audio_bytes = st.session_state.get("slogan_audio_bytes")
@@ -973,7 +992,7 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
                 last_trend
             )
             st.text_area("Caption Preview", preview_caption, height=200, key="caption_preview")
-            st.image(last_image_url, caption="Image to post", width=300)
+            st.image(get_derivative_bytes(last_image_url, "preview") or last_image_url, caption="Image to post", width=300)
         
         # Post button - always visible, but checks for token
         if st.session_state.get("instagram_token"):
@@ -1022,7 +1041,7 @@ if st.session_state.get("campaign_generated") and st.session_state.get("last_cam
                         # Get GIF path if available (for single-scene video with audio)
                         video_url = st.session_state.get("last_video_url")
                         gif_path = None
-                        if not use_multi_scene and video_url and os.path.exists(str(video_url)) and str(video_url).lower().endswith('.gif'):
+                        if not use_multi_scene and video_url and os.path.exists(str(video_url)) and str(video_url).lower().endswith(('.gif', '.webp')):
                             gif_path = video_url
                             print(f"Using GIF for video creation: {gif_path}")
                         
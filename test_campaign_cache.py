@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Quick tests for the near-duplicate trend campaign cache.
+"""
+
+from app.campaign_cache import CampaignCache
+
+CAMPAIGN = {
+    "hero_concept": "Fans gather for Super Bowl LIX with ice-cold Coca-Cola.",
+    "slogan": "Taste the Victory",
+    "social_post": "Super Bowl LIX is here! #RealMagic",
+    "moodboard": "Stadium lights, Super Bowl LIX confetti",
+}
+
+
+def test_near_duplicate_trend_hits_and_is_adapted():
+    cache = CampaignCache()
+    cache.add("Super Bowl LIX", "sports", CAMPAIGN)
+
+    campaign = cache.get("Super Bowl Sunday", "sports")
+    assert campaign is not None
+    assert campaign["social_post"] == "Super Bowl Sunday is here! #RealMagic"
+    assert campaign["slogan"] == "Taste the Victory"
+    assert cache.get("Super Bowl halftime", "sports") is not None
+    assert cache.get("Superbowl LIX", "sports") is not None
+
+
+def test_unrelated_trend_or_category_misses():
+    cache = CampaignCache()
+    cache.add("Super Bowl LIX", "sports", CAMPAIGN)
+
+    assert cache.get("Grammys", "sports") is None
+    assert cache.get("Super Bowl LIX", "entertainment") is None
+
+
+def test_similar_names_for_different_events_miss():
+    cache = CampaignCache()
+    for trend in ["Mother's Day", "Summer Olympics", "NBA Finals"]:
+        cache.add(trend, "general", CAMPAIGN)
+
+    assert cache.get("Father's Day", "general") is None
+    assert cache.get("Winter Olympics", "general") is None
+    assert cache.get("Olympics", "general") is None
+    assert cache.get("NHL Finals", "general") is None
+    assert cache.get("NBA Finals Game 7", "general") is not None
+
+    # Even a permissive threshold can't bridge a different content word
+    permissive = CampaignCache(threshold=0.5)
+    permissive.add("Mother's Day", "general", CAMPAIGN)
+    assert permissive.find("Father's Day", "general") is None
+
+
+def test_eviction_keeps_index_bounded():
+    cache = CampaignCache(max_entries=2)
+    for trend in ["Christmas", "Halloween", "Thanksgiving"]:
+        cache.add(trend, "general", CAMPAIGN)
+
+    assert len(cache) == 2
+    assert cache.get("Christmas", "general") is None
+    assert cache.get("Thanksgiving", "general") is not None
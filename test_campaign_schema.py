@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Quick tests for campaign response validation and local repair.
+"""
+
+from app.campaign_schema import (
+    CAMPAIGN_FIELDS, MAX_SLOGAN_WORDS, parse_campaign_json, repair_campaign, validate_campaign
+)
+
+FALLBACK = {field: f"fallback {field}" for field in CAMPAIGN_FIELDS}
+
+
+def test_valid_json_passes_through():
+    content = '{"hero_concept": "a", "slogan": "b", "social_post": "c", "moodboard": "d"}'
+    campaign = parse_campaign_json(content)
+    assert validate_campaign(campaign) == []
+    assert repair_campaign(campaign, FALLBACK) == {"hero_concept": "a", "slogan": "b", "social_post": "c", "moodboard": "d"}
+
+
+def test_fenced_json_with_raw_newlines_and_trailing_comma():
+    content = '```json\n{"hero_concept": "line one\nline two", "slogan": "Taste the Win",}\n```'
+    campaign = parse_campaign_json(content)
+    assert campaign["hero_concept"] == "line one\nline two"
+    assert campaign["slogan"] == "Taste the Win"
+
+
+def test_truncated_response_is_closed_and_filled():
+    content = '{"hero_concept": "Fans cheer", "slogan": "Taste the Victory", "social_post": "Game day is'
+    campaign = repair_campaign(parse_campaign_json(content), FALLBACK)
+    assert campaign["hero_concept"] == "Fans cheer"
+    assert campaign["social_post"] == "Game day is"
+    assert campaign["moodboard"] == FALLBACK["moodboard"]
+
+
+def test_dangling_key_is_dropped():
+    campaign = parse_campaign_json('{"hero_concept": "Fans cheer", "slog')
+    assert campaign == {"hero_concept": "Fans cheer"}
+
+
+def test_slogan_is_clamped():
+    campaign = repair_campaign({"slogan": "one two three four five six seven eight nine"}, FALLBACK)
+    assert len(campaign["slogan"].split()) == MAX_SLOGAN_WORDS
+    assert validate_campaign(campaign) == []
+
+
+def test_unusable_response():
+    assert parse_campaign_json("Sorry, I can't help with that.") is None
+    assert validate_campaign(None) == ["response is not a JSON object"]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Quick tests for multi-variant campaign generation.
+"""
+import json
+
+import app.creative_engine as creative_engine
+from app.campaign_schema import openai_variants_response_format
+from app.creative_engine import _variants_from_content, generate_campaign_variants
+
+
+def test_demo_variants_have_distinct_slogans(monkeypatch):
+    monkeypatch.setattr(creative_engine, "_generate_with_providers", lambda *args: None)
+    for _ in range(200):
+        variants = generate_campaign_variants("Coachella", "entertainment", 3)
+        slogans = [v["slogan"].lower() for v in variants]
+        assert len(set(slogans)) == 3
+        assert len({(v["hero_concept"], v["moodboard"]) for v in variants}) == 1
+
+
+def test_variants_share_hero_and_moodboard_and_are_topped_up():
+    content = json.dumps({
+        "hero_concept": "Fans light up the desert at Coachella.",
+        "moodboard": "Sunset, palm trees, neon",
+        "variants": [
+            {"slogan": "Feel the Desert Beat", "social_post": "Coachella vibes #RealMagic"},
+            {"slogan": "feel the desert beat", "social_post": "Duplicate slogan"},
+        ],
+    })
+    variants = _variants_from_content(content, "Coachella", "entertainment", 3)
+
+    assert len(variants) == 3
+    assert variants[0]["slogan"] == "Feel the Desert Beat"
+    assert len({v["slogan"].lower() for v in variants}) == 3
+    assert all(v["hero_concept"] == "Fans light up the desert at Coachella." for v in variants)
+    assert all(v["moodboard"] == "Sunset, palm trees, neon" for v in variants)
+
+
+def test_variants_response_format_is_strict_schema():
+    response_format = openai_variants_response_format(4)
+    schema = response_format["json_schema"]["schema"]
+
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == "campaign_variants_4"
+    assert response_format["json_schema"]["strict"] is True
+    assert schema["required"] == ["hero_concept", "moodboard", "variants"]
+    assert schema["additionalProperties"] is False
+    assert schema["properties"]["variants"]["items"]["required"] == ["slogan", "social_post"]
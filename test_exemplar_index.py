@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Quick tests for BM25 exemplar retrieval over past campaigns.
+"""
+
+from app.exemplar_index import ExemplarIndex
+
+
+def build_index():
+    index = ExemplarIndex()
+    index.add("1", "Super Bowl LVIII", "Game day magic with Coca-Cola #SuperBowl", engagement_rate=2.0)
+    index.add("2", "Super Bowl Halftime", "Halftime hits different with friends #SuperBowl", engagement_rate=9.0)
+    index.add("3", "Christmas", "Holiday lights and ice-cold Coke #Christmas", engagement_rate=12.0)
+    return index
+
+
+def test_similar_trends_rank_above_unrelated():
+    results = build_index().search("Super Bowl LIX", k=3)
+    assert [r["post_id"] for r in results] == ["2", "1"]
+
+
+def test_incremental_add_update_and_remove():
+    index = build_index()
+    index.add("4", "Super Bowl LIX", "Kickoff with Coca-Cola", engagement_rate=1.0)
+    assert index.search("Super Bowl LIX", k=1)[0]["post_id"] == "4"
+
+    index.update_engagement("1", 50.0)
+    index.remove("4")
+    assert index.search("Super Bowl LIX", k=1)[0]["post_id"] == "1"
+    assert len(index) == 3
+
+
+def test_no_match_returns_empty():
+    assert build_index().search("Coachella", k=3) == []
+
+
+def test_removed_posts_do_not_count_towards_document_frequency():
+    index = build_index()
+    before = index.search("Christmas", k=1)[0]["score"]
+    for n in range(5):
+        index.add(f"old-{n}", "Christmas Eve", "Carols and Coke #Christmas", engagement_rate=1.0)
+        index.remove(f"old-{n}")
+    assert index.search("Christmas", k=1)[0]["score"] == before
+
+
+def test_min_engagement_skips_posts_without_engagement():
+    index = build_index()
+    index.add("4", "Super Bowl LIX", "Kickoff with Coca-Cola", engagement_rate=0.0)
+    assert index.search("Super Bowl LIX", k=1)[0]["post_id"] == "4"
+    results = index.search("Super Bowl LIX", k=3, min_engagement=0.0)
+    assert [r["post_id"] for r in results] == ["2", "1"]
+    assert index.search("Super Bowl", k=3, min_engagement=50.0) == []
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Quick tests for incremental animation writers.
+"""
+from PIL import Image
+
+from app.frame_writer import write_frames
+from app.ken_burns import iter_ken_burns_frames
+
+
+def gradient(size=(64, 48)):
+    ramp = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (ramp, Image.new("L", size, 40), ramp.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def test_gif_is_streamed_from_a_generator(tmp_path):
+    path = str(tmp_path / "loop.gif")
+    frames = iter_ken_burns_frames(gradient(), num_frames=6)
+
+    assert write_frames(frames, path, fmt="gif", duration=80, loop=0) == 10
+    with Image.open(path) as gif:
+        assert gif.size == (64, 48)
+        assert gif.info["loop"] == 0 and gif.info["duration"] == 80
+        assert gif.n_frames == 10
+
+
+def test_mp4_writer(tmp_path):
+    import imageio_ffmpeg
+
+    path = str(tmp_path / "loop.mp4")
+    assert write_frames(iter_ken_burns_frames(gradient(), num_frames=6), path, fmt="mp4", duration=100) == 10
+    frame_count, _ = imageio_ffmpeg.count_frames_and_secs(path)
+    assert frame_count == 10
+
+
+def test_gif_frames_share_one_palette_close_to_the_source(tmp_path):
+    import numpy as np
+    from app.frame_writer import SharedPalette
+    from app.ken_burns import ken_burns_palette_samples
+
+    image = gradient((96, 96))
+    palette = SharedPalette(ken_burns_palette_samples(image, num_frames=6))
+    frame = next(iter_ken_burns_frames(image, num_frames=6))
+    error = np.abs(np.asarray(palette.quantize(frame).convert("RGB"), dtype=np.int16) - np.asarray(frame))
+    assert error.mean() < 4
+
+    path = str(tmp_path / "shared.gif")
+    write_frames(iter_ken_burns_frames(image, num_frames=6), path, fmt="gif",
+                 palette_samples=ken_burns_palette_samples(image, num_frames=6))
+    with Image.open(path) as gif:
+        shared = {tuple(c) for c in np.array(gif.getpalette()).reshape(-1, 3)}
+        for index in range(gif.n_frames):
+            gif.seek(index)
+            used = {tuple(c) for c in np.asarray(gif.convert("RGB")).reshape(-1, 3)}
+            assert used <= shared  # Every frame draws from the one global palette, so no flicker
+        assert gif.n_frames == 10
+
+
+def test_webp_is_streamed_and_readable_as_a_clip(tmp_path):
+    from app.video_creator import load_animation_clip
+
+    path = str(tmp_path / "loop.webp")
+    assert write_frames(iter_ken_burns_frames(gradient(), num_frames=6), path, fmt="webp", duration=100) == 10
+    with Image.open(path) as webp:
+        assert 1 < webp.n_frames <= 10  # libwebp may merge frames that barely change
+        assert webp.info["loop"] == 0
+
+    clip = load_animation_clip(path)
+    assert abs(clip.duration - 1.0) < 1e-6
+    assert clip.get_frame(0.55).shape == (48, 64, 3)
+
+
+def test_webp_falls_back_to_public_save_all(tmp_path, monkeypatch):
+    import app.frame_writer as frame_writer_module
+
+    def broken_encoder(size, loop):
+        raise TypeError("WebPAnimEncoder() takes different arguments")
+
+    monkeypatch.setattr(frame_writer_module, "_webp_encoder", broken_encoder)
+    frame_writer_module.streaming_webp_supported.cache_clear()
+    try:
+        assert not frame_writer_module.streaming_webp_supported()
+        path = str(tmp_path / "loop.webp")
+        assert write_frames(iter_ken_burns_frames(gradient(), num_frames=6), path, fmt="webp") == 10
+        with Image.open(path) as webp:
+            assert webp.n_frames > 1
+    finally:
+        frame_writer_module.streaming_webp_supported.cache_clear()
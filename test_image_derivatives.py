@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Quick tests for image renditions built from a single decode.
+"""
+from io import BytesIO
+
+from PIL import Image
+
+import app.image_derivatives as derivatives_module
+import app.image_store as image_store_module
+from app.image_derivatives import DerivativeCache, RENDITIONS, rendition_plan, render_derivatives
+
+
+def png_bytes(size=(1024, 768)):
+    buffer = BytesIO()
+    Image.linear_gradient("L").resize(size).convert("RGB").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_plans_crop_to_fill_or_fit_without_upscaling():
+    assert rendition_plan((1024, 768), "square") == ((1080, 1080), (128.0, 0.0, 896.0, 768.0))
+    size, box = rendition_plan((1024, 1024), "story")
+    assert size == (1080, 1920) and round(box[2] - box[0]) == 576
+    assert rendition_plan((1024, 768), "pdf_thumbnail") == ((400, 300), (0, 0, 1024, 768))
+    assert rendition_plan((300, 200), "preview") == ((300, 200), (0, 0, 300, 200))
+
+
+def test_every_rendition_comes_from_one_decode_per_content_hash(tmp_path, monkeypatch):
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module, "_store", store)
+    monkeypatch.setattr(derivatives_module, "_cache", DerivativeCache(max_images=2))
+    handle = image_store_module.store_image(png_bytes())
+    store.put_bytes(png_bytes(), url="https://img/same.png")
+
+    decodes = []
+    original_open = Image.open
+    monkeypatch.setattr(Image, "open", lambda *a, **k: decodes.append(1) or original_open(*a, **k))
+
+    renditions = derivatives_module.get_derivatives(handle)
+    assert set(renditions) == set(RENDITIONS)
+    assert {name: image.size for name, image in renditions.items()}["portrait"] == (1080, 1350)
+    assert derivatives_module.get_derivative("https://img/same.png", "square").size == (1080, 1080)
+    assert derivatives_module.get_derivative_bytes(handle, "pdf_thumbnail")[:3] == b"\xff\xd8\xff"
+    assert len(decodes) == 1
+
+
+def test_rendition_matching_the_source_is_not_resampled():
+    image = Image.new("RGB", (400, 300), "#F40009")
+    assert render_derivatives(image, ["pdf_thumbnail"])["pdf_thumbnail"] is image
+
+
+def test_renditions_are_rendered_only_when_requested(tmp_path, monkeypatch):
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module, "_store", store)
+    cache = DerivativeCache()
+    monkeypatch.setattr(derivatives_module, "_cache", cache)
+    handle = image_store_module.store_image(png_bytes())
+
+    assert derivatives_module.get_derivative(handle, "preview").size == (800, 600)
+    assert cache.stats == {"hits": 0, "decodes": 1, "renders": 1}
+    assert derivatives_module.get_derivative(handle, "preview") is derivatives_module.get_derivative(handle, "preview")
+    assert derivatives_module.get_derivative(handle, "square").size == (1080, 1080)
+    assert cache.stats == {"hits": 2, "decodes": 1, "renders": 2}
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Quick tests for perceptual near-duplicate detection of scene images.
+"""
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from app.image_hash import hamming_distance, hash_distance, image_hashes, is_near_duplicate
+
+
+def encode(image: Image.Image, fmt: str = "JPEG") -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def random_scene(seed: int) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    cells = (rng.random((16, 16, 3)) * 255).astype(np.uint8)
+    return Image.fromarray(cells).resize((512, 512), Image.Resampling.BICUBIC)
+
+
+def test_lookalikes_are_near_duplicates_and_different_scenes_are_not():
+    scene = random_scene(1)
+    original = image_hashes(encode(scene, "PNG"))
+
+    brighter = image_hashes(encode(ImageEnhance.Brightness(scene).enhance(1.15)))
+    recropped = image_hashes(encode(scene.crop((4, 4, 508, 508)).resize((512, 512))))
+    different = image_hashes(encode(random_scene(2)))
+
+    assert is_near_duplicate(original, brighter)
+    assert is_near_duplicate(original, recropped)
+    assert not is_near_duplicate(original, different)
+    assert not is_near_duplicate(original, brighter, threshold=-1)  # Disabled
+
+
+def test_hash_helpers():
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hash_distance((0, 0b111), (0b1, 0)) == 3
+    a_hash, d_hash = image_hashes(random_scene(3))
+    assert 0 <= a_hash < 2 ** 64 and 0 <= d_hash < 2 ** 64
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Quick tests for the content-addressed local image store.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app.image_store as image_store_module
+from app.image_store import ImageStore, sniff_content_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"content-type": "image/png"}
+
+    def __init__(self, content):
+        self.content = content
+
+
+def test_concurrent_fetches_download_once_and_survive_restart(tmp_path, monkeypatch):
+    downloads = []
+
+    def fake_get(url, timeout=None):
+        downloads.append(url)
+        time.sleep(0.1)
+        return FakeResponse(PNG)
+
+    monkeypatch.setattr(image_store_module.requests, "get", fake_get)
+    store = ImageStore(root=str(tmp_path), max_bytes=10_000)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: store.get_image_bytes("https://img/a.png"), range(4)))
+    assert results == [PNG] * 4
+    assert downloads == ["https://img/a.png"]
+
+    # Same content under another URL is stored once
+    store.put_bytes(PNG, "https://img/a-copy.png")
+    assert store.lookup("https://img/a-copy.png") == store.lookup("https://img/a.png")
+
+    reopened = ImageStore(root=str(tmp_path), max_bytes=10_000)
+    assert reopened.get_image_bytes("https://img/a.png") == PNG
+    assert reopened.get_image_path("https://img/a.png").endswith(".png")
+    assert len(downloads) == 1
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    store = ImageStore(root=str(tmp_path), max_bytes=2500)
+    blobs = {name: PNG + name.encode() for name in ("a", "b", "c")}
+
+    store.put_bytes(blobs["a"], "a")
+    store.put_bytes(blobs["b"], "b")
+    store.get_bytes(store.lookup("a"))  # "a" is now more recent than "b"
+    store.put_bytes(blobs["c"], "c")
+
+    assert store.contains("a") and store.contains("c")
+    assert not store.contains("b")
+    assert store.stats["evictions"] == 1
+
+
+def test_content_type_sniffing():
+    assert sniff_content_type(PNG) == "image/png"
+    assert sniff_content_type(b"\xff\xd8\xff\xe0rest") == "image/jpeg"
+    assert sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_content_type(b"<html>") is None
+
+
+def test_prefetch_signals_readiness_and_consumers_join_it(tmp_path, monkeypatch):
+    downloads = []
+    release = threading.Event()
+
+    def fake_get(url, timeout=None):
+        downloads.append(url)
+        release.wait(timeout=5)
+        return FakeResponse(PNG)
+
+    monkeypatch.setattr(image_store_module.requests, "get", fake_get)
+    store = ImageStore(root=str(tmp_path))
+
+    future = store.prefetch("https://img/lazy.png")
+    assert store.prefetch("https://img/lazy.png") is future
+    assert not store.is_ready("https://img/lazy.png")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        consumer = pool.submit(store.get_image_bytes, "https://img/lazy.png")
+        time.sleep(0.05)
+        release.set()
+        assert consumer.result(timeout=5) == PNG
+
+    assert store.wait("https://img/lazy.png", timeout=5)
+    assert future.result() == store.lookup("https://img/lazy.png")
+    assert downloads == ["https://img/lazy.png"]
+
+
+def test_store_handles_resolve_locally_without_downloads(tmp_path, monkeypatch):
+    from app.image_store import handle_for, is_store_handle
+
+    def fail_get(url, timeout=None):
+        raise AssertionError(f"unexpected download of {url}")
+
+    monkeypatch.setattr(image_store_module.requests, "get", fail_get)
+    store = ImageStore(root=str(tmp_path))
+    handle = handle_for(store.put_bytes(PNG))
+
+    assert is_store_handle(handle) and not is_store_handle("https://img/a.png")
+    assert store.is_ready(handle)
+    assert store.get_image_bytes(handle) == PNG
+    assert ImageStore(root=str(tmp_path)).get_image_path(handle).endswith(".png")  # Survives restarts
+    assert store.get_image_bytes("store://" + "0" * 64) is None  # Unknown handle: no download attempted
+
+
+def test_handle_only_blobs_are_evicted_after_downloads(tmp_path):
+    from app.image_store import handle_for
+
+    store = ImageStore(root=str(tmp_path), max_bytes=2500)
+    handle = handle_for(store.put_bytes(PNG + b"handle"))
+    for name in ("a", "b", "c", "d"):
+        store.put_bytes(PNG + name.encode(), f"https://img/{name}.png")
+
+    assert store.get_image_bytes(handle) == PNG + b"handle"
+    assert not store.contains("https://img/a.png") and store.contains("https://img/d.png")
+    assert store.stats["evictions"] == 3
+
+    # Evicted last also after a restart
+    reopened = ImageStore(root=str(tmp_path), max_bytes=2500)
+    reopened.put_bytes(PNG + b"e", "https://img/e.png")
+    assert reopened.get_image_bytes(handle) == PNG + b"handle"
+    assert not reopened.contains("https://img/d.png")
+
+
+def test_size_cap_holds_for_many_handle_only_images(tmp_path):
+    from app.image_store import handle_for
+
+    store = ImageStore(root=str(tmp_path), max_bytes=3500)
+    handles = [handle_for(store.put_bytes(PNG + str(n).encode())) for n in range(20)]
+
+    assert store._total_bytes <= 3500
+    assert store.get_image_bytes(handles[0]) is None  # Oldest handles expire
+    assert store.get_image_bytes(handles[-1]) == PNG + b"19"
+    assert len(ImageStore(root=str(tmp_path), max_bytes=3500)._handle_only) == 3
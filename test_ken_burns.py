@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Quick tests for Ken Burns frame synthesis.
+"""
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from app.ken_burns import ken_burns_frames, ken_burns_params, render_frame, zoom_box
+
+
+def test_loop_renders_each_distinct_frame_once():
+    image = Image.new("RGB", (64, 48), "#F40009")
+    frames = ken_burns_frames(image, num_frames=10)
+
+    assert len(frames) == 18
+    assert len({id(frame) for frame in frames}) == 10
+    assert frames[11] is frames[7]  # Zoom-out frame reuses the matching zoom-in frame
+    assert all(frame.size == (64, 48) for frame in frames)
+
+
+def test_streamed_loop_renders_each_distinct_frame_once(monkeypatch):
+    import app.ken_burns as ken_burns_module
+
+    renders = []
+    original = ken_burns_module.render_frame
+    monkeypatch.setattr(ken_burns_module, "render_frame", lambda *a, **k: renders.append(1) or original(*a, **k))
+
+    frames = list(ken_burns_module.iter_ken_burns_frames(Image.new("RGB", (64, 48), "#F40009"), num_frames=10))
+    assert len(frames) == 18 and len(renders) == 10
+    assert frames[11] is frames[7]
+
+
+def test_frame_matches_crop_resize_and_brightness():
+    rng = np.random.default_rng(0)
+    image = Image.fromarray((rng.random((16, 16, 3)) * 255).astype(np.uint8)).resize((256, 256))
+    zoom, brightness = ken_burns_params(10)
+
+    left, top, right, bottom = zoom_box(image.size, zoom)
+    expected = image.crop((left, top, right, bottom)).resize(image.size, Image.Resampling.LANCZOS)
+    expected = ImageEnhance.Brightness(expected).enhance(brightness)
+
+    diff = np.abs(np.asarray(render_frame(image, zoom, brightness), dtype=np.int16) - np.asarray(expected))
+    assert diff.mean() < 2
+
+
+def test_clip_renders_the_loop_on_demand_for_any_duration():
+    from app.ken_burns import ken_burns_frame_at
+    from app.video_creator import ken_burns_clip
+
+    assert [ken_burns_frame_at(t / 10, num_frames=4) for t in range(8)] == [0, 1, 2, 3, 2, 1, 0, 1]
+
+    image = Image.linear_gradient("L").resize((40, 30)).convert("RGB")
+    clip = ken_burns_clip(image, duration=5.0, num_frames=4)
+    assert clip.duration == 5.0
+    # 0.45 s into the loop is the 5th step (zooming back out through frame 2)
+    expected = np.asarray(render_frame(image, *ken_burns_params(2, 4)))
+    assert (clip.get_frame(0.45) == expected).all()
+    assert (clip.get_frame(4.65) == clip.get_frame(0.45)).all()  # Loops without concatenated copies
+
+
+def test_scene_zoom_is_folded_into_one_resample():
+    from app.video_creator import ken_burns_clip, reframe_clip
+    from app.ken_burns import view_box
+
+    rng = np.random.default_rng(1)
+    image = Image.fromarray((rng.random((16, 16, 3)) * 255).astype(np.uint8)).resize((240, 240))
+
+    # Zoom 1.2 then crop back, as two steps, versus one boxed resample
+    enlarged = image.resize((288, 288), Image.Resampling.BICUBIC)
+    two_steps = np.asarray(enlarged.crop((24, 24, 264, 264)), dtype=np.int16)
+    zoom, _ = ken_burns_params(0, base_zoom=1.2)
+    one_step = np.asarray(render_frame(image, zoom, 1.0), dtype=np.int16)
+    assert np.abs(two_steps - one_step).mean() < 3
+
+    assert view_box((400, 200), (100, 100), zoom=2.0) == (150.0, 50.0, 250.0, 150.0)
+    clip = reframe_clip(ken_burns_clip(image, duration=1.0, num_frames=4), size=(120, 90), zoom=1.2)
+    assert clip.get_frame(0.5).shape == (90, 120, 3)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Quick tests for the LLM call ledger.
+"""
+from datetime import datetime
+
+import app.llm_ledger as llm_ledger
+from app.config import GROQ_LLM_MODEL, OPENAI_LLM_MODEL
+
+
+def use_temp_ledger(tmp_path, monkeypatch, now):
+    """Points the ledger at a fresh database with a controllable clock."""
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now[0]
+
+    monkeypatch.setattr(llm_ledger, "DB_PATH", str(tmp_path / "ledger.db"))
+    monkeypatch.setattr(llm_ledger, "datetime", FakeDatetime)
+
+
+def test_latency_percentiles_interpolate_known_latencies(tmp_path, monkeypatch):
+    use_temp_ledger(tmp_path, monkeypatch, [datetime(2025, 2, 9, 12)])
+    for latency in [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]:
+        llm_ledger.record_call("groq", GROQ_LLM_MODEL, latency, True)
+    llm_ledger.record_call("groq", GROQ_LLM_MODEL, 50_000, False)
+    llm_ledger.record_call("openai", OPENAI_LLM_MODEL, 42, True)
+
+    stats = llm_ledger.latency_percentiles(days=1)
+    assert stats["groq"] == {"p50": 550.0, "p95": 955.0, "calls": 10}
+    assert stats["openai"] == {"p50": 42.0, "p95": 42.0, "calls": 1}
+    assert llm_ledger.latency_percentiles(days=1, successful_only=False)["groq"]["calls"] == 11
+    assert set(llm_ledger.latency_percentiles(days=1, provider="openai")) == {"openai"}
+
+
+def test_daily_spend_buckets_by_day_and_failures_cost_nothing(tmp_path, monkeypatch):
+    now = [datetime(2025, 2, 8, 23, 59)]
+    use_temp_ledger(tmp_path, monkeypatch, now)
+    llm_ledger.record_call("openai", OPENAI_LLM_MODEL, 800, True, prompt_tokens=1_000_000, completion_tokens=0)
+    now[0] = datetime(2025, 2, 9, 0, 1)
+    llm_ledger.record_call("openai", OPENAI_LLM_MODEL, 900, True, prompt_tokens=0, completion_tokens=1_000_000)
+    llm_ledger.record_call("openai", OPENAI_LLM_MODEL, 300, False, fallback_reason="rate limited (429)")
+
+    rows = llm_ledger.daily_spend(days=7)
+    assert [(row["day"], row["calls"], row["failures"]) for row in rows] == [("2025-02-09", 2, 1), ("2025-02-08", 1, 0)]
+    assert rows[0]["cost_usd"] == llm_ledger.estimate_cost(OPENAI_LLM_MODEL, 0, 1_000_000)
+    assert rows[1]["cost_usd"] == llm_ledger.estimate_cost(OPENAI_LLM_MODEL, 1_000_000, 0)
+
+    failed = llm_ledger.get_recent_calls(limit=1)[0]
+    assert failed["success"] is False and failed["cost_usd"] == 0
+    assert failed["fallback_reason"] == "rate limited (429)"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Quick tests for the OpenAI/Groq-compatible mock LLM server.
+"""
+import json
+import time
+
+import requests
+from groq import Groq
+from openai import OpenAI
+
+from app.mock_llm_server import MockLLMConfig, start_mock_server
+
+PROMPT = "Create a Coca-Cola campaign specifically for: **Coachella**"
+
+
+def chat(base_url, path="/v1/chat/completions"):
+    return requests.post(base_url + path, json={"model": "mock", "messages": [{"role": "user", "content": PROMPT}]},
+                         timeout=5)
+
+
+def test_openai_and_groq_clients_parse_the_responses():
+    server, base_url = start_mock_server(config=MockLLMConfig(latency_ms=0, latency_sigma=0))
+    try:
+        messages = [{"role": "user", "content": PROMPT}]
+        openai_response = OpenAI(api_key="mock", base_url=f"{base_url}/v1", max_retries=0).chat.completions.create(
+            model="gpt-4o-mini", messages=messages)
+        groq_response = Groq(api_key="mock", base_url=base_url, max_retries=0).chat.completions.create(
+            model="llama-3.3-70b-versatile", messages=messages)
+
+        for response in (openai_response, groq_response):
+            campaign = json.loads(response.choices[0].message.content)
+            assert "Coachella" in campaign["slogan"]
+            assert response.choices[0].finish_reason == "stop"
+            assert response.usage.total_tokens == response.usage.prompt_tokens + response.usage.completion_tokens
+        assert {openai_response.id, groq_response.id} == {"chatcmpl-mock-1", "chatcmpl-mock-2"}
+        assert groq_response.model == "llama-3.3-70b-versatile"
+    finally:
+        server.shutdown()
+
+
+def test_injected_latency_errors_rate_limits_and_malformed_json():
+    config = MockLLMConfig(latency_ms=200, latency_sigma=0, error_rate=1.0)
+    server, base_url = start_mock_server(config=config)
+    try:
+        start = time.perf_counter()
+        assert chat(base_url).status_code == 500
+        assert time.perf_counter() - start >= 0.2
+
+        config.latency_ms, config.error_rate, config.rate_limit_rate = 0, 0.0, 1.0
+        response = chat(base_url, "/openai/v1/chat/completions")
+        assert response.status_code == 429 and response.headers["retry-after"] == "1"
+
+        config.rate_limit_rate, config.malformed_rate = 0.0, 1.0
+        choice = chat(base_url).json()["choices"][0]
+        assert choice["finish_reason"] == "length"
+        assert choice["message"]["content"].startswith("{") and not choice["message"]["content"].endswith("}")
+
+        assert chat(base_url, "/v2/unknown").status_code == 404
+        assert requests.get(f"{base_url}/stats", timeout=5).json() == {
+            "requests": 3, "ok": 0, "errors": 1, "rate_limited": 1, "malformed": 1
+        }
+    finally:
+        server.shutdown()
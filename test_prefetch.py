@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Quick tests for prefetching campaigns on trend selection.
+"""
+import threading
+
+import app.prefetch as prefetch_module
+from app.prefetch import CampaignPrefetch
+
+
+def test_generate_attaches_to_prefetch_and_new_selection_cancels_old(monkeypatch):
+    release = threading.Event()
+    generated = []
+
+    def fake_generate(trend, category):
+        release.wait(timeout=5)
+        generated.append(trend)
+        return {"slogan": f"{trend} Magic"}
+
+    monkeypatch.setattr(prefetch_module, "generate_campaign_for_trend", fake_generate)
+    prefetch = CampaignPrefetch(enabled=True)
+
+    prefetch.start("Grammys")
+    prefetch.start("Super Bowl LIX")  # User changed their mind
+    assert prefetch.result("Grammys") is None
+
+    release.set()
+    prefetched = prefetch.result("Super Bowl LIX", timeout=5)
+    assert prefetched == {"category": "sports", "campaign": {"slogan": "Super Bowl LIX Magic"}}
+    assert "Super Bowl LIX" in generated
+
+
+def test_unsafe_trend_prefetches_nothing():
+    prefetch = CampaignPrefetch(enabled=True)
+    prefetch.start("Election Results")
+    assert prefetch.result("Election Results", timeout=5) is None
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Quick tests for the compiled scene rule table.
+"""
+import json
+
+from app.scene_rules import SceneRuleTable, get_scene_rules, load_scene_rules
+
+
+def test_first_rule_in_table_order_wins():
+    table = SceneRuleTable(
+        [
+            {"category": "entertainment", "keywords": ["concert"], "image_scene": "Stage for {trend}"},
+            {"category": "holiday", "keywords": ["christmas"], "image_scene": "Tree for {trend}",
+             "video_scene": "Snow falling on {trend}"},
+        ],
+        {"image_scene": "Friends and {key_elements} at {trend}", "video_scene": "People at {trend}"},
+    )
+
+    # "christmas" appears first in the trend, but the concert rule has priority
+    assert table.scenes("Christmas Concert")["image_scene"] == "Stage for Christmas Concert"
+    assert table.scenes("Christmas Eve")["video_scene"] == "Snow falling on Christmas Eve"
+    # A rule without a video scene falls back to the default one
+    assert table.scenes("Summer Concert")["video_scene"] == "People at Summer Concert"
+
+    default = table.scenes("Random Thing", "Red cans, golden hour, sun")
+    assert default["category"] == "default"
+    assert default["image_scene"] == "Friends and Red cans, golden hour at Random Thing"
+
+
+def test_shipped_rules_load_and_new_rules_need_no_code(tmp_path):
+    assert get_scene_rules().scenes("Super Bowl LIX")["category"] == "sports"
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "rules": [{"category": "space", "keywords": ["rocket", "nasa"], "image_scene": "Launch pad at {trend}"}]
+    }))
+    table = load_scene_rules(str(path))
+    assert table.scenes("NASA Artemis")["image_scene"] == "Launch pad at NASA Artemis"
+    assert table.scenes("Artemis")["category"] == "default"
+
+
+def test_rules_with_broken_templates_are_skipped():
+    table = SceneRuleTable(
+        [
+            {"category": "typo", "keywords": ["concert"], "image_scene": "Stage for {trned}"},
+            {"category": "brace", "keywords": ["concert"], "video_scene": "Crowd at {trend"},
+            {"category": "positional", "keywords": ["concert"], "image_scene": "Stage for {}"},
+            {"category": "music", "keywords": ["concert"], "image_scene": "Lights for {trend}"},
+        ],
+        {"image_scene": "Fans of {0}", "video_scene": "People at {trend}"},
+    )
+
+    assert [rule["category"] for rule in table.rules] == ["music"]
+    assert table.scenes("Summer Concert")["image_scene"] == "Lights for Summer Concert"
+    default = table.scenes("Random Thing")
+    assert default["image_scene"].startswith("A specific scene celebrating Random Thing")
+    assert default["video_scene"] == "People at Random Thing"
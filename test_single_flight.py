@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Quick tests for coalescing identical in-flight requests.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_result():
+    flight = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def slow(value):
+        calls.append(value)
+        started.set()
+        time.sleep(0.2)
+        return {"slogan": value}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        first = pool.submit(flight.do, "key", slow, "Taste the Victory")
+        started.wait()
+        others = [pool.submit(flight.do, "key", slow, "Taste the Victory") for _ in range(4)]
+        results = [first.result()] + [f.result() for f in others]
+
+    assert len(calls) == 1
+    assert all(r == {"slogan": "Taste the Victory"} for r in results)
+    assert flight.stats == {"calls": 1, "coalesced": 4}
+
+
+def test_errors_reach_every_waiter_and_next_call_runs_again():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flight.do, "key", failing)
+        started.wait()
+        second = pool.submit(flight.do, "key", failing)
+        for future in (first, second):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert not flight.in_flight("key")
+    assert flight.do("key", lambda: "fresh") == "fresh"
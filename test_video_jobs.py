@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Quick tests for background Hugging Face video jobs.
+"""
+import time
+
+from app.video_jobs import ModelState, VideoJobManager, VideoResult
+
+
+def wait_for(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_waits_out_a_cold_start_and_marks_the_model_warm():
+    answers = [VideoResult("loading", estimated_time=0.05), VideoResult("loading"),
+               VideoResult("done", video_path="/tmp/video.mp4")]
+    calls = []
+
+    def fake_request(image_url):
+        calls.append(image_url)
+        return answers[len(calls) - 1]
+
+    jobs = VideoJobManager(max_workers=1, min_poll_seconds=0.01, max_poll_seconds=0.1, request_fn=fake_request)
+    job = jobs.submit("https://img/a.png")
+    assert jobs.submit("https://img/a.png") is job  # One job per image
+
+    wait_for(job)
+    assert job.status == "done" and job.video_path == "/tmp/video.mp4"
+    assert job.attempts == 3
+    assert jobs.model_status()["state"] == "warm"
+
+
+def test_poll_delay_follows_estimate_within_bounds():
+    jobs = VideoJobManager(max_workers=1, min_poll_seconds=5, max_poll_seconds=60, request_fn=lambda url: VideoResult("failed"))
+    assert jobs._poll_delay(20.0, 1) == 20
+    assert jobs._poll_delay(300.0, 1) == 60
+    assert jobs._poll_delay(None, 1) == 5
+    assert jobs._poll_delay(None, 3) == 20  # Exponential backoff without an estimate
+
+
+def test_failed_job_is_retried_and_loading_state_is_shared():
+    state = ModelState()
+    state.mark_loading(0.3)
+    assert state.status()["state"] == "loading" and state.wait_seconds() > 0.2
+
+    calls = []
+    jobs = VideoJobManager(max_workers=1, max_wait_seconds=5, request_fn=lambda url: calls.append(time.time()) or VideoResult("failed", error="429"),
+                           model_state=state)
+    submitted_at = time.time()
+    job = jobs.submit("https://img/b.png")
+    time.sleep(0.1)
+    assert job.status == "loading" and not calls  # Waits for the model another job found loading
+
+    wait_for(job)
+    assert job.status == "failed" and job.error == "429"
+    assert len(calls) == 1 and calls[0] - submitted_at >= 0.25
+    assert jobs.submit("https://img/b.png") is not job
+
+
+def test_finished_jobs_expire_or_are_capped():
+    jobs = VideoJobManager(max_workers=1, request_fn=lambda url: VideoResult("done", video_path="/tmp/video.mp4"), job_ttl_seconds=60, max_jobs=2)
+    first = wait_for(jobs.submit("https://img/1.png"))
+    for n in (2, 3):
+        wait_for(jobs.submit(f"https://img/{n}.png"))
+    jobs.submit("https://img/4.png")
+    assert jobs.get("https://img/1.png") is None and len(jobs) == 2
+
+    jobs.job_ttl_seconds = 0
+    time.sleep(0.01)
+    wait_for(jobs.get("https://img/4.png"))
+    jobs.submit("https://img/5.png")
+    assert jobs.get("https://img/2.png") is None and jobs.get("https://img/4.png") is None
+    assert first.status == "done"
+
+
+def test_hugging_face_request_returns_structured_results(monkeypatch):
+    import app.visual_engine as visual_engine
+
+    class FakeResponse:
+        def __init__(self, status_code, payload=None, content=b""):
+            self.status_code, self._payload, self.content, self.text = status_code, payload, content, ""
+
+        def json(self):
+            if self._payload is None:
+                raise ValueError("no JSON")
+            return self._payload
+
+    responses = [FakeResponse(503, {"estimated_time": 12.5}), FakeResponse(503), FakeResponse(429),
+                 FakeResponse(200, content=b"mp4 bytes")]
+    monkeypatch.setattr(visual_engine, "get_image_bytes", lambda url: b"\x89PNG\r\n\x1a\n")
+    monkeypatch.setattr(visual_engine.requests, "post", lambda *args, **kwargs: responses.pop(0))
+
+    assert visual_engine.generate_video_url_huggingface("https://img/a.png") == VideoResult("loading", estimated_time=12.5)
+    assert visual_engine.generate_video_url_huggingface("https://img/a.png") == VideoResult("loading")
+    assert visual_engine.generate_video_url_huggingface("https://img/a.png").status == "failed"
+    done = visual_engine.generate_video_url_huggingface("https://img/a.png")
+    assert done.status == "done"
+    with open(done.video_path, "rb") as f:
+        assert f.read() == b"mp4 bytes"
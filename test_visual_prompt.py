@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Quick tests for structured visual prompts.
+"""
+
+from app.visual_engine import POLLINATIONS_MAX_PROMPT_CHARS, build_dalle_prompt, build_visual_prompt
+
+
+def test_prompt_is_memoized_and_renders_per_provider():
+    prompt = build_visual_prompt("Super Bowl LIX", "Stadium lights, red confetti")
+    assert build_visual_prompt("Super Bowl LIX", "Stadium lights, red confetti") is prompt
+
+    assert prompt.to_dalle() == build_dalle_prompt("Super Bowl LIX", "Stadium lights, red confetti")
+    assert "specifically for Super Bowl LIX." in prompt.to_dalle()
+    assert prompt.to_pollinations().startswith("Coca-Cola advertisement featuring Super Bowl LIX, ")
+    assert len(prompt.to_pollinations()) <= POLLINATIONS_MAX_PROMPT_CHARS
+    assert prompt.to_video().startswith("Coca-Cola advertisement video: Super Bowl LIX, Dynamic scene")
+
+
+def test_variation_reaches_every_image_provider():
+    prompt = build_visual_prompt("Grammys", "Gold stage lights " * 40)
+    variation = prompt.with_variation("close-up detail, variation 3")
+
+    assert variation != prompt
+    assert variation.to_dalle().endswith(", close-up detail, variation 3")
+    # Kept even when the moodboard pushes the text past the length cap
+    assert "close-up detail, variation 3" in variation.to_pollinations()
+
+
+def test_batch_generation_is_parallel_and_replaces_duplicates(tmp_path, monkeypatch):
+    import time
+    import app.image_store as image_store_module
+    import app.visual_engine as visual_engine
+
+    hero = "https://img/hero.png"
+    calls = []
+
+    def fake_generate(prompt):
+        calls.append(prompt.variation)
+        time.sleep(0.2)
+        if prompt.variation == "close-up":
+            return hero  # Duplicate of the hero image
+        if prompt.variation == "wide":
+            return "https://img/same-bytes-as-hero.png"
+        return f"https://img/{prompt.variation}.png"
+
+    class FakeResponse:
+        status_code = 200
+        headers = {"content-type": "image/png"}
+
+        def __init__(self, url):
+            self.content = b"\x89PNG\r\n\x1a\n" + (b"hero" if "hero" in url else url.encode())
+
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module.requests, "get", lambda url, timeout=None: FakeResponse(url))
+    monkeypatch.setattr(visual_engine, "get_image_store", lambda: store)
+    monkeypatch.setattr(visual_engine, "generate_image_url", fake_generate)
+    store.fetch(hero)
+
+    base = build_visual_prompt("Grammys", "Gold stage lights")
+    prompts = [base.with_variation(v) for v in ("close-up", "wide", "aerial", "crowd")]
+
+    start = time.perf_counter()
+    urls = visual_engine.generate_image_urls(prompts, max_workers=4, exclude=[hero], fallback_url=hero)
+    elapsed = time.perf_counter() - start
+
+    assert len(urls) == 4 and len(set(urls)) == 4
+    assert hero not in urls and "https://img/same-bytes-as-hero.png" not in urls
+    assert len(calls) == 6  # Two duplicates regenerated with the retry hint
+    assert elapsed < 0.7  # Two parallel waves, not six sequential generations
+
+
+def test_near_duplicate_scenes_are_regenerated_then_least_similar_kept(tmp_path, monkeypatch):
+    from io import BytesIO
+    import numpy as np
+    from PIL import Image, ImageEnhance
+    import app.image_store as image_store_module
+    import app.visual_engine as visual_engine
+
+    def scene(seed, brightness=1.0):
+        cells = (np.random.default_rng(seed).random((16, 16, 3)) * 255).astype(np.uint8)
+        image = ImageEnhance.Brightness(Image.fromarray(cells).resize((256, 256))).enhance(brightness)
+        buffer = BytesIO()
+        image.save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    images = {
+        "https://img/hero.png": scene(1),
+        "https://img/a.png": scene(1, 1.1),   # Looks like the hero
+        "https://img/a2.png": scene(1, 1.2),  # Retry still looks like the hero
+        "https://img/b.png": scene(2),
+    }
+
+    class FakeResponse:
+        status_code = 200
+        headers = {"content-type": "image/jpeg"}
+
+        def __init__(self, url):
+            self.content = images[url]
+
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module.requests, "get", lambda url, timeout=None: FakeResponse(url))
+    monkeypatch.setattr(visual_engine, "get_image_store", lambda: store)
+    visual_engine._perceptual_hashes.cache_clear()
+    answers = {"a": "https://img/a.png", "b": "https://img/b.png"}
+    monkeypatch.setattr(visual_engine, "generate_image_url",
+                        lambda p: answers.get(p.variation, "https://img/a2.png"))
+
+    base = build_visual_prompt("Grammys", "Gold stage lights")
+    urls = visual_engine.generate_image_urls(
+        [base.with_variation("a"), base.with_variation("b")],
+        exclude=["https://img/hero.png"], fallback_url="https://img/hero.png"
+    )
+    visual_engine._perceptual_hashes.cache_clear()
+
+    assert urls[1] == "https://img/b.png"
+    # Both candidates for scene 1 look like the hero; the less similar one is used instead of the hero itself
+    assert urls[0] in ("https://img/a.png", "https://img/a2.png")
+
+
+def test_dalle_base64_responses_go_straight_into_the_store(tmp_path, monkeypatch):
+    import base64
+    from types import SimpleNamespace
+    import app.image_store as image_store_module
+    import app.visual_engine as visual_engine
+
+    png = b"\x89PNG\r\n\x1a\n" + b"dalle" * 100
+    requests_made = []
+
+    class FakeImages:
+        def generate(self, **kwargs):
+            requests_made.append(kwargs)
+            return SimpleNamespace(data=[SimpleNamespace(b64_json=base64.b64encode(png).decode(), url=None)])
+
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module, "_store", store)
+    monkeypatch.setattr(visual_engine, "openai_client", SimpleNamespace(images=FakeImages()))
+    monkeypatch.setattr(visual_engine, "DALLE_RESPONSE_FORMAT", "b64_json")
+
+    handle = visual_engine.generate_image_url(build_visual_prompt("Grammys", "Gold stage lights b64"))
+
+    assert requests_made[0]["response_format"] == "b64_json"
+    assert handle.startswith("store://")
+    assert image_store_module.get_image_bytes(handle) == png
+
+
+def test_local_backend_renders_repeatable_images_offline(tmp_path, monkeypatch):
+    import app.image_store as image_store_module
+    import app.visual_engine as visual_engine
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("local backend must not download anything")
+
+    store = image_store_module.ImageStore(root=str(tmp_path))
+    monkeypatch.setattr(image_store_module, "_store", store)
+    monkeypatch.setattr(image_store_module.requests, "get", no_network)
+    monkeypatch.setattr(visual_engine, "get_image_store", lambda: store)
+    monkeypatch.setattr(visual_engine, "IMAGE_BACKEND", "local")
+    monkeypatch.setattr(visual_engine, "LOCAL_IMAGE_SIZE", 256)
+
+    base = build_visual_prompt("Grammys", "Gold stage lights local")
+    handle = visual_engine.generate_image_url(base)
+    assert handle.startswith("store://")
+    assert visual_engine.generate_image_url(base) == handle  # Same prompt, same bytes
+
+    urls = visual_engine.generate_image_urls([base.with_variation(v) for v in ("wide", "close-up", "crowd")],
+                                             exclude=[handle], fallback_url=handle)
+    assert len(set(urls)) == 3 and handle not in urls
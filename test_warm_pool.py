@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Quick tests for speculative pre-generation of top trends.
+"""
+import time
+
+import app.warm_pool as warm_pool_module
+from app.warm_pool import WarmPool
+
+
+def fake_assets(trend, category):
+    return {
+        "trend": trend,
+        "category": category,
+        "campaign": {"slogan": f"{trend} Magic"},
+        "visual_prompt": trend,
+        "image_url": f"https://example.com/{trend}.png",
+        "audio_bytes": b"mp3",
+        "created_at": time.time(),
+    }
+
+
+def wait_until_ready(pool, expected, timeout=5):
+    deadline = time.time() + timeout
+    while pool.status()["ready"] < expected and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_top_safe_trends_are_warmed_and_dropped_trends_evicted(monkeypatch):
+    monkeypatch.setattr(warm_pool_module, "build_campaign_assets", fake_assets)
+    pool = WarmPool(size=2, max_workers=2)
+
+    pool.warm(["Election Results", "Super Bowl LIX", "Grammys", "Coachella"])
+    wait_until_ready(pool, 2)
+
+    assert pool.get("Election Results") is None  # Classified as "skip"
+    assert pool.get("Super Bowl LIX")["category"] == "sports"
+    assert pool.get("Grammys")["image_url"] == "https://example.com/Grammys.png"
+    assert pool.get("Coachella") is None  # Outside the budget
+
+    pool.warm(["Coachella", "Grammys"])
+    wait_until_ready(pool, 2)
+
+    assert pool.get("Super Bowl LIX") is None
+    assert pool.get("Coachella") is not None
+
+
+def test_disabled_pool_does_nothing():
+    pool = WarmPool(size=0)
+    pool.warm(["Grammys"])
+    assert pool.get("Grammys") is None
+    assert pool.status() == {"ready": 0, "pending": 0}